@@ -10,7 +10,10 @@ from lib.common.dataship.dataship_targets import TargetData
 from lib.common.dataship.dataship_engine_fuel import EngineData, FuelData
 from lib.common.dataship.dataship_nav import NavData
 from lib.common.dataship.dataship_analog import AnalogData
-from lib.common.graphic.edit_dropdown import menu_item
+from lib.common.dataship import dataship_object
+from lib.common.dataship.dataship_history import DatashipHistory
+from lib.common.graphic.edit_dropdown import menu_item, lazy_submenu
+from lib.common.helpers.object_fields import isDataObject
 
 class Interface(Enum):
     TEXT = "text"
@@ -43,7 +46,39 @@ class Dataship(object):
         self.debug_mode = 0
         self.errorFoundNeedToExit = False
 
-    
+        # data objects bumped by the inputs during the last frame. (see nextFrame)
+        self.changed = set()
+        self.frame_count = 0
+        # what the screen draws from. same as this object but the data objects are snapshots. (see DatashipFrame)
+        self.frameView = DatashipFrame(self)
+        # time series of the fields something asked to track. (see dataship_history.py)
+        self.history = DatashipHistory()
+
+        # field menus for the editor. (see _get_all_fields)
+        self._schema = None # top level menu_items
+        self._schema_sig = None # names of the lists the menus were built for
+        self._schema_lists = [] # (lazy_submenu, list) for every list menu. rebuilt if the list changes.
+
+
+    #############################################
+    ## Function: nextFrame
+    ## called by the draw loop once per frame. self.changed is set to the data objects bumped since the last frame
+    ## and self.frameView gets the latest snapshot of every data object.
+    def nextFrame(self):
+        self.changed = dataship_object.takeChanged()
+        self.frame_count += 1
+        self.frameView.update()
+        return self.changed
+
+    #############################################
+    ## Function: subscribe
+    ## call callback(obj) every time the data object obj gets new data. (called from the input's thread)
+    def subscribe(self, obj, callback):
+        dataship_object.subscribe(obj, callback)
+
+    def unsubscribe(self, obj, callback):
+        dataship_object.unsubscribe(obj, callback)
+
     # get a list of all fields and functions in the aircraft object
     def _get_all_fields(self, prefix: str = '', force_rebuild: bool = False) -> List[Any]:
         """
@@ -87,100 +122,112 @@ class Dataship(object):
             ])
         ]
 
+        Built once and kept. list submenus are only filled in when they are opened, and are
+        built again if the list's length or the class of its items changes.
         """
-        # if not force_rebuild and hasattr(self, '_all_fields'):
-        #     #print(f"Using cached aircraft field list. len: {len(self._all_fields)}")
-        #     return self._all_fields
+        # top level lists that have objects in them.
+        lists = []
+        for name, value in sorted(vars(self).items()):
+            if not name.startswith('_') and isinstance(value, list) and value and isDataObject(value[0]):
+                lists.append((name, value))
+        sig = tuple(name for name, value in lists)
+
+        if force_rebuild or self._schema is None or sig != self._schema_sig:
+            self._schema_lists = []
+            self._schema = [self._listMenu(value, f"{prefix}{name}") for name, value in lists]
+            self._schema_sig = sig
+        else:
+            # drop submenus of lists that have changed since they were opened.
+            for submenu, value in self._schema_lists:
+                if submenu.built and submenu.signature != _listSignature(value):
+                    submenu.reset()
+        return self._schema
+
+    #############################################
+    ## Function: _listMenu
+    ## menu for a list of objects. the submenu (one menu per item) is built when it's opened.
+    def _listMenu(self, value: list, path: str):
+        item = menu_item(path)
+
+        def build():
+            submenu.signature = _listSignature(value)
+            menus = []
+            for i, obj in enumerate(list(value)):
+                obj_menu = self._objectMenu(obj, f"{path}[{i}]")
+                if obj_menu.submenus:
+                    menus.append(obj_menu)
+            return menus
+
+        submenu = lazy_submenu(build)
+        submenu.signature = None
+        item.submenus = submenu
+        self._schema_lists.append((submenu, value))
+        return item
+
+    #############################################
+    ## Function: _objectMenu
+    ## menu with every field of an object. lists of objects get their own (lazy) submenu.
+    def _objectMenu(self, obj, path: str):
+        item = menu_item(path)
+        for attr in _classFields(obj):
+            full_name = f"{path}.{attr}"
+            value = getattr(obj, attr, None)
+            if isinstance(value, list) and value and isDataObject(value[0]):
+                item.add_submenu(self._listMenu(value, full_name))
+            else:
+                item.add_submenu(menu_item(full_name))
+        return item
+
+
+_class_fields = {} # class -> list of public field names
+
 
+#############################################
+## Function: _classFields
+## public fields (not methods) of an object. worked out once per class.
+def _classFields(obj):
+    fields = _class_fields.get(obj.__class__)
+    if fields is None:
         fields = []
-        structured_fields = []
-
-        def add_field(name: str, value: Any, current_prefix: str):
-            full_name = f"{current_prefix}{name}" if current_prefix else name
-            
-            # Add the basic field to the flat list
-            if isinstance(value, str) or isinstance(value, int) or isinstance(value, float) or \
-               isinstance(value, complex) or isinstance(value, bool) or value is None:
-                fields.append(full_name)
-            elif isinstance(value, list):
-                fields.append(f"{full_name}[{len(value)}]")
-                
-                # Process list items
-                if value and hasattr(value[0], '__dict__'):
-                    # This is a list of objects
-                    list_menu_item = menu_item(full_name)
-                    
-                    # For each item in the list, create a submenu
-                    for i, item in enumerate(value):
-                        item_name = f"{full_name}[{i}]"
-                        item_menu = menu_item(item_name)
-                        
-                        # Add each attribute of the item to both the flat list and the submenu
-                        for attr, attr_value in inspect.getmembers(item):
-                            if not attr.startswith('_') and not inspect.ismethod(attr_value) and not inspect.isfunction(attr_value):
-                                attr_full_name = f"{item_name}.{attr}"
-                                fields.append(attr_full_name)
-                                item_menu.add_submenu(menu_item(attr_full_name))
-                        
-                        # Add the item submenu to the list submenu
-                        if item_menu.submenus:
-                            list_menu_item.add_submenu(item_menu)
-                    
-                    # Add the list menu item to the structured fields
-                    if list_menu_item.submenus:
-                        structured_fields.append(list_menu_item)
-                else:
-                    # Simple list of values
-                    for i, item in enumerate(value):
-                        fields.append(f"{full_name}[{i}]")
-            elif isinstance(value, tuple):
-                fields.append(full_name)
-            elif isinstance(value, dict):
-                fields.append(full_name)
-                for key, dict_value in value.items():
-                    fields.append(f"{full_name}['{key}']")
-            elif inspect.ismethod(value) or inspect.isfunction(value):
-                fields.append(f"{full_name}()")
-            elif isinstance(value, object):
-                fields.append(f"{full_name}<obj>")
-
-            # Recursively process objects with __dict__
-            if hasattr(value, '__dict__') and not isinstance(value, Enum):
-                obj_fields = []
-                for attr, attr_value in inspect.getmembers(value):
-                    if not attr.startswith('_') and not attr == 'get_all_fields':
-                        add_field(attr, attr_value, f"{full_name}.")
-                        if not inspect.ismethod(attr_value) and not inspect.isfunction(attr_value):
-                            obj_fields.append(attr)
-
-
-        # Process all members of the main object
-        for name, value in inspect.getmembers(self):
-            if not name.startswith('_'):
-                add_field(name, value, prefix)
-
-        self._all_fields = fields
-        self._structured_fields = structured_fields
-        #print(f"fields: {fields}")
-        #print(f"structured_fields: {structured_fields}")
-        # for testing
-        # structured_fields.append(menu_item("test"))
-        # structured_fields.append(menu_item("test2", [
-        #     menu_item("test2.1"),
-        #     menu_item("test2.2"),
-        #     menu_item("test2.3"),
-        # ]))
-        # structured_fields.append(menu_item("testSub", [
-        #     menu_item("testSub.1"),
-        #     menu_item("testSub.2"),
-        #     menu_item("testSub.3"),
-        #     menu_item("testSub.4Sub", [
-        #         menu_item("testSub.4.1"),
-        #         menu_item("testSub.4.2"),
-        #         menu_item("testSub.4.3"),
-        #     ]),
-        # ]))
-        return structured_fields
+        for attr, attr_value in inspect.getmembers(obj):
+            if not attr.startswith('_') and not inspect.ismethod(attr_value) and not inspect.isfunction(attr_value):
+                fields.append(attr)
+        _class_fields[obj.__class__] = fields
+    return fields
+
+
+#############################################
+## Function: _listSignature
+## length of a list and the class of each item. the menu for a list is rebuilt when this changes.
+def _listSignature(value: list):
+    return (len(value), tuple(obj.__class__ for obj in value))
+
+
+#############################################
+## Class: DatashipFrame
+## the Dataship as of the start of a frame. the data object lists hold snapshots (see dataship_object.py)
+## so a module never sees half of an input message. everything else is read from and written to the Dataship.
+class DatashipFrame(object):
+    LISTS = ('imuData', 'gpsData', 'airData', 'engineData', 'fuelData', 'targetData', 'navData', 'analogData')
+
+    def __init__(self, dataship: Dataship):
+        object.__setattr__(self, '_dataship', dataship)
+        for name in self.LISTS:
+            object.__setattr__(self, name, [])
+
+    #############################################
+    ## Function: update
+    ## take the latest snapshots. (only from the draw loop, the lists are changed in place)
+    def update(self):
+        dataship = self._dataship
+        for name in self.LISTS:
+            getattr(self, name)[:] = [obj.snapshot() for obj in list(getattr(dataship, name))]
+
+    def __getattr__(self, name): # (only called for names not on the frame)
+        return getattr(self._dataship, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._dataship, name, value)
 
 
 #############################################
@@ -3,15 +3,25 @@
 from enum import Enum
 import inspect
 from typing import List, Any
+from lib.common.dataship.dataship_object import DataObject
 
 #############################################
 ## Class: AirData
 ##
-class AirData(object):
+class AirData(DataObject):
+    # fixed set of fields. (less memory, faster access and writing a misspelled field is an error)
+    __slots__ = ('inputSrcName', 'inputSrcNum', 'id', 'name', 'sys_time_string', 'IAS', 'TAS', 'Alt',
+                 'Alt_agl', 'Alt_pres', 'Alt_baro', 'Alt_da', 'AOA', 'Baro', 'Baro_diff', 'VSI', 'OAT',
+                 'Wind_speed', 'Wind_dir', 'Wind_dir_corr', 'Mag_decl', 'data_format', 'data_format_temp',
+                 'msg_count', 'msg_last', 'msg_bad')
+
 
     def __init__(self):
+        DataObject.__init__(self) # version counter and snapshots. (see dataship_object.py)
         self.inputSrcName = None
         self.inputSrcNum = None
+        self.id = None
+        self.name = None
 
         self.sys_time_string = None
 
@@ -4,11 +4,13 @@ from enum import Enum
 import inspect
 from typing import List, Any
 import time
+from lib.common.dataship.dataship_object import DataObject
 
 #############################################
 ## Class: Analog Input Data 
-class AnalogData(object):
+class AnalogData(DataObject):
     def __init__(self):
+        DataObject.__init__(self) # version counter and snapshots. (see dataship_object.py)
         self.inputSrcName = None
         self.inputSrcNum = None
 
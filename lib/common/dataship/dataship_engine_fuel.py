@@ -4,11 +4,19 @@ from enum import Enum
 import inspect
 from typing import List, Any
 import time
+from lib.common.dataship.dataship_object import DataObject
 
 #############################################
 ## Class: EngineData
-class EngineData(object):
+class EngineData(DataObject):
+    # fixed set of fields. (less memory, faster access and writing a misspelled field is an error)
+    __slots__ = ('id', 'name', 'inputSrcName', 'inputSrcNum', 'NumberOfCylinders', 'RPM', 'ManPress',
+                 'OilPress', 'OilPress2', 'OilTemp', 'OilTemp2', 'CoolantTemp', 'FuelFlow', 'FuelFlow2',
+                 'FuelPress', 'EGT', 'CHT', 'volts1', 'volts2', 'amps', 'hobbs_time', 'tach_time',
+                 'msg_count', 'msg_last')
+
     def __init__(self):
+        DataObject.__init__(self) # version counter and snapshots. (see dataship_object.py)
         self.id = None
         self.name = None
         self.inputSrcName = None
@@ -41,8 +49,9 @@ class EngineData(object):
 
 #############################################
 ## Class: FuelData
-class FuelData(object):
+class FuelData(DataObject):
     def __init__(self):
+        DataObject.__init__(self) # version counter and snapshots. (see dataship_object.py)
 
         self.FuelLevels = [0,0,0,0]
 
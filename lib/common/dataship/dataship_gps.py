@@ -4,15 +4,27 @@ from enum import Enum
 import inspect
 from typing import List, Any
 import time
+from lib.common.dataship.dataship_object import DataObject
 
 #############################################
 ## Class: GPSData
-class GPSData(object):
+class GPSData(DataObject):
+    # fixed set of fields. (less memory, faster access and writing a misspelled field is an error)
+    __slots__ = ('inputSrcName', 'inputSrcNum', 'id', 'name', 'Source', 'sys_time_string', 'Lat', 'Lon',
+                 'Alt', 'GPSTime', 'GPSTime_string', 'GPSDate_string', 'LastUpdate', 'GndTrack', 'GndSpeed',
+                 'AltPressure', 'Mag_Decl', 'EWVelDir', 'EWVelmag', 'NSVelDir', 'NSVelmag', 'VVelDir',
+                 'VVelmag', 'SatsTracked', 'SatsVisible', 'GPSStatus', 'GPSWAAS', 'Accuracy', 'msg_count',
+                 'msg_last', 'msg_bad', 'data_format')
+
     def __init__(self):
+        DataObject.__init__(self) # version counter and snapshots. (see dataship_object.py)
         self.inputSrcName = None
         self.inputSrcNum = None
+        self.id = None
+        self.name = None
 
         self.Source = None # Source Name.
+        self.sys_time_string = None
 
         self.Lat = None   # latitude in decimal degrees
         self.Lon = None   # longitude in decimal degrees
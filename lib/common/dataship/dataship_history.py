@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+
+# Time series history for dataship fields.
+# Nothing is kept unless asked for. A module or input that wants the history of a field calls
+#   dataship.history.track(dataship.airData[0], "Alt", seconds=30, hz=10)
+# and from then on every bump() of that object (see dataship_object.py) stores (time, value) in a fixed
+# size ring buffer (numpy arrays, so adding a point is O(1) and nothing is ever trimmed or moved).
+# Anything can then ask for
+#   dataship.history.valueAgo(airData, "Alt", 5)     value 5 seconds ago
+#   dataship.history.rate(airData, "Alt", 3) * 60    ft/min from the last 3 seconds of altitude (VSI)
+#   dataship.history.trend(airData, "IAS", 6)        where IAS will be in 6 seconds at the current rate
+#   dataship.history.mean/min/max(airData, "IAS", 10)
+# so derived values come from one place instead of every module keeping its own list.
+# Snapshots (DataObject.snapshot) can be passed in place of the live object.
+#
+# Memory is bounded: each field gets seconds * hz points, and all fields together can't go over
+# max_points. ([Main] history_max_points in config.cfg)
+#
+# One thread (the input's) adds points, any thread can read, no locks. The buffer has one spare slot so
+# the point being written is never in the part readers look at, and head/size/count are swapped in as
+# one tuple. A reader copies the points out then checks count again, and drops any oldest points the
+# input wrote over while it was copying.
+
+import time
+import numpy as np
+from lib.common.dataship import dataship_object
+
+
+#############################################
+## Class: History
+## ring buffer of (time, value) for one field. times are in seconds and only go forward.
+class History(object):
+    def __init__(self, points=100):
+        self.points = max(int(points), 2) # points kept.
+        self.times = np.zeros(self.points + 1)
+        self.values = np.zeros(self.points + 1)
+        self._state = (0, 0, 0) # (head, size, points added). head is where the next point goes.
+
+    def __len__(self):
+        return self._state[1]
+
+    #############################################
+    ## Function: _copy
+    ## copy of the stored (times, values), oldest first.
+    def _copy(self):
+        while True:
+            head, size, count = self._state
+            if size == 0:
+                empty = np.zeros(0)
+                return empty, empty
+            start = head - size
+            if start >= 0: # not wrapped.
+                t = self.times[start:head].copy()
+                v = self.values[start:head].copy()
+            else:
+                t = np.concatenate((self.times[start:], self.times[:head]))
+                v = np.concatenate((self.values[start:], self.values[:head]))
+            # points added while copying go in the free slots first, then over the oldest points we
+            # copied. (one more is counted for a point that may be half written)
+            lost = self._state[2] - count - (self.points - size)
+            if lost <= 0:
+                return t, v
+            if lost < size:
+                return t[lost:], v[lost:]
+
+    #############################################
+    ## Function: add
+    ## store a value. None (and anything that isn't a number) is skipped. returns True if it was stored.
+    def add(self, value, t):
+        if value is None:
+            return False
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return False
+        head, size, count = self._state
+        if size and t < self.times[head - 1]: # clock went backwards. start over.
+            head, size = 0, 0
+            count += self.points # (so readers drop everything they copied)
+        self.times[head] = t
+        self.values[head] = value
+        head += 1
+        if head > self.points:
+            head = 0
+        if size < self.points:
+            size += 1
+        self._state = (head, size, count + 1)
+        return True
+
+    def clear(self):
+        self._state = (0, 0, self._state[2] + self.points)
+
+    #############################################
+    ## Function: get
+    ## (times, values) arrays, oldest first. seconds keeps the points newer than now - seconds,
+    ## count keeps the newest count points. now defaults to the time of the newest point.
+    def get(self, seconds=None, count=None, now=None):
+        t, v = self._copy()
+        if count is not None and count < len(t):
+            t = t[len(t) - count:]
+            v = v[len(v) - count:]
+        if seconds is not None and len(t):
+            if now is None:
+                now = t[-1]
+            first = int(np.searchsorted(t, now - seconds)) # times are in order.
+            if first:
+                t = t[first:]
+                v = v[first:]
+        return t, v
+
+    #############################################
+    ## Function: last
+    ## newest value. None if there isn't one.
+    def last(self):
+        head, size, count = self._state
+        if size == 0:
+            return None
+        return float(self.values[head - 1])
+
+    #############################################
+    ## Function: valueAgo
+    ## value as of seconds before now. (the newest point at or before then)
+    ## None if the history doesn't go back that far.
+    def valueAgo(self, seconds, now=None):
+        t, v = self.get()
+        if len(t) == 0:
+            return None
+        if now is None:
+            now = t[-1]
+        i = int(np.searchsorted(t, now - seconds, side='right')) - 1
+        if i < 0:
+            return None
+        return float(v[i])
+
+    #############################################
+    ## Function: rate
+    ## change per second over the last seconds (least squares slope, so a noisy value gives a steady rate).
+    ## None if there are less than 2 points in the window.
+    def rate(self, seconds, now=None):
+        t, v = self.get(seconds=seconds, now=now)
+        if len(t) < 2:
+            return None
+        dt = t - t.mean()
+        spread = np.dot(dt, dt)
+        if spread == 0:
+            return None
+        return float(np.dot(dt, v - v.mean()) / spread)
+
+    def mean(self, seconds=None, count=None, now=None):
+        t, v = self.get(seconds, count, now)
+        return float(v.mean()) if len(v) else None
+
+    def min(self, seconds=None, count=None, now=None):
+        t, v = self.get(seconds, count, now)
+        return float(v.min()) if len(v) else None
+
+    def max(self, seconds=None, count=None, now=None):
+        t, v = self.get(seconds, count, now)
+        return float(v.max()) if len(v) else None
+
+
+#############################################
+## Class: DatashipHistory
+## the histories of every tracked field. one per Dataship. (dataship.history)
+class DatashipHistory(object):
+    def __init__(self, max_points=100000):
+        self.max_points = max_points # all fields together. (8 bytes time + 8 bytes value per point)
+        self.clock = time.monotonic # seconds. set to the playback clock so logs played fast still give the right rates.
+        self.used_points = 0
+        self._tracked = {} # data object -> {field name: History}
+
+    #############################################
+    ## Function: track
+    ## start keeping the history of obj.field. seconds * hz points are kept. returns the History,
+    ## or None if there is no room left under max_points. (tracking the same field again returns the same History)
+    def track(self, obj, field, seconds=60, hz=10):
+        obj = _live(obj)
+        fields = self._tracked.get(obj)
+        if fields is not None and field in fields:
+            return fields[field]
+        points = max(int(seconds * hz), 2)
+        if self.used_points + points > self.max_points:
+            points = self.max_points - self.used_points
+            if points < 2:
+                print("History: no room to track %s.%s (history_max_points %d)" % (obj.__class__.__name__, field, self.max_points))
+                return None
+            print("History: %s.%s cut down to %d points (history_max_points %d)" % (obj.__class__.__name__, field, points, self.max_points))
+        history = History(points)
+        self.used_points += history.points
+        if fields is None:
+            fields = {}
+            dataship_object.subscribe(obj, self._record)
+        fields[field] = history
+        self._tracked[obj] = fields
+        return history
+
+    #############################################
+    ## Function: untrack
+    ## stop keeping the history of obj.field and free its points.
+    def untrack(self, obj, field):
+        obj = _live(obj)
+        fields = self._tracked.get(obj)
+        if fields is None or field not in fields:
+            return
+        self.used_points -= fields.pop(field).points
+        if not fields:
+            del self._tracked[obj]
+            dataship_object.unsubscribe(obj, self._record)
+
+    #############################################
+    ## Function: get
+    ## History of obj.field. None if it's not tracked.
+    def get(self, obj, field):
+        fields = self._tracked.get(_live(obj))
+        if fields is None:
+            return None
+        return fields.get(field)
+
+    # called by bump() on the input's thread.
+    def _record(self, obj):
+        fields = self._tracked.get(obj)
+        if not fields:
+            return
+        t = self.clock()
+        for field, history in list(fields.items()):
+            history.add(getattr(obj, field, None), t)
+
+    #############################################
+    ## queries. all return None if the field isn't tracked or there isn't enough history.
+    ## windows are the last seconds before now. (so a field that stops updating goes to None)
+    def valueAgo(self, obj, field, seconds):
+        history = self.get(obj, field)
+        return history.valueAgo(seconds, self.clock()) if history is not None else None
+
+    def rate(self, obj, field, seconds):
+        history = self.get(obj, field)
+        return history.rate(seconds, self.clock()) if history is not None else None
+
+    #############################################
+    ## Function: trend
+    ## value ahead seconds from now if it keeps changing at the rate of the last window seconds.
+    def trend(self, obj, field, ahead, window=3):
+        history = self.get(obj, field)
+        if history is None:
+            return None
+        rate = history.rate(window, self.clock())
+        last = history.last()
+        if rate is None or last is None:
+            return None
+        return last + rate * ahead
+
+    def mean(self, obj, field, seconds):
+        history = self.get(obj, field)
+        return history.mean(seconds, now=self.clock()) if history is not None else None
+
+    def min(self, obj, field, seconds):
+        history = self.get(obj, field)
+        return history.min(seconds, now=self.clock()) if history is not None else None
+
+    def max(self, obj, field, seconds):
+        history = self.get(obj, field)
+        return history.max(seconds, now=self.clock()) if history is not None else None
+
+
+# the live data object for a snapshot. (see DataObject.snapshot)
+def _live(obj):
+    live = getattr(obj, '_live', None)
+    return live if live is not None else obj
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
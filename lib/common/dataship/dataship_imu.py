@@ -1,4 +1,5 @@
 from enum import Enum
+from lib.common.dataship.dataship_object import DataObject
 
 ## Enum: Purpose
 class IMU_Purpose(Enum):
@@ -9,8 +10,16 @@ class IMU_Purpose(Enum):
 
 #############################################
 ## Class: IMU
-class IMUData(object):
+class IMUData(DataObject):
+    # fixed set of fields. (less memory, faster access and writing a misspelled field is an error)
+    __slots__ = ('inputSrcName', 'inputSrcNum', 'id', 'name', 'purpose', 'address', 'hz', 'pitch', 'roll',
+                 'yaw', 'turn_rate', 'slip_skid', 'mag_head', 'vert_G', 'cali_mag', 'cali_accel',
+                 'cali_gyro', 'cali_sys', 'quat', 'home_pitch', 'home_roll', 'home_yaw', 'org_pitch',
+                 'org_roll', 'org_yaw', 'input', 'inputIndex', 'msg_count', 'msg_last', 'msg_bad',
+                 'msg_unknown')
+
     def __init__(self):
+        DataObject.__init__(self) # version counter and snapshots. (see dataship_object.py)
         self.inputSrcName = None
         self.inputSrcNum = None
 
@@ -31,6 +40,8 @@ class IMUData(object):
         self.cali_mag = None
         self.cali_accel = None
         self.cali_gyro = None
+        self.cali_sys = None
+        self.quat = None # orientation quaternion (if the imu gives one)
 
         self.home_pitch = None
         self.home_roll = None
@@ -41,6 +52,7 @@ class IMUData(object):
         self.org_yaw = None
 
         self.input = None
+        self.inputIndex = None
 
         self.msg_count = 0
         self.msg_last = None
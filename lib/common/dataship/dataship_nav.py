@@ -4,11 +4,21 @@ from enum import Enum
 import inspect
 from typing import List, Any
 import time
+from lib.common.dataship.dataship_object import DataObject
 
 #############################################
 ## Class: NavData
-class NavData(object):
+class NavData(DataObject):
+    # fixed set of fields. (less memory, faster access and writing a misspelled field is an error)
+    __slots__ = ('id', 'name', 'inputSrcName', 'inputSrcNum', 'NavStatus', 'HSISource', 'VNAVSource',
+                 'SourceDesc', 'HSINeedle', 'HSIRoseHeading', 'HSIHorzDev', 'HSIVertDev', 'AP',
+                 'AP_RollForce', 'AP_RollPos', 'AP_RollSlip', 'AP_PitchForce', 'AP_PitchPos', 'AP_PitchSlip',
+                 'AP_YawForce', 'AP_YawPos', 'AP_YawSlip', 'HeadBug', 'AltBug', 'ASIBug', 'VSBug', 'WPDist',
+                 'WPTrack', 'WPName', 'WPLat', 'WPLon', 'ILSDev', 'GSDev', 'GLSHoriz', 'GLSVert',
+                 'XPDR_Status', 'XPDR_Reply', 'XPDR_Code', 'XPDR_Ident', 'msg_count', 'msg_last')
+
     def __init__(self):
+        DataObject.__init__(self) # version counter and snapshots. (see dataship_object.py)
         self.id = None
         self.name = None
         self.inputSrcName = None
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+# Version counters and change notification for the dataship data objects.
+# Every data object (IMUData, GPSData, EngineData...) has a version number. Inputs call bump() once for
+# every message they decode into the object, so anything reading it can keep the version it last used
+# and skip the work if it hasn't changed. (see Module.dataChanged and TextTemplate.render)
+# A version of 0 means the object has never been bumped, so there is no way to tell if it changed.
+#
+# bump() also adds the object to the set of objects changed this frame (see Dataship.nextFrame) and
+# calls any callbacks subscribed to it. (see Dataship.subscribe)
+# Inputs run on their own threads, callbacks are called on the input thread that bumped the object.
+#
+# Snapshots. (so the screen never sees half of a message, like a new pitch with the old roll)
+# The inputs write the fields one at a time on their own threads. bump() then publishes a copy of all
+# the values as one tuple, a single reference assignment so no lock is needed. snapshot() (called by
+# the draw loop, see Dataship.nextFrame) turns the latest published tuple into a copy of the object
+# that the input never writes to. The copy is only made again when something new was published.
+# Lists (EGT, CHT...) are copied when published since the inputs change them in place.
+
+from operator import attrgetter
+from lib.common.helpers.object_fields import slotNames
+
+_changed = set() # objects bumped since the last nextFrame()
+_subscribers = {} # object -> list of callbacks
+_fields = {} # class -> (field names, getter that returns their values as a tuple)
+_BOOKKEEPING = ('_published', '_front', '_live') # slots that are not copied into snapshots
+
+
+#############################################
+## Class: DataObject
+## parent class of the dataship data objects.
+class DataObject(object):
+    __slots__ = ('version',) + _BOOKKEEPING
+    _publish_snapshots = True # False for objects that are too big to copy. (snapshot() returns the object itself)
+
+    def __init__(self):
+        self.version = 0 # bumped once per decoded message.
+        self._published = None # (slot values, __dict__ copy) from the last bump()
+        self._front = None # snapshot made from _published. (made by the draw loop)
+        self._live = None # for a snapshot, the object it was taken from.
+
+    #############################################
+    ## Function: bump
+    ## the object has new data. call once per decoded message, after the fields are set.
+    def bump(self):
+        self.version += 1
+        if self._publish_snapshots:
+            self._publish()
+        _changed.add(self)
+        if _subscribers:
+            callbacks = _subscribers.get(self)
+            if callbacks:
+                for callback in callbacks:
+                    callback(self)
+
+    def _publish(self):
+        names, getter = _fields.get(self.__class__) or _classFields(self.__class__)
+        values = getter(self)
+        for value in values:
+            if value.__class__ is list:
+                values = tuple([list(v) if v.__class__ is list else v for v in values])
+                break
+        d = getattr(self, '__dict__', None) # (classes without __slots__ keep their fields here)
+        if d is not None:
+            d = {k: list(v) if v.__class__ is list else v for k, v in list(d.items())}
+        self._published = (values, d)
+
+    #############################################
+    ## Function: snapshot
+    ## copy of the object as of the last bump(). the object itself if nothing has been published yet.
+    ## works on a snapshot too (gives the latest one) so a module can do self.imuData = self.imuData.snapshot()
+    ## once per frame and keep using self.imuData.
+    def snapshot(self):
+        live = self._live
+        if live is None:
+            live = self
+        published = live._published
+        if published is None:
+            return live
+        front = live._front
+        if front is None or front._published is not published:
+            front = live._makeSnapshot(published)
+            live._front = front
+        return front
+
+    def _makeSnapshot(self, published):
+        cls = self.__class__
+        names, getter = _fields.get(cls) or _classFields(cls)
+        values, d = published
+        front = cls.__new__(cls)
+        for name, value in zip(names, values):
+            object.__setattr__(front, name, value)
+        if d is not None:
+            front.__dict__.update(d)
+        front._published = published
+        front._front = None
+        front._live = self
+        return front
+
+
+#############################################
+## Function: _classFields
+## names of the fields copied into snapshots and a getter for their values. worked out once per class.
+def _classFields(cls):
+    names = tuple(name for name in slotNames(cls) if name not in _BOOKKEEPING)
+    if len(names) == 1:
+        name = names[0]
+        getter = lambda obj: (getattr(obj, name),)
+    else:
+        getter = attrgetter(*names)
+    _fields[cls] = (names, getter)
+    return _fields[cls]
+
+
+#############################################
+## Function: subscribe
+## call callback(obj) every time obj is bumped.
+def subscribe(obj, callback):
+    callbacks = _subscribers.get(obj)
+    if callbacks is None:
+        _subscribers[obj] = [callback]
+    elif callback not in callbacks:
+        callbacks.append(callback)
+
+
+#############################################
+## Function: unsubscribe
+def unsubscribe(obj, callback):
+    callbacks = _subscribers.get(obj)
+    if callbacks and callback in callbacks:
+        callbacks.remove(callback)
+        if not callbacks:
+            del _subscribers[obj]
+
+
+#############################################
+## Function: takeChanged
+## objects bumped since the last call. (a new set is started for the next frame)
+def takeChanged():
+    global _changed
+    changed = _changed
+    _changed = set()
+    return changed
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
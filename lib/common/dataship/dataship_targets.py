@@ -1,13 +1,26 @@
 import time
 import math
+import heapq
+import itertools
+import numpy as np
+from collections import deque
 from geographiclib.geodesic import Geodesic
 from lib.common.dataship.dataship_gps import GPSData
 from lib.common import shared # global shared objects stored here.
+from lib.common.helpers import range_bearing
+from lib.common.helpers.spatial_grid import SpatialGrid
+from lib.common.helpers import traffic_cpa
+from lib.common.helpers import dead_reckon
+from lib.common.helpers.track_history import TrackHistory, MILES_PER_DEG_LAT
+from lib.common.dataship.dataship_object import DataObject
 
 
 # class to store messages received from a target.
 # used for meshtastic nodes.
 class TargetPayloadMessage(object):
+    # fixed set of fields. (less memory, faster access and writing a misspelled field is an error)
+    __slots__ = ('address', 'callsign', 'to_address', 'payload', 'time')
+
     def __init__(self, from_address: str, from_callsign: str, to_address: str = None, payload: str = None):
         self.address = from_address
         self.callsign = from_callsign
@@ -17,12 +30,20 @@ class TargetPayloadMessage(object):
 
 # Target class
 class Target(object):
+    # fixed set of fields. (less memory, faster access and writing a misspelled field is an error)
+    __slots__ = ('inputSrcName', 'inputSrcNum', 'callsign', 'flightNumber', 'commercialName', 'faa_db_record', 'source',
+                 'aStat', 'type', 'address', 'cat', 'buoyNum', 'misc', 'NIC', 'NACp', 'lat', 'lon', 'alt',
+                 'track', 'speed', 'vspeed', 'time', 'dist', 'brng', 'altDiff', 'fix_time', 'dr_dist',
+                 'dr_brng', 'dr_alt', 'dr_altDiff', 'cpa_dist', 'tcpa', 'threat_level', 'old',
+                 'payload_last', 'meshtastic_node', 'targetDirection', 'targetBrngToUse')
+
     def __init__(self, callsign):
         self.inputSrcName = None
         self.inputSrcNum = None
 
         self.callsign = callsign
         self.flightNumber = None # if flight has a flight number then set it here.
+        self.commercialName = None # airline name from the flight number. (if any)
         self.faa_db_record = None # faa database record for this target (if found)
         self.source = None
         self.aStat = None
@@ -56,7 +77,7 @@ class Target(object):
         self.alt = None      # altitude above ground in ft.
         self.track = None  # The resolution is in units of 360/256 degrees (approximately 1.4 degrees).
                         # if misc field tt says track is unknown then track should not be used.
-        self.speed = 0 # 0xFFF is reserved to convey that no horizontal velocity information is available.
+        self.speed = 0 # knots. (inputs that get mph or m/s convert) 0xFFF is reserved to convey that no horizontal velocity information is available.
         self.vspeed = 0 # +/- 32,576 FPM, in units of 64 feet per minute (FPM)
                         # The value 0x800 is reserved to convey that no vertical velocity information is available. The values 0x1FF through 0x7FF and 0x801 through 0xE01 are not used.
 
@@ -65,13 +86,36 @@ class Target(object):
         self.dist = None     # distance in miles to target from self.
         self.brng = None     # bearing to target from self
         self.altDiff = None  # difference in alt from self. (in feet MSL)
+        self.fix_time = 0    # unix time (not rounded) the position was received. (for dead reckoning)
+
+        # dead reckoned position. (set by TargetData.extrapolate, None if no position)
+        self.dr_dist = None
+        self.dr_brng = None
+        self.dr_alt = None
+        self.dr_altDiff = None
+
+        # collision risk. (set by TargetData.updateThreats, see traffic_cpa.py)
+        self.cpa_dist = None # miles at closest point of approach.
+        self.tcpa = None     # seconds to closest point of approach. 0 if moving apart.
+        self.threat_level = 0 # traffic_cpa.THREAT_NONE, THREAT_PROXIMATE, THREAT_ADVISORY or THREAT_ALERT
+        self.old = False # set when the target is removed for not being heard from.
 
         # last payload message received from this target.
         self.payload_last: TargetPayloadMessage | None = None
 
-        self.age = 0
         self.meshtastic_node = None
 
+        # screen position info set by the traffic scope.
+        self.targetDirection = None
+        self.targetBrngToUse = None
+
+    # seconds since this target was last heard. (worked out when it's read)
+    @property
+    def age(self):
+        if not self.time:
+            return 0
+        return int(time.time() - self.time)
+
     def get_cat_name(self):
         if self.cat == 1:
             return "Light"
@@ -121,8 +165,11 @@ class Target(object):
 
 #############################################
 ## Class: TargetData
-class TargetData(object):
+class TargetData(DataObject):
+    _publish_snapshots = False # too big to copy. (each Target is replaced whole when it's updated, see replace)
+
     def __init__(self):
+        DataObject.__init__(self) # version counter and snapshots. (see dataship_object.py)
         self.id = None
         self.name = None
 
@@ -131,7 +178,7 @@ class TargetData(object):
         self.src_lon = None
         self.src_alt = None
         self.src_gndtrack = None
-        self.src_gndspeed = None
+        self.src_gndspeed = None # knots.
         self.lcl_time_string = ""
         self.src_gps: GPSData | None = None  # if set then use this gps data as the source gps.
 
@@ -140,10 +187,38 @@ class TargetData(object):
 
         self.src_meshtastic_input: meshtastic | None = None
 
+        # targets are stored in a plain list (so modules can just loop through them) plus dicts
+        # to find a target by address or callsign without searching the list.
+        # (the dicts start with _ so they don't show up in the dataship field list)
         self.targets: list[Target] = [] # list of targets
+        self._target_index: dict = {} # target key (icao address, else callsign) -> position in self.targets
+        self._targets_by_callsign: dict = {} # callsign -> target key
+        self._rangeBearing = range_bearing.RangeBearing() # target positions (same index as self.targets) for batch range/bearing.
+        self._grid = SpatialGrid() # target key by lat/lon grid cell. (see targetsWithin)
+        self._cpa = traffic_cpa.TrafficCPA() # target motion (same index as self.targets) for batch cpa/tcpa.
+        self._threat_time = 0
+        self.threat_update_interval = 0.1 # seconds. most often threats are worked out.
+        self.threat_level = 0 # highest threat level of any target.
+        # dead reckoning. targets (and ownship) are moved along their track from their last fix. see extrapolate()
+        self.dead_reckon_max = 5 # seconds. don't extrapolate further than this past the last fix.
+        self.dead_reckon_great_circle = False
+        self._dr_time = None # time of the last extrapolate()
+        self._src_fix_time = None # time ownship last moved.
+        self._history = TrackHistory() # past positions of each target (same index as self.targets). see getTrack/getTrail
         self.buoyCount = 0
+        self._buoy_keys: set = set() # keys of buoy targets. (they are updated by cleanUp)
         self.selected_target = None
 
+        # targets not heard from in target_max_age seconds are removed by cleanUp.
+        # expiry heap of (time target could expire, seq, key). only one entry per target, when it's popped and the
+        # target has been heard since then it's pushed back with the new time. (so cleanUp only looks at
+        # targets that are due instead of every target)
+        self.target_max_age = 100
+        self._expiry_heap: list = []
+        self._expiry_seq = itertools.count() # tie breaker. (keys can be int or str so they can't be compared)
+        self._expiry_queued: dict = {} # key -> seq of its entry in the heap. (older entries for the key are dropped when popped)
+        self.expired_count = 0 # targets removed because they got too old
+
         # messages count (number of input messages received from this source)
         self.msg_count = 0
         self.msg_last = None
@@ -159,24 +234,48 @@ class TargetData(object):
         # check if we should ignore traffic beyond a certain distance (in miles.)
         self.ignore_traffic_beyond_distance = 30
 
-        # list of target messages
-        self.target_payload_messages: list[TargetPayloadMessage] = []
+        # lat/lon box around the traffic source that covers ignore_traffic_beyond_distance.
+        # traffic outside the box is rejected before any other work is done. (see inRangeBox)
+        self._range_box = None # (min lat, max lat, lon half width) or None if unknown
+        self._range_box_dist = None # ignore_traffic_beyond_distance the box was made for
+        self.prefilter_checked = 0 # positions checked against the box
+        self.prefilter_rejects = 0 # positions outside the box
+
+        # ICAO address map and FAA lookup cache stats. (set by the input, see stratux_wifi)
+        self.address_cache_size = 0
+        self.address_cache_hits = 0
+        self.address_cache_misses = 0
+        self.address_cache_evictions = 0 # timed out or dropped because the map was full
+        self.faa_cache_hits = 0
+        self.faa_cache_misses = 0
+
+        # last payload messages received from all targets, and the last few from each address.
+        self.max_payload_messages = 10
+        self.target_payload_messages: deque[TargetPayloadMessage] = deque(maxlen=self.max_payload_messages)
+        self._payload_messages_by_address: dict = {} # address -> deque of TargetPayloadMessage
 
     def add_target_payload_message(self, from_address: str, from_callsign: str, to_address: str, payload: str):
         tPayload = TargetPayloadMessage(from_address, from_callsign, to_address, payload)
-        self.target_payload_messages.append(tPayload)
-        # only keep the last 10 messages for each callsign.
-        self.target_payload_messages = self.target_payload_messages[-10:]
-        # check if the callsign is in the list of targets.
-        for target in self.targets:
-            if target.address == to_address:
-                target.payload_last = self.target_payload_messages[-1]
-                break
+        self.target_payload_messages.append(tPayload) # only keeps the last max_payload_messages.
+        # keep the last few messages from each address.
+        messages = self._payload_messages_by_address.get(from_address)
+        if messages is None:
+            messages = deque(maxlen=self.max_payload_messages)
+            self._payload_messages_by_address[from_address] = messages
+        messages.append(tPayload)
+        # check if the to address is in the list of targets.
+        target = self.getTargetByAddress(to_address)
+        if target is not None:
+            target.payload_last = tPayload
+        self.bump()
         #print(f"add_target_payload_message: {self.target_payload_messages}")
 
     def get_target_payload_messages(self, address: str) -> list[TargetPayloadMessage]:
         # get all messages for a given address.
-        return [ msg for msg in self.target_payload_messages if msg.address == address ]
+        messages = self._payload_messages_by_address.get(address)
+        if messages is None:
+            return []
+        return list(messages)
 
     def get_all_messages_as_text(self) -> str:
         # go through self.target_payload_messages and get the last payload message and add it to a list.
@@ -188,42 +287,291 @@ class TargetData(object):
 
     def get_last_target_payload_message(self, address: str) -> TargetPayloadMessage | None:
         #print(f"get_last_target_payload_message: {address}")
-        messages = self.get_target_payload_messages(address)
-        if len(messages) > 0:
-            #print(f"get_last_target_payload_message(): {messages[-1]}")
+        messages = self._payload_messages_by_address.get(address)
+        if messages:
             return messages[-1]
         return None
 
     def get_selected_target(self) -> Target | None:
-        # find the target that has the same address as the selected target.
-        for target in self.targets:
-            if target.callsign == self.selected_target:
-                return target
-        return None
-
-    def contains(self, target: Target): # search for callsign
-        for x in self.targets:
-            if x.address == target.address:
-                return True
-            if x.callsign == target.callsign:
-                return True
-        return False
+        # find the target that has the same callsign as the selected target.
+        if self.selected_target is None:
+            return None
+        return self.getTargetByCallsign(self.selected_target)
+
+    #############################################
+    ## Function: targetKey
+    ## targets are keyed by address (icao address, meshtastic node id, buoy number). if no address then by callsign.
+    def targetKey(self, target: Target):
+        if target.address is not None and target.address != "":
+            return target.address
+        return target.callsign
+
+    def getTargetByAddress(self, address) -> Target | None:
+        i = self._target_index.get(address)
+        if i is None:
+            return None
+        return self.targets[i]
+
+    def getTargetByCallsign(self, callsign) -> Target | None:
+        key = self._targets_by_callsign.get(callsign)
+        if key is None:
+            return None
+        return self.getTargetByAddress(key)
+
+    def contains(self, target: Target): # search for address or callsign
+        if self.targetKey(target) in self._target_index:
+            return True
+        return target.callsign in self._targets_by_callsign
 
     def remove(self, callsign): # callsign to remove
-        for i, t in enumerate(self.targets):
-            if t.callsign == callsign:
-                del self.targets[i]
-                return
+        key = self._targets_by_callsign.get(callsign)
+        if key is not None:
+            self.removeKey(key)
+
+    #############################################
+    ## Function: removeKey
+    ## remove a target by key. the last target in the list is moved into its spot so nothing is shifted.
+    def removeKey(self, key):
+        i = self._target_index.pop(key, None)
+        if i is None:
+            return
+        target = self.targets[i]
+        if self._targets_by_callsign.get(target.callsign) == key:
+            del self._targets_by_callsign[target.callsign]
+        self._buoy_keys.discard(key)
+        self._grid.remove(key)
+        last = self.targets.pop()
+        if i < len(self.targets):
+            self.targets[i] = last
+            self._target_index[self.targetKey(last)] = i
+            self._rangeBearing.moveSlot(len(self.targets), i)
+            self._cpa.moveSlot(len(self.targets), i)
+            self._history.moveSlot(len(self.targets), i)
+        self._rangeBearing.clearSlot(len(self.targets))
+        self._cpa.clearSlot(len(self.targets))
+        self._history.clearSlot(len(self.targets))
+        self.count = len(self.targets)
+        self.bump()
+
+    def replace(self,target:Target): # replace target with new one.. (or add it if not found)
+        key = self.targetKey(target)
+        i = self._target_index.get(key)
+        if i is None:
+            i = len(self.targets)
+            self._target_index[key] = i
+            self.targets.append(target)
+            if key not in self._expiry_queued: # (still queued if it was removed and came back)
+                seq = next(self._expiry_seq)
+                self._expiry_queued[key] = seq
+                heapq.heappush(self._expiry_heap, (target.time + self.target_max_age, seq, key))
+        else:
+            old = self.targets[i]
+            if old.callsign != target.callsign and self._targets_by_callsign.get(old.callsign) == key:
+                del self._targets_by_callsign[old.callsign]
+            self.setTargetThreat(target, i) # keep the last cpa/threat until the next updateThreats.
+            self.targets[i] = target
+        self._targets_by_callsign[target.callsign] = key
+        if target.buoyNum != None:
+            self._buoy_keys.add(key)
+        self._rangeBearing.setPosition(i, target.lat, target.lon)
+        self._cpa.setMotion(i, target.speed, target.track, target.vspeed, target.alt, target.type == 100, target.fix_time or target.time or None)
+        if target.type != 100:
+            self._history.add(i, target.lat, target.lon, target.alt, target.time or time.time())
+        self._grid.update(key, target, target.lat, target.lon)
+        self.count = len(self.targets)
 
-    def replace(self,target:Target): # replace target with new one..
-        for i, t in enumerate(self.targets):
-            if t.address == target.address:
-                self.targets[i] = target
-                return
+    #############################################
+    ## Function: setSrcLocation
+    ## set the traffic source (ownship) location. if it moved then update range/bearing to every target.
+    ## gndspeed is in knots. (same as Target.speed)
+    def setSrcLocation(self, lat, lon, alt=None, gndtrack=None, gndspeed=None):
+        self.src_lat = lat
+        self.src_lon = lon
+        self.src_alt = alt
+        self.src_gndtrack = gndtrack
+        self.src_gndspeed = gndspeed
+        if lat is None or lon is None:
+            return
+        moved = lat != self._rangeBearing.src_lat or lon != self._rangeBearing.src_lon
+        if moved:
+            self._src_fix_time = time.time()
+            self.updateRangeBox()
+            self.updateRangeBearing()
+        self.updateThreats(solved=moved)
+
+    #############################################
+    ## Function: updateRangeBox
+    ## make the lat/lon box around the traffic source for ignore_traffic_beyond_distance. (once per ownship update)
+    ## the box is a little bigger than the range so it never rejects a target that is in range.
+    def updateRangeBox(self):
+        self._range_box_dist = self.ignore_traffic_beyond_distance
+        if self.src_lat is None or self.src_lon is None or not self.ignore_traffic_beyond_distance:
+            self._range_box = None
+            return
+        miles = self.ignore_traffic_beyond_distance * 1.01
+        dlat = miles / 68.7 # 68.7 miles is the shortest degree of latitude. (at the equator)
+        maxLat = min(abs(self.src_lat) + dlat, 90)
+        if maxLat >= 89:
+            dlon = 180 # near the pole. any longitude.
+        else:
+            # a degree of longitude is 69.17 miles * cos(lat) at the equator. use the lat furthest from the equator.
+            dlon = min(miles / (69.17 * math.cos(math.radians(maxLat))), 180)
+        self._range_box = (self.src_lat - dlat, self.src_lat + dlat, dlon)
+
+    #############################################
+    ## Function: inRangeBox
+    ## quick check if a position could be within ignore_traffic_beyond_distance of the traffic source.
+    ## returns True if we don't know yet. (no source location or no distance limit)
+    def inRangeBox(self, lat, lon):
+        if self._range_box_dist != self.ignore_traffic_beyond_distance:
+            self.updateRangeBox()
+        box = self._range_box
+        if box is None or lat is None or lon is None:
+            return True
+        self.prefilter_checked += 1
+        if lat < box[0] or lat > box[1] or abs((lon - self.src_lon + 180) % 360 - 180) > box[2]:
+            self.prefilter_rejects += 1
+            return False
+        return True
+
+    #############################################
+    ## Function: updateRangeBearing
+    ## recompute distance, bearing and alt difference to all targets in one pass. (once per ownship update)
+    def updateRangeBearing(self):
+        count = len(self.targets)
+        self._rangeBearing.solveAll(count, self.src_lat, self.src_lon)
+        dists = self._rangeBearing.dist[:count].tolist()
+        brngs = self._rangeBearing.brng[:count].tolist()
+        src_alt = self.src_alt
+        for i, target in enumerate(self.targets):
+            self.setTargetRangeBearing(target, dists[i], brngs[i])
+            if target.alt != None and src_alt != None:
+                target.altDiff = target.alt - src_alt
+
+    #############################################
+    ## Function: updateThreats
+    ## cpa, tcpa and threat level for every target in one pass. (at most every threat_update_interval seconds)
+    ## solved is True if the range/bearing arrays were just updated.
+    def updateThreats(self, solved=False):
+        now = time.monotonic()
+        if now - self._threat_time < self.threat_update_interval:
+            return
+        self._threat_time = now
+        count = len(self.targets)
+        rb = self._rangeBearing
+        if not solved:
+            rb.solveAll(count, self.src_lat, self.src_lon) # targets may have moved since ownship did.
+        self._cpa.solveAll(count, rb.dist, rb.brng, self.src_gndspeed, self.src_gndtrack, self.src_alt)
+        cpas = self._cpa.cpa[:count].tolist()
+        tcpas = self._cpa.tcpa[:count].tolist()
+        threats = self._cpa.threat[:count].tolist()
+        for i, target in enumerate(self.targets[:count]):
+            cpa = cpas[i]
+            if cpa != cpa: # NaN. no position.
+                target.cpa_dist = target.tcpa = None
+            else:
+                target.cpa_dist = round(cpa, 3)
+                target.tcpa = round(tcpas[i], 1)
+            target.threat_level = threats[i]
+        self.threat_level = max(threats) if threats else 0
+
+    #############################################
+    ## Function: setTargetThreat
+    ## set cpa_dist, tcpa and threat_level on a target from the last updateThreats for slot i.
+    def setTargetThreat(self, target: Target, i):
+        m = self._cpa
+        cpa = float(m.cpa[i])
+        if cpa != cpa: # NaN. not solved yet.
+            target.cpa_dist = target.tcpa = None
+        else:
+            target.cpa_dist = round(cpa, 3)
+            target.tcpa = round(float(m.tcpa[i]), 1)
+        target.threat_level = int(m.threat[i])
+
+    #############################################
+    ## Function: extrapolate
+    ## dead reckon every target (and ownship) to time t (default now) and set dr_dist, dr_brng, dr_alt and dr_altDiff
+    ## on each target. for drawing smooth motion between position reports, call once per frame.
+    def extrapolate(self, t=None):
+        if t is None:
+            t = time.time()
+        if self._dr_time is not None and 0 <= t - self._dr_time < 0.01:
+            return # already done this frame. (by another module)
+        self._dr_time = t
+        count = len(self.targets)
+        if count == 0 or self.src_lat is None or self.src_lon is None:
+            return
+        rb = self._rangeBearing
+        m = self._cpa
+        great_circle = self.dead_reckon_great_circle
+
+        # ownship.
+        srcLat, srcLon = self.src_lat, self.src_lon
+        if self.src_gndspeed and self.src_gndtrack is not None and self._src_fix_time is not None:
+            dt = min(max(t - self._src_fix_time, 0), self.dead_reckon_max)
+            srcLat, srcLon = dead_reckon.extrapolate(srcLat, srcLon, self.src_gndtrack, self.src_gndspeed, dt, great_circle)
+            srcLat, srcLon = float(srcLat), float(srcLon)
+
+        # targets. (unknown speed/track/fix time means not moving. buoys never move)
+        dt = np.clip(np.nan_to_num(t - m.fix_time[:count]), 0, self.dead_reckon_max)
+        dt[m.ignore[:count]] = 0
+        lat, lon = dead_reckon.extrapolate(rb.lat[:count], rb.lon[:count], np.nan_to_num(m.track[:count]),
+                                           np.nan_to_num(m.speed[:count]), dt, great_circle)
+        alt = m.alt[:count] + np.nan_to_num(m.vspeed[:count]) * dt / 60
+        dist, brng = range_bearing.solveArrays(srcLat, srcLon, lat, lon)
+        dists = (dist * range_bearing.METERS_TO_MILES).tolist()
+        brngs = np.mod(brng, 360.0).tolist()
+        alts = alt.tolist()
+        src_alt = self.src_alt
+        for i, target in enumerate(self.targets[:count]):
+            d = dists[i]
+            if d != d: # NaN. no position.
+                target.dr_dist = target.dr_brng = None
+            else:
+                target.dr_dist = d
+                target.dr_brng = brngs[i]
+            a = alts[i]
+            target.dr_alt = None if a != a else a
+            target.dr_altDiff = None if a != a or src_alt is None else a - src_alt
+
+    #############################################
+    ## Function: positionAt
+    ## dead reckoned (lat, lon, alt) of one target at time t (default now). alt is None if unknown.
+    def positionAt(self, target: Target, t=None, great_circle=None):
+        if target.lat is None or target.lon is None:
+            return None, None, None
+        if t is None:
+            t = time.time()
+        if great_circle is None:
+            great_circle = self.dead_reckon_great_circle
+        dt = min(max(t - (target.fix_time or target.time), 0), self.dead_reckon_max)
+        if target.type == 100:
+            dt = 0 # buoys don't move.
+        lat, lon = dead_reckon.extrapolate(target.lat, target.lon, target.track or 0, target.speed or 0, dt, great_circle)
+        alt = target.alt
+        if alt is not None and target.vspeed:
+            alt = alt + target.vspeed * dt / 60
+        return float(lat), float(lon), alt
+
+    #############################################
+    ## Function: setTargetRangeBearing
+    ## dist in miles, brng in degrees. (-180 to 180 or 0 to 360)
+    def setTargetRangeBearing(self, target: Target, dist, brng):
+        if(dist!=dist):
+            # NaN. no distance found. (no position)
+            pass
+        elif(dist<500):
+            target.dist = round(dist, 3)
+            if(brng!=brng):
+                #its NaN.
+                target.brng = None
+            else:
+                target.brng = round(brng % 360, 2) # convert foward azimuth to bearing to.
 
     # add or replace a target.
     def addTarget(self, target:Target):
-        target.time = int(time.time()) # always update the time when this target was added/updated..
+        target.fix_time = time.time()
+        target.time = int(target.fix_time) # always update the time when this target was added/updated..
 
         # check if the target.callsign is set.. if not then set it to the address.
         if target.callsign == None or target.callsign == "":
@@ -232,41 +580,31 @@ class TargetData(object):
             else:
                 target.callsign = "Unknown"
 
-        # if dist&brng was not calculated... check distance and brng to target. if we know our location..
-        # use geographiclib to solve this.
-        # https://geographiclib.sourceforge.io/1.46/python/code.html#geographiclib.geodesic.Geodesic.Direct
+        # if we know our location then get distance and brng to target.
         # use lat/lon from traffic source.
 
         # check if target does not have a lat/lon.  if so then check if we have that target.address in our list of targets. and use that target's lat/lon.
         if target.lat == None or target.lon == None:
-            for t in self.targets:
-                if t.address == target.address:
-                    target.lat = t.lat
-                    target.lon = t.lon
-                    break
+            t = self.getTargetByAddress(target.address)
+            if t is not None:
+                target.lat = t.lat
+                target.lon = t.lon
 
         if(self.src_gps != None):
-            self.src_lat = self.src_gps.Lat
-            self.src_lon = self.src_gps.Lon
-            self.src_alt = self.src_gps.Alt
-            self.src_gndtrack = self.src_gps.GndTrack
-            self.src_gndspeed = self.src_gps.GndSpeed
+            gndspeed = self.src_gps.GndSpeed
+            if gndspeed is not None:
+                gndspeed = gndspeed * 0.8689758 # GPSData is mph. convert to knots.
+            self.setSrcLocation(self.src_gps.Lat, self.src_gps.Lon, self.src_gps.Alt, self.src_gps.GndTrack, gndspeed)
+
+        # quick check if the target is way out of range before solving for distance.
+        if(target.type != 101 and not self.inRangeBox(target.lat, target.lon)):
+            self.removeKey(self.targetKey(target))
+            return
 
         if(self.src_lat != None and self.src_lon != None and target.lat != None and target.lon != None):
-            solve = Geodesic.WGS84.Inverse(self.src_lat,self.src_lon,target.lat,target.lon)
-            brng = solve['azi1'] # forward azimuth.
-            dist = solve['s12'] * 0.0006213712 # convert to miles.
-            #print(f"{target.callsign} dist:{dist} brng:{brng}")
-            if(dist!=dist):
-                # NaN. no distance found.  
-                pass
-            elif(dist<500):
-                target.dist = round(dist, 3)
-                if(brng<0): target.brng = 360 - (abs(brng)) # convert foward azimuth to bearing to.
-                elif(brng!=brng):
-                    #its NaN.
-                    target.brng = None
-                else: target.brng = round(brng, 2)
+            # closed form wgs84 solve. (see range_bearing.py for accuracy)
+            dist, brng = range_bearing.solve(self.src_lat, self.src_lon, target.lat, target.lon)
+            self.setTargetRangeBearing(target, dist * range_bearing.METERS_TO_MILES, brng)
 
         # target is beyond distance that we want to listen to.. so bye bye baby!
         # don't ignore meshtastic nodes.
@@ -274,8 +612,7 @@ class TargetData(object):
             if(self.ignore_traffic_beyond_distance != 0):
                 if(target.dist == None or target.dist > self.ignore_traffic_beyond_distance):
                     # remove it.
-                    if(self.contains(target)):
-                        self.remove(target.callsign)
+                    self.removeKey(self.targetKey(target))
                     self.count = len(self.targets)
                     #print(f"ignoring target: {target.callsign} dist:{target.dist} > ignore_traffic_beyond_distance:{self.ignore_traffic_beyond_distance}")
                     return
@@ -292,48 +629,122 @@ class TargetData(object):
         # update the last payload message received from this target.
         target.payload_last = self.get_last_target_payload_message(target.address)
 
-        if(self.contains(target)==False):
-            #print(f"Adding target: {target.callsign}")
-            self.targets.append(target)
-        else:
-            #print(f"Replacing target: {target.callsign}")
-            self.replace(target)
-
-        self.count = len(self.targets)
+        self.replace(target) # add or replace.
 
     # get nearest target (if any)
     def getNearestTarget(self,lessThenMilage=15) -> Target | None: 
-        nearest = None
-        for i, t in enumerate(self.targets):
-            if(self.targets[i].dist != None and self.targets[i].dist <= lessThenMilage):
-                if(nearest != None):
-                    if (self.targets[i].dist < nearest.dist):
-                        nearest = self.targets[i]
-                else:
-                    nearest = self.targets[i]
-        
-        return nearest
+        nearest = self.nearestTargets(1, lessThenMilage)
+        if nearest:
+            return nearest[0]
+        return None
 
-    # go through targets, update,  and remove old ones.
+    #############################################
+    ## Function: _candidates
+    ## targets that could be within miles of the traffic source. (from the spatial grid)
+    def _candidates(self, miles):
+        if self.src_lat is None or self.src_lon is None:
+            return self.targets # don't know where we are. (targets won't have a distance either)
+        if self.ignore_traffic_beyond_distance and miles >= self.ignore_traffic_beyond_distance:
+            return self.targets # everything we keep is in range. (except meshtastic nodes, they are filtered by distance after)
+        return self._grid.targetsNear(self.src_lat, self.src_lon, miles)
+
+    #############################################
+    ## Function: targetsWithin
+    ## targets with a distance and bearing that are less than miles away.
+    def targetsWithin(self, miles) -> list[Target]:
+        return [t for t in self._candidates(miles) if t.dist is not None and t.dist < miles and t.brng is not None]
+
+    #############################################
+    ## Function: targetsInSector
+    ## targets less than miles away with a bearing within half_width degrees either side of heading.
+    def targetsInSector(self, miles, heading, half_width) -> list[Target]:
+        if heading is None:
+            return []
+        if half_width >= 180:
+            return self.targetsWithin(miles)
+        # bearing range (0-360). if it crosses north then it's lo to 360 or 0 to hi.
+        lo = (heading - half_width) % 360
+        hi = (heading + half_width) % 360
+        if lo <= hi:
+            return [t for t in self._candidates(miles) if t.dist is not None and t.dist < miles and t.brng is not None and lo <= t.brng <= hi]
+        return [t for t in self._candidates(miles) if t.dist is not None and t.dist < miles and t.brng is not None and (t.brng >= lo or t.brng <= hi)]
+
+    #############################################
+    ## Function: nearestTargets
+    ## the k nearest targets (closest first) within miles.
+    def nearestTargets(self, k, miles=15) -> list[Target]:
+        targets = [t for t in self._candidates(miles) if t.dist is not None and t.dist <= miles]
+        return heapq.nsmallest(k, targets, key=lambda t: t.dist)
+
+    #############################################
+    ## Function: getTrack
+    ## past positions of a target, oldest first. list of (lat, lon, alt, time). (alt is None if unknown)
+    ## max_age in seconds, max_points thins out the track evenly. (see TrackHistory.get)
+    def getTrack(self, target: Target, max_age=None, max_points=None) -> list:
+        i = self._target_index.get(self.targetKey(target))
+        if i is None:
+            return []
+        lats, lons, alts, times = self._history.get(i, max_age, time.time(), max_points)
+        return [(lat, lon, None if alt != alt else alt, t) for lat, lon, alt, t in zip(lats.tolist(), lons.tolist(), alts.tolist(), times.tolist())]
+
+    #############################################
+    ## Function: getTrail
+    ## past positions of a target as a polyline for drawing. list of (x, y) miles east/north of the traffic source,
+    ## oldest first. (doesn't include the current position, draw from the last point to the target)
+    def getTrail(self, target: Target, max_age=None, max_points=None) -> list:
+        if self.src_lat is None or self.src_lon is None:
+            return []
+        i = self._target_index.get(self.targetKey(target))
+        if i is None:
+            return []
+        lats, lons, alts, times = self._history.get(i, max_age, time.time(), max_points)
+        if len(lats) == 0:
+            return []
+        y = (lats - self.src_lat) * MILES_PER_DEG_LAT
+        x = ((lons - self.src_lon + 180) % 360 - 180) * MILES_PER_DEG_LAT * math.cos(math.radians(self.src_lat))
+        return list(zip(x.tolist(), y.tolist()))
+
+    #############################################
+    ## Function: cleanUp
+    ## update buoys and remove targets we haven't heard from in target_max_age seconds.
+    ## only targets that are due are looked at so this is cheap to call often.
     def cleanUp(self,dataship):
-        for i, t in enumerate(self.targets):
-            self.targets[i].age = int(time.time() - self.targets[i].time) # track age last time this target was updated.
-            # check if it's a buoy we dropped.. if so update it.
-            if(self.targets[i].buoyNum != None):
-                self.addTarget(self.targets[i]) # update it by adding it again.
-            # if old target then remove it...    
-            if(self.targets[i].age > 100):
-                self.targets[i].old = True
-                self.remove(self.targets[i].callsign)
+        # buoys are updated by adding them again. (so distance/bearing follow us)
+        for key in list(self._buoy_keys):
+            t = self.getTargetByAddress(key)
+            if t is not None:
+                self.addTarget(t)
+        if self._buoy_keys:
+            self.bump()
+        self.expireTargets(time.time())
+
+    #############################################
+    ## Function: expireTargets
+    ## remove targets not heard from since now - target_max_age.
+    def expireTargets(self, now):
+        heap = self._expiry_heap
+        queued = self._expiry_queued
+        while heap and heap[0][0] < now:
+            due, seq, key = heapq.heappop(heap)
+            if queued.get(key) != seq:
+                continue # old entry. the key has a newer one.
+            t = self.getTargetByAddress(key)
+            if t is None:
+                del queued[key] # already removed.
+                continue
+            expires = t.time + self.target_max_age
+            if expires < now:
+                del queued[key]
+                t.old = True
+                self.removeKey(key)
+                self.expired_count += 1
+            else:
+                heapq.heappush(heap, (expires, seq, key)) # heard since it was pushed. check again later.
 
     # clear all buoy targets
     def clearBuoyTargets(self):
-        numCleared = 0
-        for i, t in enumerate(self.targets):
-            if(self.targets[i].buoyNum != None):
-                numCleared += 1
-                del self.targets[i]
-        if(numCleared>0): self.clearBuoyTargets()
+        for key in list(self._buoy_keys):
+            self.removeKey(key)
 
     def dropTargetBuoy(self,dataship,name=None,speed=None,direction=None,distance=None,alt=None):
         self.buoyCount += 1
@@ -372,12 +783,13 @@ class TargetData(object):
 
         if(speed != None and speed != -1): t.speed = speed
         elif(speed == -1 ):  # if they pass in -1 then use the current speed of aircraft. 
-            if(len(dataship.airspeedData) > 0): t.speed = int(dataship.airspeedData[0].IAS)
-            elif(dataship.gpsData[0].GndSpeed != None and dataship.gpsData[0].GndSpeed != 0 ): t.speed = int(dataship.gpsData[0].GndSpeed)
+            if(len(dataship.airspeedData) > 0): t.speed = int(dataship.airspeedData[0].IAS * 0.8689758) # mph to knots
+            elif(dataship.gpsData[0].GndSpeed != None and dataship.gpsData[0].GndSpeed != 0 ): t.speed = int(dataship.gpsData[0].GndSpeed * 0.8689758)
             else: t.speed = 0
         else:
             t.speed = 100 # default speed?
         self.addTarget(t)
+        self.bump()
         pass
 
     # send a message to a target.
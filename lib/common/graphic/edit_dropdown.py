@@ -14,6 +14,39 @@ COLOR_LIST_INACTIVE = (100, 100, 100)
 COLOR_LIST_ACTIVE = (255, 255, 255)
 
 
+# submenu list that isn't built until something looks inside it. (like opening the submenu)
+# builder returns the list of items. it's known to have items so it's True before it's built.
+class lazy_submenu(list):
+    def __init__(self, builder):
+        list.__init__(self)
+        self.builder = builder
+        self.built = False
+
+    def build(self):
+        if not self.built:
+            self.built = True
+            list.extend(self, self.builder())
+
+    # forget the items. they are built again next time they are looked at.
+    def reset(self):
+        list.clear(self)
+        self.built = False
+
+    def __bool__(self):
+        return not self.built or list.__len__(self) > 0
+
+    def __len__(self):
+        self.build()
+        return list.__len__(self)
+
+    def __iter__(self):
+        self.build()
+        return list.__iter__(self)
+
+    def __getitem__(self, index):
+        self.build()
+        return list.__getitem__(self, index)
+
 class menu_item:
     def __init__(self, text, submenu=None):
         self.text = text
@@ -181,7 +214,10 @@ class DropDown():
             if isinstance(opt, menu_item):
                 # Convert menu_item to DropDownOption
                 submenu_options = None
-                if opt.submenus:
+                if isinstance(opt.submenus, lazy_submenu):
+                    # convert when the submenu is opened.
+                    submenu_options = lazy_submenu(lambda submenus=opt.submenus: self._convert_options(submenus))
+                elif opt.submenus:
                     # Recursively convert submenu items
                     submenu_options = self._convert_options(opt.submenus)
                 converted.append(DropDownOption(opt.text, submenu_options))
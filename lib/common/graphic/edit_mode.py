@@ -105,6 +105,7 @@ def main_edit_loop():
         event_list = pygame.event.get() # get all events
         action_performed = False  # Flag to check if an action was performed
         time_delta = clock.tick(maxframerate) / 1000.0 # get the time delta and limit the framerate.
+        shared.Dataship.nextFrame() # changed data objects and snapshots for this frame. (shared.Dataship.frameView)
 
         ## loop through events and process them
         for event in event_list:
@@ -783,7 +784,7 @@ def main_edit_loop():
             # if multiple objects are selected, don't show the toolbar or if shift is held (shift is for multiple selection)
             shift_held = pygame.key.get_mods() & pygame.KMOD_SHIFT
             shouldDrawToolbar = not len(selected_screen_objects) > 1 and not shift_held
-            sObject.draw(shared.Dataship, shared.smartdisplay, shouldDrawToolbar)
+            sObject.draw(shared.Dataship.frameView, shared.smartdisplay, shouldDrawToolbar)
 
             # draw Options Bar?
             if sObject.selected and sObject.showOptions:
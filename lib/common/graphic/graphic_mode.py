@@ -55,6 +55,7 @@ def main_graphical():
         pygamescreen.fill((0, 0, 0)) # clear screen
         event_list = pygame.event.get() # get all events
         time_delta = clock.tick(maxframerate) / 1000.0 # get the time delta and limit the framerate.
+        shared.Dataship.nextFrame() # changed data objects and snapshots for this frame. (shared.Dataship.frameView)
 
         ## loop through events and process them
         for event in event_list:
@@ -163,7 +164,7 @@ def main_graphical():
                     
         # Draw the modules
         for sObject in shared.CurrentScreen.ScreenObjects:
-            sObject.draw(shared.Dataship, shared.smartdisplay, False)  # Never draw toolbar in view mode
+            sObject.draw(shared.Dataship.frameView, shared.smartdisplay, False)  # Never draw toolbar in view mode
 
         if active_dropdown and active_dropdown.visible:
             # Create a semi-transparent overlay
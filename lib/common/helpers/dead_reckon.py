@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+# Dead reckoning. Where something will be after dt seconds holding its current track and speed.
+# Works on single values or numpy arrays (so every target can be moved in one pass).
+#
+# The default is a flat step (lat += north / 60, lon += east / (60 * cos(lat))), fine for the
+# second or two between traffic reports. great_circle=True follows the great circle instead, for
+# long extrapolations or near the poles.
+
+import numpy as np
+
+EARTH_RADIUS_NM = 3440.065
+
+
+#############################################
+## Function: extrapolate
+## lat/lon in degrees, track in degrees true, speed in knots, dt in seconds. returns (lat, lon).
+def extrapolate(lat, lon, track, speed, dt, great_circle=False):
+    nm = speed * dt / 3600.0
+    trk = np.radians(track)
+    if great_circle:
+        lat1 = np.radians(lat)
+        delta = nm / EARTH_RADIUS_NM # angular distance
+        lat2 = np.arcsin(np.sin(lat1) * np.cos(delta) + np.cos(lat1) * np.sin(delta) * np.cos(trk))
+        dlon = np.arctan2(np.sin(trk) * np.sin(delta) * np.cos(lat1), np.cos(delta) - np.sin(lat1) * np.sin(lat2))
+        newLat = np.degrees(lat2)
+        newLon = lon + np.degrees(dlon)
+    else:
+        newLat = lat + nm * np.cos(trk) / 60.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newLon = lon + nm * np.sin(trk) / (60.0 * np.cos(np.radians(lat)))
+    newLon = (newLon + 180.0) % 360.0 - 180.0
+    return newLat, newLon
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
@@ -1,5 +1,12 @@
 import sqlite3
 import os
+import queue
+import threading
+import weakref
+from collections import OrderedDict
+
+FAA_DB_DIR = "data/system/db"
+FAA_DB_FILE = "faa_aircraft.db"
 
 class FAA_Aircraft:
     """Aircraft class to store aircraft data."""
@@ -39,8 +46,6 @@ class FAA_Aircraft:
         self.aircraft_desc_mfr = ""   # final resolved manufacturer (either from FAA or from kit_mfr)
         self.aircraft_desc_model = "" # final resolved model (either from FAA or from kit_model)
 
-        self.commerical_name = None  # commercial name of the aircraft (if any)
-
 
 def get_aircraft_description(db_file, mfr_mdl_code):
     """Get the manufacturer and model description for an aircraft code."""
@@ -68,43 +73,27 @@ def get_aircraft_description(db_file, mfr_mdl_code):
         return "",""
 
 
-def find_aircraft_by_n_number(n_number)->FAA_Aircraft: # returns an Aircraft object
-    """Search for an aircraft by N-Number using SQLite."""
-    db_dir = "data/system/db"
-    file_name = "faa_aircraft.db"
-    # check if the file exists
-    if not os.path.exists(os.path.join(db_dir, file_name)):
-        return None
-    
-    db_file = os.path.join(db_dir, file_name)
-
+def _clean_n_number(n_number):
     # if it starts with a n or N then remove it
     if n_number.startswith("n") or n_number.startswith("N"):
         n_number = n_number[1:]
+    return n_number
 
-    try:
-        conn = sqlite3.connect(db_file)
-    except sqlite3.OperationalError as e:
-        print(f"Error connecting to SQLite database: {e}")
-        return None
 
-    conn.row_factory = sqlite3.Row  # This enables column access by name
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT * FROM aircraft WHERE n_number = ?', (n_number,))
-    row = cursor.fetchone()
-    
-    if not row:
-        conn.close()
-        return None
-    
-    # Create an aircraft object from the row
+def _mode_s_hex(address):
+    # ICAO 24-bit address as it's stored in the database. (mode_s_code_hex, 6 upper case hex digits)
+    return "%06X" % address
+
+
+def _aircraft_from_row(row, lookup_description)->FAA_Aircraft:
+    """Create an aircraft object from a row of the aircraft table.
+    lookup_description(mfr_mdl_code) returns (mfr, model)."""
     data = {i: row[i] for i in range(len(row))}
     aircraft = FAA_Aircraft(data)
 
     # If the kit_mfr is empty, try to get the manufacturer and model from the FAA database
     if aircraft.kit_mfr == "":
-        aircraft_mfr, aircraft_model = get_aircraft_description(db_file, aircraft.mfr_mdl_code)
+        aircraft_mfr, aircraft_model = lookup_description(aircraft.mfr_mdl_code)
 
         if aircraft_mfr != "":
             aircraft.aircraft_desc_mfr = aircraft_mfr
@@ -120,10 +109,208 @@ def find_aircraft_by_n_number(n_number)->FAA_Aircraft: # returns an Aircraft obj
     # if aircraft.aircraft_desc_mfr is to long then shorten it
     if len(aircraft.aircraft_desc_mfr) > 10:
         aircraft.aircraft_desc_mfr = aircraft.aircraft_desc_mfr[:10]
+    return aircraft
+
+
+def find_aircraft_by_n_number(n_number)->FAA_Aircraft: # returns an Aircraft object
+    """Search for an aircraft by N-Number using SQLite.
+    Opens the database for each call. Inputs should use FAALookupService (get_faa_lookup_service) instead."""
+    db_file = os.path.join(FAA_DB_DIR, FAA_DB_FILE)
+    # check if the file exists
+    if not os.path.exists(db_file):
+        return None
+
+    n_number = _clean_n_number(n_number)
+
+    try:
+        conn = sqlite3.connect(db_file)
+    except sqlite3.OperationalError as e:
+        print(f"Error connecting to SQLite database: {e}")
+        return None
+
+    conn.row_factory = sqlite3.Row  # This enables column access by name
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT * FROM aircraft WHERE n_number = ?', (n_number,))
+    row = cursor.fetchone()
+    
+    if not row:
+        conn.close()
+        return None
+    
+    def lookup_description(mfr_mdl_code):
+        description = get_aircraft_description(db_file, mfr_mdl_code)
+        if isinstance(description, str):
+            return "", ""
+        return description
+    aircraft = _aircraft_from_row(row, lookup_description)
 
     conn.close()
     return aircraft
 
+
+#############################################
+## Class: FAALookupService
+## looks up aircraft in the FAA database on a worker thread so inputs never wait on sqlite.
+## one read only connection is kept open (owned by the worker thread) and the queries are
+## always the same sql so sqlite3 reuses the prepared statements.
+## results (including not found) are kept in a LRU cache.
+## aircraft can be looked up by N-Number (lookup) or by ICAO 24-bit address (lookupAddress).
+## cache keys are the N-Number string or the address int.
+## there is only ever one FAA_Aircraft per N-Number while anything is using it, shared by the cache,
+## the input's address map and the targets. (records are interned by N-Number)
+class FAALookupService(object):
+    def __init__(self, db_file=None, cache_size=2000, max_queue=500):
+        self.db_file = db_file or os.path.join(FAA_DB_DIR, FAA_DB_FILE)
+        self.cache_size = cache_size
+        self.cache = OrderedDict() # n_number or address -> FAA_Aircraft or None (not found)
+        self.pending = {} # n_number or address -> list of callbacks waiting for the result
+        self.records = weakref.WeakValueDictionary() # n_number -> FAA_Aircraft still in use somewhere
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = None
+        self.conn = None
+        self.has_reference = False
+        self.has_address_index = False
+        self.available = os.path.exists(self.db_file)
+
+        # stats
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+        self.dropped = 0 # lookups dropped because the queue was full
+
+    #############################################
+    ## Function: lookup
+    ## returns (True, record) if the result is cached. record is None if not in the database.
+    ## else returns (False, None) and callback(n_number, record) is called from the worker thread when done.
+    def lookup(self, n_number, callback=None):
+        if not n_number or not self.available:
+            return True, None
+        return self._lookup(_clean_n_number(n_number), callback)
+
+    #############################################
+    ## Function: lookupAddress
+    ## same as lookup() but by ICAO 24-bit address (int). callback(address, record)
+    ## this finds the aircraft even when the callsign is a flight number or has been cut short.
+    def lookupAddress(self, address, callback=None):
+        if address is None or not self.available:
+            return True, None
+        return self._lookup(address, callback)
+
+    def _lookup(self, key, callback):
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return True, self.cache[key]
+            self.misses += 1
+            waiting = self.pending.get(key)
+            if waiting is not None:
+                # already being looked up.
+                if callback is not None:
+                    waiting.append(callback)
+                return False, None
+            self.pending[key] = [callback] if callback is not None else []
+        try:
+            self.queue.put_nowait(key)
+        except queue.Full:
+            with self.lock:
+                self.pending.pop(key, None)
+                self.dropped += 1
+            return False, None
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="faa_lookup", daemon=True)
+            self.thread.start()
+        return False, None
+
+    #############################################
+    ## Function: getCached
+    ## cached record or None. never queries the database.
+    def getCached(self, n_number):
+        if not n_number:
+            return None
+        with self.lock:
+            return self.cache.get(_clean_n_number(n_number))
+
+    def open(self):
+        try:
+            self.conn = sqlite3.connect("file:" + self.db_file + "?mode=ro", uri=True, cached_statements=16)
+        except sqlite3.OperationalError as e:
+            print(f"Error connecting to SQLite database: {e}")
+            self.available = False
+            return False
+        cursor = self.conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='aircraft_reference'")
+        self.has_reference = cursor.fetchone() is not None
+        cursor = self.conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND name='idx_mode_s_code_hex'")
+        self.has_address_index = cursor.fetchone() is not None
+        if not self.has_address_index:
+            # still works but each address lookup has to scan the whole table.
+            print("FAA database has no ICAO address index. rebuild it with util/menu/faa_register.py --rebuild-db")
+        return True
+
+    def lookupDescription(self, mfr_mdl_code):
+        if not mfr_mdl_code or not self.has_reference:
+            return "", ""
+        row = self.conn.execute('SELECT mfr, model FROM aircraft_reference WHERE code = ?', (mfr_mdl_code,)).fetchone()
+        if row:
+            return f"{row[0]}", f"{row[1]}"
+        return "", ""
+
+    def query(self, key):
+        self.queries += 1
+        if isinstance(key, int):
+            row = self.conn.execute('SELECT * FROM aircraft WHERE mode_s_code_hex = ?', (_mode_s_hex(key),)).fetchone()
+        else:
+            row = self.conn.execute('SELECT * FROM aircraft WHERE n_number = ?', (key,)).fetchone()
+        if not row:
+            return None
+        record = self.records.get(row[0])
+        if record is None:
+            record = _aircraft_from_row(row, self.lookupDescription)
+            self.records[row[0]] = record
+        return record
+
+    #############################################
+    ## Function: run
+    ## worker thread.
+    def run(self):
+        if self.conn is None and not self.open():
+            with self.lock:
+                self.pending.clear()
+            return
+        while True:
+            key = self.queue.get()
+            try:
+                record = self.query(key)
+            except sqlite3.Error as e:
+                print(f"FAA lookup error for {key}: {e}")
+                record = None
+            with self.lock:
+                self.cache[key] = record
+                self.cache.move_to_end(key)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+                callbacks = self.pending.pop(key, [])
+            for callback in callbacks:
+                try:
+                    callback(key, record)
+                except Exception as e:
+                    print(f"FAA lookup callback error: {e}")
+
+
+faa_lookup_service = None
+
+#############################################
+## Function: get_faa_lookup_service
+## the shared lookup service. (created the first time it is asked for)
+def get_faa_lookup_service()->FAALookupService:
+    global faa_lookup_service
+    if faa_lookup_service is None:
+        faa_lookup_service = FAALookupService()
+    return faa_lookup_service
+
+
 FLIGHT_PREFIX_MAP = {
     "AA": ("American"),
     "DL": ("Delta"),
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+# Compiled data field paths.
+# Modules name the data they show with a path string like "engineData[0].EGT[2]" or "gpsData[0].GndSpeed".
+# Instead of splitting and parsing the path on every frame it is compiled once into a list of steps
+# (attrgetter / itemgetter / methodcaller, all done in C) and cached by the path string.
+# So a module that changes its data field just gets a new accessor, nothing needs to be invalidated.
+#
+# path syntax:
+#   name        attribute
+#   name[2]     attribute then index
+#   name()      method call
+#   name<obj>   attribute (the object itself, same as name)
+
+from operator import attrgetter, itemgetter, methodcaller
+
+MAX_COMPILED = 1000 # cache size. (cleared if it gets this big, paths only come from screen configs)
+
+_compiled = {} # path -> FieldAccessor
+
+
+#############################################
+## Function: compileField
+## get the compiled accessor for a path. (compiled the first time it's asked for)
+def compileField(path: str):
+    accessor = _compiled.get(path)
+    if accessor is None:
+        accessor = FieldAccessor(path)
+        if len(_compiled) >= MAX_COMPILED:
+            _compiled.clear()
+        _compiled[path] = accessor
+    return accessor
+
+
+#############################################
+## Function: sourcePath
+## path of the data object a field is read from. "engineData[0].EGT[2]" -> "engineData[0]"
+## None if the path doesn't start with a list item or calls a method. (the value could change without
+## the object being bumped, see dataship_object.py)
+def sourcePath(path: str):
+    bracket = path.find(']')
+    if bracket == -1 or '()' in path:
+        return None
+    return path[:bracket + 1]
+
+
+#############################################
+## Class: FieldAccessor
+## accessor.get(obj) returns the value at the path from obj. raises the same errors as walking the path by hand.
+class FieldAccessor(object):
+    def __init__(self, path: str):
+        self.path = path
+        steps = []
+        attrs = [] # attribute names in a row. (one attrgetter for all of them)
+
+        def flush():
+            if attrs:
+                steps.append(attrgetter(".".join(attrs)))
+                attrs.clear()
+
+        for part in path.split('.'):
+            if part.endswith('()'):
+                # It's a function call
+                flush()
+                steps.append(methodcaller(part[:-2]))
+            elif part.endswith('<obj>'):
+                # It's an object
+                attrs.append(part[:-5])
+            elif part.endswith(']'):
+                # It's an index. example: "gpsData[0]"
+                bracket = part.find('[')
+                attrs.append(part[:bracket])
+                flush()
+                steps.append(itemgetter(int(part[bracket + 1:-1])))
+            else:
+                attrs.append(part)
+        flush()
+        self.steps = tuple(steps)
+        if len(self.steps) == 1:
+            self.get = self.steps[0] # just one step. call it directly.
+        else:
+            self.get = self._walk
+
+    def _walk(self, obj):
+        for step in self.steps:
+            obj = step(obj)
+        return obj
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
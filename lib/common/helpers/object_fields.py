@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+# Field listing that works for plain objects and for the data classes that use __slots__.
+# (slotted objects don't have a __dict__ so vars(obj) and obj.__dict__ don't work on them)
+
+_slot_names = {} # class -> tuple of slot names (including base classes)
+
+
+#############################################
+## Function: slotNames
+## every slot name of a class in the order they were declared. empty if the class doesn't use slots.
+def slotNames(cls):
+    names = _slot_names.get(cls)
+    if names is None:
+        names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            for name in slots:
+                if name not in ('__dict__', '__weakref__') and name not in names:
+                    names.append(name)
+        names = tuple(names)
+        _slot_names[cls] = names
+    return names
+
+
+#############################################
+## Function: fieldsOf
+## name -> value of every field of an object. (unset slots and _private slots are left out)
+def fieldsOf(obj):
+    d = getattr(obj, '__dict__', None)
+    slots = slotNames(obj.__class__)
+    if d is not None and not slots:
+        return d
+    fields = {}
+    for name in slots:
+        if name.startswith('_'):
+            continue
+        try:
+            fields[name] = getattr(obj, name)
+        except AttributeError:
+            pass
+    if d is not None:
+        fields.update(d) # (a class without slots under a parent with slots has both)
+    return fields
+
+
+#############################################
+## Function: isDataObject
+## True if value is an object with fields. (not a str, number, list...)
+def isDataObject(value):
+    return hasattr(value, '__dict__') or len(slotNames(value.__class__)) > 0
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
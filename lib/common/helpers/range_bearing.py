@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+# Range and bearing from ownship to traffic targets.
+# Closed form WGS84 solution instead of geographiclib's iterative Inverse():
+#   distance: Andoyer-Lambert (spherical distance on reduced latitudes plus a flattening correction)
+#   bearing:  forward azimuth on the auxiliary sphere with a first order longitude correction.
+#
+# Error against geographiclib Geodesic.WGS84.Inverse (random pairs, lat +/-89, any direction):
+#   up to 500 miles: distance error < 1.4e-6 of the distance (under 1.2 m at 500 miles),
+#                    bearing error < 0.001 degrees.
+#
+# RangeBearing keeps every target position in numpy arrays so the range/bearing to all
+# targets can be recomputed in one vectorized pass each time ownship moves.
+
+import math
+import numpy as np
+
+WGS84_A = 6378137.0 # equatorial radius in meters
+WGS84_F = 1 / 298.257223563 # flattening
+METERS_TO_MILES = 0.0006213712
+
+
+#############################################
+## Function: solve
+## distance (meters) and forward azimuth (degrees -180 to 180) from point 1 to point 2.
+def solve(lat1, lon1, lat2, lon2):
+    b1 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat1))) # reduced latitudes
+    b2 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat2)))
+    L = math.radians(lon2 - lon1)
+    cb1, sb1 = math.cos(b1), math.sin(b1)
+    cb2, sb2 = math.cos(b2), math.sin(b2)
+    h = math.sin((b2 - b1) / 2) ** 2 + cb1 * cb2 * math.sin(L / 2) ** 2 # haversine. (sin^2 of half the central angle)
+    if h <= 0:
+        return 0.0, 0.0
+    h = min(h, 1.0)
+    sigma = 2 * math.asin(math.sqrt(h))
+    sinSigma = math.sin(sigma)
+    sP = math.sin((b1 + b2) / 2) ** 2
+    sQ = math.sin((b2 - b1) / 2) ** 2
+    X = (sigma - sinSigma) * sP * (1 - sQ) / (1 - h) if h < 1 else 0
+    Y = (sigma + sinSigma) * (1 - sP) * sQ / h
+    dist = WGS84_A * (sigma - WGS84_F / 2 * (X + Y))
+    # longitude on the auxiliary sphere is a bit bigger than on the ellipsoid. (first term of vincenty's series)
+    if sinSigma > 0:
+        L += WGS84_F * (cb1 * cb2 * math.sin(L) / sinSigma) * sigma
+    azi = math.degrees(math.atan2(cb2 * math.sin(L), cb1 * sb2 - sb1 * cb2 * math.cos(L)))
+    return dist, azi
+
+
+#############################################
+## Function: solveArrays
+## same as solve() but for arrays of points 2. returns (distance array, azimuth array).
+def solveArrays(lat1, lon1, lat2, lon2):
+    b1 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat1)))
+    b2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat2)))
+    L = np.radians(lon2 - lon1)
+    cb1, sb1 = math.cos(b1), math.sin(b1)
+    cb2, sb2 = np.cos(b2), np.sin(b2)
+    h = np.sin((b2 - b1) / 2) ** 2 + cb1 * cb2 * np.sin(L / 2) ** 2
+    h = np.clip(h, 0.0, 1.0)
+    sigma = 2 * np.arcsin(np.sqrt(h))
+    sinSigma = np.sin(sigma)
+    sP = np.sin((b1 + b2) / 2) ** 2
+    sQ = np.sin((b2 - b1) / 2) ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        X = np.where(h < 1, (sigma - sinSigma) * sP * (1 - sQ) / (1 - h), 0.0)
+        Y = np.where(h > 0, (sigma + sinSigma) * (1 - sP) * sQ / h, 0.0)
+        L = L + np.where(sinSigma > 0, WGS84_F * (cb1 * cb2 * np.sin(L) / sinSigma) * sigma, 0.0)
+    dist = WGS84_A * (sigma - WGS84_F / 2 * (X + Y))
+    azi = np.degrees(np.arctan2(cb2 * np.sin(L), cb1 * sb2 - sb1 * cb2 * np.cos(L)))
+    azi[h <= 0] = 0.0
+    return dist, azi
+
+
+#############################################
+## Class: RangeBearing
+## target positions stored by slot number. (TargetData uses the target's index in its target list)
+## positions that are not known are NaN and give NaN range/bearing.
+class RangeBearing(object):
+    def __init__(self, capacity=256):
+        self.lat = np.full(capacity, np.nan)
+        self.lon = np.full(capacity, np.nan)
+        self.dist = np.full(capacity, np.nan) # miles
+        self.brng = np.full(capacity, np.nan) # degrees 0-360
+        self.src_lat = None # ownship position of the last solveAll()
+        self.src_lon = None
+        self.solves = 0 # stats. number of solveAll() passes.
+
+    def _grow(self, size):
+        capacity = len(self.lat)
+        while capacity <= size:
+            capacity *= 2
+        for name in ("lat", "lon", "dist", "brng"):
+            old = getattr(self, name)
+            new = np.full(capacity, np.nan)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    #############################################
+    ## Function: setPosition
+    def setPosition(self, slot, lat, lon):
+        if slot >= len(self.lat):
+            self._grow(slot)
+        self.lat[slot] = np.nan if lat is None else lat
+        self.lon[slot] = np.nan if lon is None else lon
+
+    #############################################
+    ## Function: moveSlot
+    ## copy slot src into slot dst. (when a target is removed the last target is moved into its spot)
+    def moveSlot(self, src, dst):
+        self.lat[dst] = self.lat[src]
+        self.lon[dst] = self.lon[src]
+        self.dist[dst] = self.dist[src]
+        self.brng[dst] = self.brng[src]
+
+    def clearSlot(self, slot):
+        if slot < len(self.lat):
+            self.lat[slot] = self.lon[slot] = self.dist[slot] = self.brng[slot] = np.nan
+
+    #############################################
+    ## Function: solveAll
+    ## recompute range (miles) and bearing (0-360) from ownship to the first count slots.
+    def solveAll(self, count, src_lat, src_lon):
+        self.src_lat = src_lat
+        self.src_lon = src_lon
+        self.solves += 1
+        if count == 0:
+            return
+        dist, azi = solveArrays(src_lat, src_lon, self.lat[:count], self.lon[:count])
+        self.dist[:count] = dist * METERS_TO_MILES
+        self.brng[:count] = np.mod(azi, 360.0)
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
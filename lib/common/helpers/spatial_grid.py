@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+# Spatial index for traffic targets.
+# Targets are bucketed into a lat/lon grid (0.25 degree cells, about 17 miles of latitude) as their
+# positions are updated. A query around ownship only looks in the cells that cover the query radius
+# instead of going through every target.
+#
+# The grid only picks candidates. TargetData checks them against the exact distance/bearing.
+
+import math
+
+CELL_DEG = 0.25 # grid cell size in degrees.
+LON_CELLS = int(round(360 / CELL_DEG)) # cells around the world. (longitude wraps)
+
+
+#############################################
+## Function: cellOf
+## grid cell for a lat/lon. None if no position.
+def cellOf(lat, lon):
+    if lat is None or lon is None:
+        return None
+    return (int(math.floor(lat / CELL_DEG)), int(math.floor(lon / CELL_DEG)) % LON_CELLS)
+
+
+#############################################
+## Class: SpatialGrid
+## target key -> grid cell. add/move/remove are O(1).
+class SpatialGrid(object):
+    def __init__(self):
+        self.cells = {} # (lat cell, lon cell) -> {target key: target}
+        self.cell_of = {} # target key -> cell
+
+    def __len__(self):
+        return len(self.cell_of)
+
+    #############################################
+    ## Function: update
+    ## add a target or move it if its position changed. no position removes it.
+    def update(self, key, target, lat, lon):
+        cell = cellOf(lat, lon)
+        old = self.cell_of.get(key)
+        if cell == old:
+            if cell is not None:
+                self.cells[cell][key] = target # (may be a new target object for the same key)
+            return
+        if old is not None:
+            self._discard(key, old)
+        if cell is None:
+            return
+        self.cell_of[key] = cell
+        targets = self.cells.get(cell)
+        if targets is None:
+            self.cells[cell] = {key: target}
+        else:
+            targets[key] = target
+
+    def remove(self, key):
+        old = self.cell_of.get(key)
+        if old is not None:
+            self._discard(key, old)
+
+    def _discard(self, key, cell):
+        del self.cell_of[key]
+        targets = self.cells.get(cell)
+        if targets is not None:
+            targets.pop(key, None)
+            if not targets:
+                del self.cells[cell]
+
+    #############################################
+    ## Function: targetsNear
+    ## targets in the cells that cover radius miles around lat/lon. (may include some further away)
+    def targetsNear(self, lat, lon, miles):
+        miles = miles * 1.01
+        dlat = miles / 68.7 # 68.7 miles is the shortest degree of latitude.
+        maxLat = min(abs(lat) + dlat, 90)
+        if maxLat >= 89:
+            dlon = 180 # near the pole. any longitude.
+        else:
+            dlon = min(miles / (69.17 * math.cos(math.radians(maxLat))), 180)
+        lat0 = int(math.floor((lat - dlat) / CELL_DEG))
+        lat1 = int(math.floor((lat + dlat) / CELL_DEG))
+        if dlon >= 180:
+            lonCells = None # all of them.
+        else:
+            lon0 = int(math.floor((lon - dlon) / CELL_DEG))
+            lon1 = int(math.floor((lon + dlon) / CELL_DEG))
+            lonCells = range(lon0, lon1 + 1)
+
+        targets = []
+        cells = self.cells
+        if lonCells is None or (lat1 - lat0 + 1) * len(lonCells) > len(cells):
+            # more cells in the box than cells with targets. go through the occupied cells instead.
+            lonSet = None if lonCells is None else set(c % LON_CELLS for c in lonCells)
+            for cell, cellTargets in list(cells.items()):
+                if lat0 <= cell[0] <= lat1 and (lonSet is None or cell[1] in lonSet):
+                    targets.extend(tuple(cellTargets.values()))
+        else:
+            for ilat in range(lat0, lat1 + 1):
+                for ilon in lonCells:
+                    cellTargets = cells.get((ilat, ilon % LON_CELLS))
+                    if cellTargets:
+                        targets.extend(tuple(cellTargets.values()))
+        return targets
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
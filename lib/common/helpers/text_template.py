@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+
+# Text templates for the text modules. (see Module.parse_text)
+# "IAS {airData[0].IAS:kts} ALT {airData[0].Alt%0.0f}" is compiled once into a list of literal
+# strings and fields. Each field has its compiled data path (field_accessor.py) and its formatter
+# picked up front, so drawing only has to read the values.
+# The last text is kept and returned again if none of the values have changed. (only for plain
+# values, strings and numbers. lists and objects are always formatted again since they can change
+# without being replaced)
+# If every field is read from a dataship data object ("engineData[0]", "gpsData[1]"...) the object
+# versions are checked first, and if none have been bumped the last text is returned without reading
+# any values. (see dataship_object.py)
+#
+# field syntax:
+#   {path}            value as text
+#   {path%0.2f}       python format specifier
+#   {path:kts}        special format specifier. (see SPECIAL_FORMATS) else a python format specifier
+#   {self}            every field of the object the template is drawn from
+
+from lib.common.helpers.field_accessor import compileField, sourcePath
+from lib.common.helpers.object_fields import fieldsOf, isDataObject
+
+MAX_COMPILED = 1000 # cache size. (cleared if it gets this big)
+
+_compiled = {} # template text -> TextTemplate
+_CACHEABLE = (str, int, float, bool, type(None)) # value types that can't change without being replaced.
+
+# special format specifiers. value -> text
+SPECIAL_FORMATS = {
+    "kts": lambda v: f"{v * 0.868976:0.0f}",  # convert mph to knots.
+    "kph": lambda v: f"{v * 1.60934:0.0f}",   # convert mph to kph. (kilometers per hour)
+    "mph": lambda v: f"{v:0.0f}",             # it's already in mph.
+    "km": lambda v: f"{v * 1.60934:0.1f}",    # convert miles to kilometers.
+    "nm": lambda v: f"{v * 1.852:0.1f}",      # convert miles to nautical miles.
+    "ft": lambda v: f"{v:0.1f}",              # it's already in feet.
+    "m": lambda v: f"{v * 0.3048:0.1f}",      # convert feet to meters.
+    "c": lambda v: f"{((v - 32) * 5/9):0.1f}", # convert fahrenheit to celsius.
+    "f": lambda v: f"{v:0.1f}",               # it's already in fahrenheit.
+    "10th": lambda v: f"{round(v / 10) * 10:0.0f}", # round to the nearest 10.
+}
+
+
+#############################################
+## Function: formatObject
+## every public field of an object as "name: value" lines. (skips child objects)
+def formatObject(obj):
+    if obj is None:
+        return "None"
+    final_value = ""
+    sub_vars = fieldsOf(obj)
+    for sub_var in sub_vars:
+        # check if it starts with _ then skip it.
+        if sub_var.startswith('_'):
+            continue
+        # check if it has fields.. if so skip it cause it's probably a child object. (for now...)
+        if isDataObject(sub_vars[sub_var]):
+            continue
+        final_value += f"{sub_var}: {sub_vars[sub_var]}\n"
+    return final_value
+
+
+#############################################
+## Function: formatSpecial
+## format a value with a special format specifier. (or a python one if it's not special)
+def formatSpecial(value, format_specifier):
+    formatter = SPECIAL_FORMATS.get(format_specifier)
+    if formatter is not None:
+        return formatter(value)
+    return f"{value:{format_specifier}}"
+
+
+#############################################
+## Function: formatValue
+## value as text when there is no format specifier.
+def formatValue(value):
+    if isinstance(value, (str, int, float, tuple, dict)):
+        return f"{value}"
+    if isinstance(value, list):
+        final_value = ""
+        for item in value:
+            final_value += f"\n{formatObject(item)}\n======================="
+        return final_value
+    return formatObject(value)
+
+
+#############################################
+## Function: compileTemplate
+## get the compiled template for a text. (compiled the first time it's asked for)
+def compileTemplate(text: str):
+    template = _compiled.get(text)
+    if template is None:
+        template = TextTemplate(text)
+        if len(_compiled) >= MAX_COMPILED:
+            _compiled.clear()
+        _compiled[text] = template
+    return template
+
+
+#############################################
+## Class: TemplateField
+## one {...} in a template. get(obj) is the raw value, format(value) turns it into text.
+class TemplateField(object):
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.error = None # text to show instead if the field can't be compiled.
+        self.source = None # accessor for the data object the value is read from. (if known)
+        name = expr
+        try:
+            if "%" in expr:
+                name, format_specifier = expr.split("%")
+                self.format = lambda v, spec=format_specifier: f"{v:{spec}}"
+            elif ":" in expr:
+                name, format_specifier = expr.split(":")
+                formatter = SPECIAL_FORMATS.get(format_specifier)
+                if formatter is None:
+                    formatter = lambda v, spec=format_specifier: f"{v:{spec}}"
+                self.format = formatter
+            else:
+                self.format = formatValue
+            if name == "self":
+                self.get = formatObject
+            else:
+                self.get = compileField(name).get
+                source = sourcePath(name)
+                if source is not None:
+                    self.source = compileField(source)
+        except Exception as e:
+            self.error = f"Err:{str(e)}"
+
+
+#############################################
+## Class: TextTemplate
+## compiled template. render(obj) gives the text with every field filled in from obj.
+class TextTemplate(object):
+    def __init__(self, text: str):
+        self.text = text
+        self.parts = [] # literal strings and TemplateFields in order.
+        self.fields = []
+        start = 0
+        while True:
+            open_brace = text.find('{', start)
+            if open_brace == -1:
+                break
+            close_brace = text.find('}', open_brace)
+            if close_brace == -1:
+                break
+            if open_brace > start:
+                self.parts.append(text[start:open_brace])
+            field = TemplateField(text[open_brace + 1:close_brace])
+            self.parts.append(field)
+            self.fields.append(field)
+            start = close_brace + 1
+        if start < len(text):
+            self.parts.append(text[start:])
+
+        # data objects the fields are read from. None if any field isn't read from one.
+        self.sources = []
+        for field in self.fields:
+            if field.error is not None:
+                continue
+            if field.source is None:
+                self.sources = None
+                break
+            if field.source not in self.sources:
+                self.sources.append(field.source)
+
+        # last render.
+        self._last_obj = None
+        self._last_versions = None
+        self._last_values = None
+        self._last_classes = None
+        self._last_text = None
+        self.renders = 0 # stats. times the text was built.
+        self.cache_hits = 0 # times the last text was returned again.
+        self.version_hits = 0 # times it was returned again without reading the values.
+
+    #############################################
+    ## Function: _sourceVersions
+    ## (data object, version) of every source. None if one can't be read or has never been bumped.
+    def _sourceVersions(self, obj):
+        versions = []
+        for source in self.sources:
+            try:
+                data = source.get(obj)
+            except Exception:
+                return None
+            version = getattr(data, 'version', 0)
+            if not version:
+                return None
+            versions.append((data, version))
+        return versions
+
+    #############################################
+    ## Function: render
+    def render(self, obj):
+        if not self.fields:
+            return self.text
+        # versions are read before the values. (so a bump while reading them shows up next time)
+        versions = self._sourceVersions(obj) if self.sources else None
+        if versions is not None and obj is self._last_obj and versions == self._last_versions:
+            self.version_hits += 1
+            return self._last_text
+
+        values = []
+        classes = [] # (so 1 and 1.0 and True don't count as the same value)
+        cacheable = True
+        for field in self.fields:
+            if field.error is not None:
+                values.append(None)
+                continue
+            try:
+                value = field.get(obj)
+            except Exception as e:
+                value = e
+            if cacheable and value.__class__ not in _CACHEABLE:
+                cacheable = False
+            values.append(value)
+            classes.append(value.__class__)
+
+        if cacheable and obj is self._last_obj and values == self._last_values and classes == self._last_classes:
+            self.cache_hits += 1
+            self._last_versions = versions
+            return self._last_text
+
+        text = []
+        values_iter = iter(values)
+        for part in self.parts:
+            if part.__class__ is str:
+                text.append(part)
+                continue
+            value = next(values_iter)
+            if part.error is not None:
+                text.append(part.error)
+            elif isinstance(value, Exception):
+                text.append(f"Err:{str(value)}")
+            else:
+                try:
+                    text.append(part.format(value))
+                except Exception as e:
+                    text.append(f"Err:{str(e)}")
+        result = "".join(text)
+        self.renders += 1
+        self._last_obj = obj
+        self._last_versions = versions
+        self._last_text = result
+        if cacheable:
+            self._last_values = values
+            self._last_classes = classes
+        else:
+            self._last_values = self._last_classes = None
+        return result
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+# Track history for traffic targets.
+# Every target gets a fixed size ring buffer of its past positions (lat, lon, alt, time) in numpy
+# arrays, stored by slot number the same way as RangeBearing and TrafficCPA.
+# A new point is only stored once the target has moved min_dist miles from the last stored point,
+# or max_interval seconds have gone by. So a target that reports every second doesn't fill its
+# buffer in a few seconds, and memory is points * slots no matter how long a target is tracked.
+
+import math
+import numpy as np
+
+MILES_PER_DEG_LAT = 69.05 # (60 nm)
+
+
+#############################################
+## Class: TrackHistory
+## ring buffer per slot. head is where the next point goes, size is how many points are stored.
+class TrackHistory(object):
+    def __init__(self, points=32, min_dist=0.1, max_interval=30, capacity=256):
+        self.points = points # points kept per target.
+        self.min_dist = min_dist # miles moved before storing a new point.
+        self.max_interval = max_interval # seconds before storing a new point even if not moved.
+        self.lat = np.full((capacity, points), np.nan)
+        self.lon = np.full((capacity, points), np.nan)
+        self.alt = np.full((capacity, points), np.nan)
+        self.time = np.zeros((capacity, points))
+        self.head = np.zeros(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+
+    def _grow(self, size):
+        capacity = len(self.head)
+        while capacity <= size:
+            capacity *= 2
+        for name in ("lat", "lon", "alt", "time"):
+            old = getattr(self, name)
+            new = np.full((capacity, self.points), np.nan if name != "time" else 0.0)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        for name in ("head", "size"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    #############################################
+    ## Function: add
+    ## add a position for a slot if it has moved far enough (or long enough) since the last stored point.
+    ## returns True if the point was stored.
+    def add(self, slot, lat, lon, alt, t):
+        if lat is None or lon is None:
+            return False
+        if slot >= len(self.head):
+            self._grow(slot)
+        head = int(self.head[slot])
+        if self.size[slot] > 0:
+            last = (head - 1) % self.points
+            if t - self.time[slot, last] < self.max_interval:
+                dy = (lat - self.lat[slot, last]) * MILES_PER_DEG_LAT
+                dx = ((lon - self.lon[slot, last] + 180) % 360 - 180) * MILES_PER_DEG_LAT * math.cos(math.radians(lat))
+                if dx * dx + dy * dy < self.min_dist * self.min_dist:
+                    return False
+        self.lat[slot, head] = lat
+        self.lon[slot, head] = lon
+        self.alt[slot, head] = np.nan if alt is None else alt
+        self.time[slot, head] = t
+        self.head[slot] = (head + 1) % self.points
+        if self.size[slot] < self.points:
+            self.size[slot] += 1
+        return True
+
+    #############################################
+    ## Function: moveSlot
+    ## copy slot src into slot dst. (when a target is removed the last target is moved into its spot)
+    def moveSlot(self, src, dst):
+        if src >= len(self.head):
+            self.clearSlot(dst)
+            return
+        for a in (self.lat, self.lon, self.alt, self.time, self.head, self.size):
+            a[dst] = a[src]
+
+    def clearSlot(self, slot):
+        if slot < len(self.head):
+            self.head[slot] = 0
+            self.size[slot] = 0
+
+    #############################################
+    ## Function: get
+    ## stored points for a slot, oldest first. returns (lat, lon, alt, time) arrays.
+    ## max_age drops points older than max_age seconds before now. max_points thins the points out evenly
+    ## (always keeping the newest) so long tracks can be drawn with a few lines.
+    def get(self, slot, max_age=None, now=None, max_points=None):
+        if slot >= len(self.head) or self.size[slot] == 0:
+            empty = np.zeros(0)
+            return empty, empty, empty, empty
+        size = int(self.size[slot])
+        head = int(self.head[slot])
+        if head >= size: # not wrapped. one slice (no copying)
+            lat, lon, alt, t = (a[slot, head - size:head] for a in (self.lat, self.lon, self.alt, self.time))
+        else:
+            lat, lon, alt, t = (np.concatenate((a[slot, head - size:], a[slot, :head])) for a in (self.lat, self.lon, self.alt, self.time))
+        if max_age is not None and now is not None:
+            first = int(np.searchsorted(t, now - max_age)) # times are in order.
+            if first:
+                lat, lon, alt, t = lat[first:], lon[first:], alt[first:], t[first:]
+        count = len(t)
+        if max_points is not None and count > max_points:
+            if max_points <= 1:
+                idx = [count - 1]
+            else:
+                idx = [int(round(i * (count - 1) / (max_points - 1))) for i in range(max_points)]
+            lat, lon, alt, t = lat[idx], lon[idx], alt[idx], t[idx]
+        return lat, lon, alt, t
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
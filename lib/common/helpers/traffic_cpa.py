@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+# Collision risk for traffic targets.
+# Closest point of approach (CPA) and time to CPA (TCPA) from ownship to every target in one numpy
+# pass. Positions come from the range/bearing already worked out for each target (see range_bearing.py)
+# and are treated as flat x/y miles around ownship, fine at traffic ranges.
+# Both ownship and targets are assumed to hold their current track, speed and vertical speed.
+#
+# Threat levels (loosely like TCAS):
+#   THREAT_ALERT     CPA within ALERT_CPA miles and ALERT_ALT feet in the next ALERT_TCPA seconds.
+#   THREAT_ADVISORY  CPA within ADVISORY_CPA miles and ADVISORY_ALT feet in the next ADVISORY_TCPA seconds.
+#   THREAT_PROXIMATE within PROXIMATE_DIST miles and PROXIMATE_ALT feet now.
+# targets with no altitude are treated as being at our altitude.
+
+import numpy as np
+
+THREAT_NONE = 0
+THREAT_PROXIMATE = 1
+THREAT_ADVISORY = 2
+THREAT_ALERT = 3
+
+ALERT_TCPA = 30 # seconds
+ALERT_CPA = 0.5 # miles
+ALERT_ALT = 600 # feet
+ADVISORY_TCPA = 60
+ADVISORY_CPA = 1.0
+ADVISORY_ALT = 1000
+PROXIMATE_DIST = 6.0
+PROXIMATE_ALT = 1200
+
+KNOTS_TO_MILES_PER_SEC = 1.150779 / 3600
+
+
+#############################################
+## Class: TrafficCPA
+## target motion stored by slot number, same slots as RangeBearing. (the target's index in the target list)
+## values that are not known are NaN.
+class TrafficCPA(object):
+    def __init__(self, capacity=256):
+        self.speed = np.full(capacity, np.nan) # knots
+        self.track = np.full(capacity, np.nan) # degrees
+        self.vspeed = np.full(capacity, np.nan) # fpm
+        self.alt = np.full(capacity, np.nan) # feet MSL
+        self.fix_time = np.full(capacity, np.nan) # unix time of the position. (for dead reckoning)
+        self.ignore = np.zeros(capacity, dtype=bool) # never a threat. (buoys)
+        self.cpa = np.full(capacity, np.nan) # miles
+        self.tcpa = np.full(capacity, np.nan) # seconds. 0 if moving apart.
+        self.threat = np.zeros(capacity, dtype=np.int8)
+        self.solves = 0 # stats. number of solveAll() passes.
+
+    def _grow(self, size):
+        capacity = len(self.speed)
+        while capacity <= size:
+            capacity *= 2
+        for name in ("speed", "track", "vspeed", "alt", "fix_time", "cpa", "tcpa"):
+            old = getattr(self, name)
+            new = np.full(capacity, np.nan)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        for name in ("ignore", "threat"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    #############################################
+    ## Function: setMotion
+    def setMotion(self, slot, speed, track, vspeed, alt, ignore=False, fix_time=None):
+        if slot >= len(self.speed):
+            self._grow(slot)
+        self.speed[slot] = np.nan if speed is None else speed
+        self.track[slot] = np.nan if track is None else track
+        self.vspeed[slot] = np.nan if vspeed is None else vspeed
+        self.alt[slot] = np.nan if alt is None else alt
+        self.ignore[slot] = ignore
+        self.fix_time[slot] = np.nan if fix_time is None else fix_time
+
+    #############################################
+    ## Function: moveSlot
+    ## copy slot src into slot dst. (when a target is removed the last target is moved into its spot)
+    def moveSlot(self, src, dst):
+        for a in (self.speed, self.track, self.vspeed, self.alt, self.fix_time, self.ignore, self.cpa, self.tcpa, self.threat):
+            a[dst] = a[src]
+
+    def clearSlot(self, slot):
+        if slot < len(self.speed):
+            self.speed[slot] = self.track[slot] = self.vspeed[slot] = self.alt[slot] = self.fix_time[slot] = np.nan
+            self.cpa[slot] = self.tcpa[slot] = np.nan
+            self.ignore[slot] = False
+            self.threat[slot] = THREAT_NONE
+
+    #############################################
+    ## Function: solveAll
+    ## cpa/tcpa/threat for the first count slots. dist (miles) and brng (degrees) are the range/bearing arrays.
+    ## src_speed in knots, src_track in degrees, src_alt in feet. (None if unknown)
+    def solveAll(self, count, dist, brng, src_speed, src_track, src_alt):
+        self.solves += 1
+        if count == 0:
+            return
+        dist = dist[:count]
+        b = np.radians(brng[:count])
+        px = dist * np.sin(b) # target position east/north of us in miles.
+        py = dist * np.cos(b)
+
+        # relative velocity in miles per second. unknown speed/track is taken as not moving.
+        spd = np.nan_to_num(self.speed[:count]) * KNOTS_TO_MILES_PER_SEC
+        trk = np.radians(np.nan_to_num(self.track[:count]))
+        vx = spd * np.sin(trk)
+        vy = spd * np.cos(trk)
+        if src_speed and src_track is not None:
+            ownSpd = src_speed * KNOTS_TO_MILES_PER_SEC
+            ownTrk = np.radians(src_track)
+            vx -= ownSpd * np.sin(ownTrk)
+            vy -= ownSpd * np.cos(ownTrk)
+
+        vv = vx * vx + vy * vy
+        pv = px * vx + py * vy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tcpa = np.where(vv > 1e-12, -pv / vv, 0.0)
+        tcpa = np.maximum(tcpa, 0.0) # moving apart. closest is now.
+        cpa = np.hypot(px + vx * tcpa, py + vy * tcpa)
+
+        # altitude difference now and at cpa. (unknown altitude counts as same altitude)
+        if src_alt is None:
+            altNow = np.zeros(count)
+        else:
+            altNow = np.nan_to_num(self.alt[:count] - src_alt)
+        altCpa = np.abs(altNow + np.nan_to_num(self.vspeed[:count]) * tcpa / 60)
+        altNow = np.abs(altNow)
+
+        threat = np.where((tcpa <= ALERT_TCPA) & (cpa < ALERT_CPA) & (altCpa < ALERT_ALT), THREAT_ALERT,
+                 np.where((tcpa <= ADVISORY_TCPA) & (cpa < ADVISORY_CPA) & (altCpa < ADVISORY_ALT), THREAT_ADVISORY,
+                 np.where((dist < PROXIMATE_DIST) & (altNow < PROXIMATE_ALT), THREAT_PROXIMATE, THREAT_NONE)))
+        threat[self.ignore[:count]] = THREAT_NONE # (NaN distance already fails every test)
+        self.cpa[:count] = cpa
+        self.tcpa[:count] = tcpa
+        self.threat[:count] = threat
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+#################################################
+# Playback clock
+# One clock shared by every input playing back a log file.
+# Each message is scheduled by its recorded time (seconds since the start of the log)
+# so replay runs at real time (or a multiple of it) no matter the message mix or cpu speed.
+# All playback inputs use the same clock so multi input replays stay aligned.
+# Recordings (.tvr) have the wall clock time they were started in the header, so every message is put
+# on the wall clock time it was recorded at and one offset (shared by all recordings) turns that into
+# clock time. The earliest recording starts playing first and the others start when they did in the air.
+# Legacy raw logs have no start time, so each keeps its own offset from log time to clock time.
+
+import math
+import time
+import threading
+
+PLAYBACK_SPEEDS = [0.5, 1, 2, 5, 10, 20]
+
+
+class PlaybackClock(object):
+    def __init__(self):
+        self.speed = 1.0
+        self.maxSpeed = False # if True then never wait. (for benchmarking)
+        self.paused = False
+        self.origin_wall = None # wall clock time when the clock was started/moved.
+        self.origin_clock = 0 # clock time at origin_wall
+        self.epoch = 0 # changes when inputs need to line back up with the clock. (after max speed)
+        self.wall_base = None # earliest first message of the recordings being played. (wall clock)
+        self.wall_offset = None # clock time minus recorded wall clock time. shared by all recordings.
+        self.wall_epoch = 0
+        self.lock = threading.Lock()
+
+    #############################################
+    ## Function: now
+    ## current clock time in seconds. the clock starts the first time it is asked.
+    def now(self):
+        with self.lock:
+            wall = time.monotonic()
+            if self.origin_wall is None:
+                self._rebase(0, wall)
+            return self._now(wall)
+
+    def _now(self, wall):
+        if self.origin_wall is None or self.paused:
+            return self.origin_clock
+        return self.origin_clock + (wall - self.origin_wall) * self.speed
+
+    # restart the clock from clockTime. (caller holds lock)
+    def _rebase(self, clockTime, wall):
+        self.origin_clock = clockTime
+        self.origin_wall = wall
+
+    #############################################
+    ## Function: dueIn
+    ## how many seconds (wall time) until a message scheduled at clockTime should be played.
+    ## 0 or less means play it now.
+    def dueIn(self, clockTime):
+        if self.maxSpeed:
+            return 0
+        with self.lock:
+            wall = time.monotonic()
+            if self.origin_wall is None:
+                self._rebase(clockTime, wall)
+                return 0
+            if self.paused:
+                return 0.1
+            return (clockTime - self._now(wall)) / self.speed
+
+    #############################################
+    ## Function: addRecording
+    ## a recording whose first message was at wall clock time wallStart is being played back.
+    def addRecording(self, wallStart):
+        with self.lock:
+            if self.wall_base is None or wallStart < self.wall_base:
+                self.wall_base = wallStart
+
+    #############################################
+    ## Function: recordedTime
+    ## clock time to play a message recorded at wall clock time wallTime.
+    ## realign=True (this input jumped on its own or its log started over) moves the shared offset so wallTime plays now.
+    def recordedTime(self, wallTime, realign=False):
+        with self.lock:
+            wall = time.monotonic()
+            if self.origin_wall is None:
+                self._rebase(0, wall)
+            if self.wall_offset is None:
+                start = wallTime
+                if self.wall_base is not None and self.wall_base < start:
+                    start = self.wall_base # earliest recording plays first.
+                self.wall_offset = self._now(wall) - start
+                self.wall_epoch = self.epoch
+            elif realign or self.wall_epoch != self.epoch:
+                self.wall_offset = self._now(wall) - wallTime
+                self.wall_epoch = self.epoch
+            return wallTime + self.wall_offset
+
+    #############################################
+    ## Function: recordedNow
+    ## wall clock time the recordings should be playing at now. None if they aren't lined up with the clock yet.
+    def recordedNow(self):
+        if self.maxSpeed:
+            return None
+        with self.lock:
+            if self.wall_offset is None or self.wall_epoch != self.epoch or self.origin_wall is None:
+                return None
+            return self._now(time.monotonic()) - self.wall_offset
+
+    #############################################
+    ## Function: skipRecorded
+    ## move the recordings forward (or back if negative) by seconds. call once, then skipLog() each input
+    ## and every recording moves to the same place.
+    def skipRecorded(self, seconds):
+        with self.lock:
+            if self.wall_offset is not None:
+                self.wall_offset -= seconds
+
+    #############################################
+    ## Function: reset
+    ## tell every input to line back up with the clock on its next message.
+    def reset(self):
+        with self.lock:
+            self.epoch += 1
+
+    #############################################
+    ## Function: setSpeed
+    ## change the playback speed multiplier. clock continues on from the current time.
+    def setSpeed(self, speed):
+        speed = float(speed)
+        if not math.isfinite(speed):
+            print("PlaybackClock: bad speed "+str(speed))
+            return
+        with self.lock:
+            wall = time.monotonic()
+            current = self._now(wall)
+            self.speed = min(max(speed, PLAYBACK_SPEEDS[0]), PLAYBACK_SPEEDS[-1])
+            if self.origin_wall is not None:
+                self._rebase(current, wall)
+
+    #############################################
+    ## Function: nextSpeed
+    ## cycle through the playback speeds. after the fastest goes to max speed then back to the slowest.
+    def nextSpeed(self):
+        if self.maxSpeed:
+            self.setMaxSpeed(False)
+            self.setSpeed(PLAYBACK_SPEEDS[0])
+        elif self.speed >= PLAYBACK_SPEEDS[-1]:
+            self.setMaxSpeed(True)
+        else:
+            for speed in PLAYBACK_SPEEDS:
+                if speed > self.speed:
+                    self.setSpeed(speed)
+                    break
+        return self.speedText()
+
+    #############################################
+    ## Function: setMaxSpeed
+    def setMaxSpeed(self, maxSpeed):
+        self.maxSpeed = maxSpeed
+        if not maxSpeed:
+            self.reset() # inputs ran ahead of the clock. continue on from wherever they are now.
+
+    def setPaused(self, paused):
+        with self.lock:
+            if paused == self.paused:
+                return
+            wall = time.monotonic()
+            current = self._now(wall)
+            self.paused = paused
+            if self.origin_wall is not None:
+                self._rebase(current, wall)
+
+    def speedText(self):
+        if self.maxSpeed:
+            return "MAX"
+        if self.speed == int(self.speed):
+            return "%dx" % (self.speed)
+        return "%sx" % (self.speed)
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
@@ -9,6 +9,7 @@ from lib.common.dataship import dataship
 from lib import smartdisplay
 from lib.common.graphic.growl_manager import GrowlManager
 from lib.common.event_manager import EventManager
+from lib.common.playback_clock import PlaybackClock
 from lib.common.graphic.edit_TronViewScreenObject import TronViewScreenObject
 
 ####################################
@@ -83,6 +84,11 @@ GrowlManager = GrowlManager()
 ## This is a global object that is used to manage events.
 EventManager = EventManager()
 
+####################################
+## Playback Clock
+## Shared by all inputs playing back log files. Paces messages by their recorded time.
+PlaybackClock = PlaybackClock()
+
 ####################################
 ## Active Dropdown
 ## This is a global reference to the currently active dropdown menu in edit mode
@@ -58,14 +58,19 @@ class threadReadKeyboard(threading.Thread):
                         shared.Inputs[0].isPaused = True
                     else:
                         shared.Inputs[0].isPaused = False
+                    shared.PlaybackClock.setPaused(shared.Inputs[0].isPaused)
+            elif key==ord('s'):
+                shared.PlaybackClock.nextSpeed() # cycle playback speed.
             elif key==curses.KEY_RIGHT:
-                shared.Inputs[0].fastForward(shared.Dataship,500)
+                shared.PlaybackClock.skipRecorded(10)
+                shared.Inputs[0].skipLog(shared.Dataship,10,1)
                 if len(shared.Inputs) > 1:
-                    shared.Inputs[1].fastForward(shared.Dataship,500)
+                    shared.Inputs[1].skipLog(shared.Dataship,10,1)
             elif key==curses.KEY_LEFT:
-                shared.Inputs[0].fastBackwards(shared.Dataship,500)
+                shared.PlaybackClock.skipRecorded(-10)
+                shared.Inputs[0].skipLog(shared.Dataship,-10,-1)
                 if len(shared.Inputs) > 1:
-                    shared.Inputs[1].fastBackwards(shared.Dataship,500)
+                    shared.Inputs[1].skipLog(shared.Dataship,-10,-1)
             elif key==27:  # escape key.
                 curses.endwin()
                 shared.Dataship.textMode = False
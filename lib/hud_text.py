@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 
 import os, sys
+from lib.common.helpers.object_fields import fieldsOf
 
 #######################################################################################################################################
 #######################################################################################################################################
@@ -110,7 +111,7 @@ def print_data(label,value,forceIfObject=False,sameLine=False,indent=False,showH
 ## if showHowManyItems = -1 then show all items in object.. else its a count of how many to show.
 def print_object(obj,sameLine=False,indent=False,showHowManyItems=-1,showHowManyListItems=-1):
     count = 0
-    for attr, value in list(vars(obj).items()):
+    for attr, value in list(fieldsOf(obj).items()):
         count += 1
         print_data(attr,value,forceIfObject=False,sameLine=sameLine,indent=indent,showHowManyListItems=showHowManyListItems)
         if(showHowManyItems != -1 and showHowManyItems == count): return
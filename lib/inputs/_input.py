@@ -4,10 +4,13 @@
 # All input types should inherit from this class.
 
 from . import _input_file_utils
+from . import _input_log_index
+from . import _input_recorder
 import re
 import os
 from datetime import datetime
 import platform
+import time
 from lib.common import shared # global shared objects stored here.
 
 
@@ -38,6 +41,8 @@ class Input:
         self.output_logFileName = ""
         self.output_logBinary = False
         self.input_logFileName = None
+        self.input_logIsRecording = False # True if playing back a .tvr recording. (else legacy raw log)
+        self.input_logStartWall = None # wall clock time of the first message in the recording. (None for legacy raw logs)
         self.input_logFileSize = 0
         self.input_logFilePercent = 0 # percentage of file that has been read.
         self.inputNum = num
@@ -46,6 +51,12 @@ class Input:
         self.time_stamp_string = None # time from this input source.. if any..
         self.time_stamp_min = None  
         self.time_stamp_sec = None  
+        self.logIndex = None # offset index of the playback log file. built on first seek.
+        self.playback_rate = _input_file_utils.readConfigInt(self.name, "playback_rate", 25) # messages per sec for logs without timestamps.
+        self.playback_offset = 0 # playback clock time minus log time.
+        self.playback_lastTime = None
+        self.playback_epoch = -1
+        self.playback_jumped = False # set when the playback file position is moved.
 
         # Check if running on a Raspberry Pi
         self.is_raspberry_pi = platform.system() == 'Linux' and 'arm' in platform.machine()
@@ -67,10 +78,7 @@ class Input:
                 import util.rpi_hardware as rpi_hardware
                 if rpi_hardware.mount_usb_drive() == True:
                     openFileName = "/mnt/usb/"+filename
-                logFile = open(openFileName, attribs)
-                # get file size
-                self.input_logFileSize = os.path.getsize(openFileName)
-                self.input_logFilePercent = 0
+                logFile = Input.openPlaybackFile(self,openFileName, attribs)
                 print("Opening USB Logfile: "+openFileName+" size="+str(self.input_logFileSize))
                 return logFile,openFileName
             else:
@@ -81,10 +89,7 @@ class Input:
         # then try location for flight data recorder...
         try:
             openFileName = self.path_datarecorder+filename
-            logFile = open(openFileName, attribs)
-            # get file size
-            self.input_logFileSize = os.path.getsize(openFileName)
-            self.input_logFilePercent = 0
+            logFile = Input.openPlaybackFile(self,openFileName, attribs)
             print("Opening Logfile: "+openFileName+" size="+str(self.input_logFileSize))
             shared.GrowlManager.add_message(self.id + ": Playing " + openFileName)
             return logFile,openFileName
@@ -98,9 +103,7 @@ class Input:
         try:
             openFileName = "lib/inputs/_example_data/"+filename
             print("Opening example Logfile: "+openFileName)
-            logFile = open(openFileName, attribs)
-            self.input_logFileSize = os.path.getsize(openFileName)
-            self.input_logFilePercent = 0
+            logFile = Input.openPlaybackFile(self,openFileName, attribs)
             return logFile,openFileName
         except :
             pass
@@ -108,47 +111,101 @@ class Input:
         return None,None
 
     #############################################
-    ## Method: createLogFile
-    ## Create a new log file. (for saving flight data to)
-    def createLogFile(self,fileExtension):
-        # should we check if the usb drive is available to write to?
+    ## Method: openPlaybackFile
+    # Open a file for play back. recordings (.tvr) are unwrapped so the input reads the messages just like a raw log.
+    def openPlaybackFile(self,openFileName,attribs):
+        if _input_recorder.isRecording(openFileName):
+            # the log index has the offset of every record, so the reader uses it instead of scanning the file again.
+            self.logIndex = self.loadLogIndex(openFileName, True)
+            offsets = self.logIndex.offsets if self.logIndex is not None else None
+            logFile,self.input_logFileSize,self.input_logStartWall = _input_recorder.openRecording(openFileName, attribs, offsets)
+            self.input_logIsRecording = True
+            shared.PlaybackClock.addRecording(self.input_logStartWall)
+        else:
+            logFile = open(openFileName, attribs)
+            self.input_logFileSize = os.path.getsize(openFileName)
+            self.input_logIsRecording = False
+            self.input_logStartWall = None
+        self.input_logFilePercent = 0
+        return logFile
+
+    #############################################
+    ## Method: getLogFilePath
+    ## get the filename for a new log file. creates the dir if needed.
+    def getLogFilePath(self,fileExtension):
+        # if pi then check if the usb drive is mounted
+        save_to_usb = _input_file_utils.readConfigBool("DataRecorder", "save_to_usb", False)
+        DataRecorderPath = None
+        if(self.is_raspberry_pi and save_to_usb):
+            import util.rpi_hardware as rpi_hardware
+            if (rpi_hardware.mount_usb_drive() == True and self.datarecorder_check_usb == True):
+                DataRecorderPath = "/mnt/usb/"
+
+        if(DataRecorderPath == None):
+            DataRecorderPath = _input_file_utils.getDataRecorderDir()
+        log_path_format = _input_file_utils.readConfig("DataRecorder", "log_path_format", "%Y/%m/")
+        # get todays year and month. create a folder YYYY/MM/
+        today = datetime.now()
+        # replace the %Y and %m in the log_path_format with the current year and month.
+        log_path_format = log_path_format.replace("%Y",str(today.year)).replace("%m",str(today.month)).replace("%d",str(today.day))
+        DataRecorderPath = DataRecorderPath + log_path_format
+        # create the folder if it doesn't exist.
+        if not os.path.exists(DataRecorderPath):
+            os.makedirs(DataRecorderPath)
+
+        return Input.getNextLogFile(self,DataRecorderPath,fileExtension)
+
+    #############################################
+    ## Method: createRecording
+    ## Create a new recording. file is created and written on a background writer thread so
+    ## the input never waits on the sd card or usb drive.
+    ## framed=True saves timestamped messages in the .tvr container. framed=False saves legacy raw data.
+    def createRecording(self,fileExtension=_input_recorder.RECORDING_EXTENSION,framed=True):
         try:
-            # if pi then check if the usb drive is mounted
-            save_to_usb = _input_file_utils.readConfigBool("DataRecorder", "save_to_usb", False)
-            DataRecorderPath = None
-            if(self.is_raspberry_pi and save_to_usb):
-                import util.rpi_hardware as rpi_hardware
-                if (rpi_hardware.mount_usb_drive() == True and self.datarecorder_check_usb == True):
-                    DataRecorderPath = "/mnt/usb/"
-
-            if(DataRecorderPath == None):
-                DataRecorderPath = _input_file_utils.getDataRecorderDir()
-                log_path_format = _input_file_utils.readConfig("DataRecorder", "log_path_format", "%Y/%m/")
-                # get todays year and month. create a folder YYYY/MM/
-                today = datetime.now()
-                # replace the %Y and %m in the log_path_format with the current year and month.
-            log_path_format = log_path_format.replace("%Y",str(today.year)).replace("%m",str(today.month)).replace("%d",str(today.day))
-            DataRecorderPath = DataRecorderPath + log_path_format
-            # create the folder if it doesn't exist.
-            if not os.path.exists(DataRecorderPath):
-                os.makedirs(DataRecorderPath)
-
-            openFileName = self.getNextLogFile(DataRecorderPath,fileExtension)
-            if self.output_logBinary == True:
-                logFile = open(openFileName, "w+b")
-            else:
-                logFile = open(openFileName, "w")
-            
-            # growl message
-            shared.GrowlManager.add_message(self.name + ": Created log : " + openFileName)
-            return logFile,openFileName
-        except Exception as e: 
+            max_segment_mb = _input_file_utils.readConfigInt("DataRecorder", "max_segment_mb", 64)
+            flush_interval = float(_input_file_utils.readConfig("DataRecorder", "flush_interval", 0.5))
+            fsync_interval = float(_input_file_utils.readConfig("DataRecorder", "fsync_interval", 5))
+            max_queue = _input_file_utils.readConfigInt("DataRecorder", "max_queue", 5000)
+            self.output_logFileName = ""
+            self.output_logDropsReported = 0
+            self.output_logWarnTime = 0
+            def onOpen(fileName):
+                self.output_logFileName = fileName
+                print("Recording to: %s"%(fileName))
+                shared.GrowlManager.add_message(self.name + ": Created log : " + fileName)
+            recorder = _input_recorder.RecordingWriter(lambda: Input.getLogFilePath(self,fileExtension), self.inputNum, self.name,
+                max_segment_mb*1024*1024, flush_interval, framed=framed, max_queue=max_queue, fsync_interval=fsync_interval, onOpen=onOpen)
+            return recorder
+        except Exception as e:
             print(e)
-            print("Error createLogFile() %s"%(self.name))
-            # print full stack trace
+            print("Error createRecording() %s"%(self.name))
             import traceback
             traceback.print_exc()
-            return None,None
+            return None
+
+    #############################################
+    ## Method: getLogQueueStatus
+    ## returns (queue depth, queue percent full, dropped messages) for the current recording. None if not recording.
+    def getLogQueueStatus(self):
+        if not isinstance(self.output_logFile, _input_recorder.RecordingWriter):
+            return None
+        return self.output_logFile.queueDepth(), self.output_logFile.queuePercent(), self.output_logFile.dropped
+
+    #############################################
+    ## Method: checkLogQueue
+    ## warn the user if the recorder is falling behind or has dropped data. (at most every 5 seconds)
+    def checkLogQueue(self):
+        recorder = self.output_logFile
+        now = time.monotonic()
+        if now - self.output_logWarnTime < 5:
+            return
+        if recorder.dropped > self.output_logDropsReported:
+            shared.GrowlManager.add_message(self.name + ": Recorder dropped %d messages!"%(recorder.dropped - self.output_logDropsReported), color=(255,0,0))
+            self.output_logDropsReported = recorder.dropped
+            self.output_logWarnTime = now
+        elif recorder.queuePercent() > 75:
+            shared.GrowlManager.add_message(self.name + ": Recorder falling behind. queue %d%% full"%(recorder.queuePercent()), color=(255,255,0))
+            self.output_logWarnTime = now
 
     #############################################
     ## Method: closeLogFile
@@ -168,7 +225,15 @@ class Input:
     def addToLog(self,logfile,dataline):
         #print ("write")
         try:
-            if self.output_logBinary == True:
+            if isinstance(self.output_logFile, _input_recorder.RecordingWriter):
+                if isinstance(dataline, str):
+                    dataline = dataline.encode('utf-8')
+                elif isinstance(dataline, int):
+                    dataline = str(dataline).encode('utf-8')
+                self.output_logFile.write(dataline) # queued. written on the recorder thread.
+                if self.output_logFile.dropped > self.output_logDropsReported or self.output_logFile.queue.qsize() * 4 > self.output_logFile.max_queue * 3:
+                    Input.checkLogQueue(self)
+            elif self.output_logBinary == True:
                 # Ensure dataline is a bytes object before writing
                 if isinstance(dataline, str):
                     dataline = dataline.encode('utf-8')
@@ -210,8 +275,10 @@ class Input:
     ## tell this input to create log file and start logging data
     def startLog(self,aircraft):
         if self.output_logFile == None:
-            self.output_logFile,self.output_logFileName = Input.createLogFile(self,".dat")
-            print("Creating log output: %s"%(self.output_logFileName))
+            if _input_file_utils.readConfig("DataRecorder", "record_format", "tvr") == "raw":
+                self.output_logFile = Input.createRecording(self,".dat",framed=False)
+            else:
+                self.output_logFile = Input.createRecording(self)
             self.RecFile = self.output_logFile
         else:
             print("Already logging to: "+self.output_logFileName)
@@ -229,38 +296,171 @@ class Input:
 
         return False,None
 
+    #############################################
+    ## Function: indexLogMessages
+    ## scan a log file (raw bytes) and yield (offset, timestamp) for each message.
+    ## default is one message per line. inputs with binary logs override this.
+    def indexLogMessages(self, data):
+        return _input_log_index.scanLines(data, self.logLineTimestamp)
+
+    #############################################
+    ## Function: logLineTimestamp
+    ## return seconds of the day for a text log line, or None if the line has no time. override per input.
+    def logLineTimestamp(self, data, start, end):
+        return None
+
+    #############################################
+    ## Function: getLogIndex
+    ## get the offset index for the current playback file. built (or loaded from cache) on first use.
+    def getLogIndex(self):
+        if self.logIndex is None and self.PlayFile != None and self.input_logFileName != None:
+            self.logIndex = self.loadLogIndex(self.input_logFileName, self.input_logIsRecording)
+        return self.logIndex
+
+    #############################################
+    ## Function: loadLogIndex
+    ## load (or build and cache) the offset index of a playback file. None if it can't be built.
+    def loadLogIndex(self, filename, isRecording):
+        every = _input_file_utils.readConfigInt("DataRecorder", "log_index_time_every", 50)
+        scanner = self.indexLogMessages
+        maxGap = _input_log_index.MAX_TIME_GAP
+        if isRecording:
+            scanner = _input_recorder.scanRecords # recordings have the arrival time of every message.
+            maxGap = None # keep the real gaps so log time stays lined up with the recorded wall clock time.
+        try:
+            return _input_log_index.loadOrBuild(filename, scanner, every, maxGap)
+        except Exception as e:
+            print("Error building log index for "+self.name+": "+str(e))
+            return None
+
+    #############################################
+    ## Function: playbackSeeked
+    ## called after the playback file position is changed. inputs that buffer file data should clear it here.
+    def playbackSeeked(self):
+        pass
+
+    #############################################
+    ## Function: logSeek
+    ## move playback to a byte offset (should be the start of a message)
+    def logSeek(self, offset):
+        self.skipReadInput = True  # pause reading from the file while we move the file pointer.
+        try:
+            self.ser.seek(offset)
+        except Exception:
+            self.ser.seek(0)
+        self.playbackSeeked()
+        self.playback_jumped = True # line back up with the playback clock.
+        if self.input_logFileSize > 0:
+            self.input_logFilePercent = offset * 100 / self.input_logFileSize
+        self.skipReadInput = False
+
+    #############################################
+    ## Function: playbackPosition
+    ## file offset of the next message to be processed. inputs that read ahead into a buffer should override this.
+    def playbackPosition(self):
+        return self.ser.tell()
+
+    #############################################
+    ## Function: playbackDueIn
+    ## seconds until the next message in the playback file should be read. (using the shared playback clock)
+    ## messages are scheduled by their recorded time, or by playback_rate if the log has no timestamps.
+    def playbackDueIn(self):
+        clock = shared.PlaybackClock
+        if self.PlayFile == None or self.ser == None or clock.maxSpeed:
+            return 0
+        index = self.getLogIndex()
+        if index is None or index.count() == 0:
+            return 0
+        pos = self.playbackPosition()
+        logTime = index.timeAt(pos)
+        if logTime is None:
+            logTime = index.messageAt(pos) / self.playback_rate
+        jumped = self.playback_jumped or (self.playback_lastTime is not None and logTime < self.playback_lastTime)
+        self.playback_jumped = False
+        if self.input_logStartWall is not None:
+            # recording. played at the time it was recorded so it stays lined up with the other inputs.
+            self.playback_lastTime = logTime
+            return clock.dueIn(clock.recordedTime(self.input_logStartWall + logTime, jumped))
+        if self.playback_lastTime is None or jumped or self.playback_epoch != clock.epoch:
+            # first message, log started over, or rewound. line this log back up with the clock.
+            self.playback_offset = clock.now() - logTime
+            self.playback_epoch = clock.epoch
+        self.playback_lastTime = logTime
+        return clock.dueIn(logTime + self.playback_offset)
+
+    #############################################
+    ## Function: getLogTime
+    ## seconds since the start of the playback log, or None if this log has no timestamps.
+    def getLogTime(self):
+        index = self.getLogIndex()
+        if index is None: return None
+        return index.timeAt(self.ser.tell())
+
+    #############################################
+    ## Function: seekLogTime
+    ## jump to seconds since start of the playback log. returns False if the log has no timestamps.
+    def seekLogTime(self, seconds):
+        index = self.getLogIndex()
+        if index is None or not index.hasTimes(): return False
+        seconds = min(max(seconds, 0), index.duration())
+        self.logSeek(index.offsetForTime(seconds))
+        return True
+
+    #############################################
+    ## Function: seekLogPercent
+    ## jump to a percentage (0-100) of the playback log.
+    def seekLogPercent(self, percent):
+        index = self.getLogIndex()
+        if index is None or index.count() == 0: return False
+        self.logSeek(index.offsetForPercent(percent))
+        return True
+
+    #############################################
+    ## Function: skipLog
+    ## jump forward (or back if negative) in the playback log. uses time if the log has timestamps else percent.
+    ## when skipping several inputs call shared.PlaybackClock.skipRecorded(seconds) first.
+    def skipLog(self, aircraft, seconds, percent):
+        if self.PlayFile == None: return
+        index = self.getLogIndex()
+        if index is None: return
+        current = self.ser.tell()
+        recorded = None
+        if self.input_logStartWall is not None:
+            recorded = shared.PlaybackClock.recordedNow()
+        if recorded is not None:
+            # recording. go to where the shared timeline is now (moved by PlaybackClock.skipRecorded) so it stays lined up.
+            self.seekLogTime(recorded - self.input_logStartWall)
+            self.playback_jumped = False
+            self.playback_lastTime = None
+        elif index.hasTimes():
+            self.seekLogTime(index.timeAt(current) + seconds)
+        else:
+            self.seekLogPercent(index.percentAt(current) + percent)
+        print("skipLog->"+self.name+" "+str(current)+" -> "+str(self.ser.tell()))
+
     #############################################
     # fast forward if reading from a file.
     def fastForward(self,aircraft,bytesToSkip):
-            try:
-                if self.PlayFile != None:
-                    current = self.ser.tell()
-                    moveTo = current - bytesToSkip
-                    for _ in range(bytesToSkip):
-                        next(self.ser) # have to use next...
-            except:
-                # if error then just to start of file
-                self.ser.seek(0)
-                #print("fastForward() before="+str(current)+" goto:"+str(moveTo)+" done="+str(self.ser.tell()))
+            if self.PlayFile != None:
+                index = self.getLogIndex()
+                moveTo = self.ser.tell() + bytesToSkip
+                if index is not None:
+                    moveTo = index.offsetAtOrAfter(moveTo)  # snap to the start of the next message.
+                if moveTo is None or moveTo >= self.input_logFileSize:
+                    moveTo = 0 # past the end so go to start of file.
+                self.logSeek(moveTo)
                 print("fastForward->"+self.name)
 
     #############################################
     # fast backwards if reading from a file.
     def fastBackwards(self,aircraft,bytesToSkip):
             if self.PlayFile != None:
-                self.skipReadInput = True  # lets pause reading from the file for second while we mess with the file pointer.
-                current = self.ser.tell()
-                moveTo = current - bytesToSkip
+                index = self.getLogIndex()
+                moveTo = self.ser.tell() - bytesToSkip
                 if(moveTo<0): moveTo = 0
-                self.ser.seek(0) # reset back to begining.
-                try:
-                    for _ in range(moveTo):
-                        next(self.ser) # jump to that postion???  not really working right.
-                except:
-                    # if error then just to start of file
-                    self.ser.seek(0)
-                #print("fastForward() before="+str(current)+" goto:"+str(moveTo)+" done="+str(self.ser.tell()))
-                self.skipReadInput = False
+                if index is not None and index.count() > 0:
+                    moveTo = index.offsets[index.messageAt(moveTo)]  # snap to the start of the message.
+                self.logSeek(moveTo)
                 print("fastBackwards->"+self.name)
 
 
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+# ICAO address map used by the traffic inputs.
+# Keeps what we know about each address we've heard (N-Number, flight number, FAA record) so it
+# doesn't have to be worked out again for every traffic report.
+# Entries are dropped once an address hasn't been heard for ttl seconds, and the oldest entries
+# are dropped if the map gets to max_size. (so a ground station running for days doesn't keep
+# every address it has ever heard)
+
+from collections import OrderedDict
+
+
+#############################################
+## Class: AddressMap
+## address -> entry dict. entries are kept in last_seen order (oldest first) so expiring
+## and evicting only ever looks at the front of the map.
+class AddressMap(object):
+    def __init__(self, ttl=600, max_size=5000):
+        self.entries = OrderedDict()
+        self.ttl = ttl # seconds since an address was last heard before its entry is dropped.
+        self.max_size = max_size
+
+        # stats
+        self.hits = 0 # address found
+        self.misses = 0 # new address
+        self.expired = 0 # entries dropped because of the ttl
+        self.evicted = 0 # entries dropped because the map was full
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, address):
+        return address in self.entries
+
+    #############################################
+    ## Function: get
+    ## entry for an address (or None) and mark it as heard now.
+    def get(self, address, now):
+        entry = self.entries.get(address)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry['last_seen'] = now
+        self.entries.move_to_end(address)
+        return entry
+
+    #############################################
+    ## Function: peek
+    ## entry for an address (or None). doesn't count as hearing it.
+    def peek(self, address):
+        return self.entries.get(address)
+
+    #############################################
+    ## Function: add
+    ## add the entry for a new address. drops the oldest entries if the map is full.
+    def add(self, address, entry, now):
+        entry['last_seen'] = now
+        self.entries[address] = entry
+        self.entries.move_to_end(address)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+
+    #############################################
+    ## Function: expire
+    ## drop entries that haven't been heard for ttl seconds.
+    def expire(self, now):
+        cutoff = now - self.ttl
+        entries = self.entries
+        while entries:
+            address = next(iter(entries))
+            if entries[address]['last_seen'] >= cutoff:
+                break
+            del entries[address]
+            self.expired += 1
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
@@ -87,12 +87,12 @@ def getLogDataFiles(showErrorIfNoUSB=False):
     # list files in inputs example folder.
     lst = os.listdir("lib/inputs/_example_data")
     for d in lst:
-        if not d.startswith("_"):
+        if not d.startswith("_") and not d.endswith(".idx"): # skip log index files
             files.append(d)
     # list datarecorder path.
     lst = os.listdir(extraPath)
     for d in lst:
-        if d.endswith(".dat") or d.endswith(".log") or d.endswith(".bin"):
+        if d.endswith(".dat") or d.endswith(".log") or d.endswith(".bin") or d.endswith(".tvr"):
             extrafiles.append(d)
     # list files found on usb drive if any.
     try:
@@ -100,7 +100,7 @@ def getLogDataFiles(showErrorIfNoUSB=False):
             usbpath = "/mnt/usb/"
             lst = os.listdir(usbpath)
             for d in lst:
-                if d.endswith(".dat") or d.endswith(".log") or d.endswith(".bin"):
+                if d.endswith(".dat") or d.endswith(".log") or d.endswith(".bin") or d.endswith(".tvr"):
                     usbfiles.append(d)
         else:
             if(showErrorIfNoUSB==True): print("Not USB drive found.")
@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+
+# GDL90 codec shared by the network traffic inputs (stratux, levil, etc)
+# Handles the 0x7E framing, 0x7D byte-unstuffing and the CRC (FCS) check, then decodes the
+# messages we use with precompiled struct layouts into reusable record objects.
+# (records are reused for every message so they are only valid until the next decode)
+#
+# GDL90 spec: https://www.faa.gov/sites/faa.gov/files/air_traffic/technology/adsb/archival/GDL90_Public_ICD_RevA.PDF
+# Levil/Stratux AHRS extension: messages that start with ~LE (id 0x4C 'L', then 'E', sub id, version)
+
+import re
+import struct
+from binascii import crc_hqx
+
+FLAG_BYTE = 0x7E
+ESCAPE_BYTE = 0x7D
+
+# message ids
+MSG_HEARTBEAT = 0
+MSG_UPLINK = 7
+MSG_OWNSHIP = 10
+MSG_OWNSHIP_GEO_ALT = 11
+MSG_TRAFFIC = 20
+MSG_FOREFLIGHT = 101
+MSG_LEVIL = 0x4C # 'L'
+
+# Levil/Stratux sub message ids. (returned as MSG_LEVIL_BASE + sub id)
+MSG_LEVIL_BASE = 0x4C00
+MSG_LEVIL_STATUS = MSG_LEVIL_BASE + 0
+MSG_LEVIL_AHRS = MSG_LEVIL_BASE + 1
+MSG_LEVIL_METRICS = MSG_LEVIL_BASE + 2
+MSG_LEVIL_GPS_STATUS = MSG_LEVIL_BASE + 7
+
+# traffic report address types. (ADDR_ICAO and ADDR_TISB_ICAO addresses are real ICAO 24-bit addresses)
+ADDR_ICAO = 0
+ADDR_SELF_ASSIGNED = 1
+ADDR_TISB_ICAO = 2
+ADDR_TISB_TRACK = 3
+
+# struct layouts. offsets are into the unstuffed message (no flags). byte 0 is the message id.
+HEARTBEAT = struct.Struct("<BBH")               # status1, status2, timestamp (little endian)
+# traffic/ownship report. the 12 and 24 bit fields are read in bigger chunks and split with shifts:
+# status/type + address (I), lat + lon (H + I), alt + misc (H), nic/nacp, hvel hi, hvel lo + vvel (H), track, emitter, callsign, priority
+TRAFFIC = struct.Struct(">IHIHBBHBB8sB")
+GEO_ALT = struct.Struct(">hH")                  # geo altitude (5 ft), vertical metrics
+LEVIL_HEADER = struct.Struct(">BBBB")           # 'L', 'E', sub id, version
+LEVIL_AHRS = struct.Struct(">hhhhhhhHhBB")      # roll, pitch, yaw, inclination, turn coord, g load, ias, pressure alt, vspeed, aoa, oat
+LEVIL_STATUS = struct.Struct(">BBHBB")          # firmware, battery, error, waas, aux
+LEVIL_METRICS = struct.Struct(">BB")            # aoa, oat
+LEVIL_GPS_STATUS = struct.Struct(">BBHB")       # waas status, sats, power, out rate
+
+LAT_LON_INCREMENT = 180.0 / (2**23)
+TRACK_INCREMENT = 360.0 / 256
+NOT_AVAILABLE = 32767 # levil ahrs value when not available.
+CALLSIGN_CLEAN = re.compile(rb'[^A-Za-z0-9]+')
+
+
+#############################################
+## Function: _buildCrcTable
+## CRC-CCITT (poly 0x1021) lookup table from the GDL90 spec.
+def _buildCrcTable():
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for bit in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+CRC_TABLE = _buildCrcTable()
+
+
+#############################################
+## Function: crc16Table
+## GDL90 frame check sequence of data, byte by byte from the lookup table like the spec.
+def crc16Table(data):
+    table = CRC_TABLE
+    crc = 0
+    for b in data:
+        crc = table[crc >> 8] ^ ((crc << 8) & 0xFFFF) ^ b
+    return crc
+
+
+#############################################
+## Function: crc16
+## GDL90 frame check sequence of data. same result as crc16Table but the table lookups are done in C.
+## the spec's loop shifts the message through without the 16 zero bits a normal crc-ccitt appends, so it
+## equals crc_hqx (crc-ccitt, poly 0x1021) of all but the last 2 bytes xor'd with the last 2 bytes.
+def crc16(data):
+    length = len(data)
+    if length < 2:
+        return crc16Table(data)
+    return crc_hqx(data[:length-2], 0) ^ ((data[length-2] << 8) | data[length-1])
+
+
+#############################################
+## Function: checkCrc
+## msg is an unstuffed message with the 2 byte FCS on the end. (LSB first)
+def checkCrc(msg):
+    length = len(msg)
+    if length < 3:
+        return False
+    return crc16(msg[:length-2]) == (msg[length-2] | (msg[length-1] << 8))
+
+
+#############################################
+## Function: unstuff
+## strip the flag bytes and undo the 0x7D escaping. (0x7D 0x5E -> 0x7E, 0x7D 0x5D -> 0x7D)
+## if nothing is escaped (almost always) then a memoryview slice is returned. no copy.
+def unstuff(frame):
+    if not isinstance(frame, memoryview):
+        frame = memoryview(frame)
+    end = len(frame)
+    start = 1 if end and frame[0] == FLAG_BYTE else 0
+    if end > start and frame[end-1] == FLAG_BYTE:
+        end -= 1
+    msg = frame[start:end]
+    if ESCAPE_BYTE not in msg:
+        return msg
+    # only the flag and escape bytes are ever escaped. 7D 5E has to be done first so 7D 5D 5E comes out as 7D 5E.
+    return memoryview(bytes(msg).replace(b"\x7d\x5e", b"\x7e").replace(b"\x7d\x5d", b"\x7d"))
+
+
+#############################################
+## Function: stuff
+## escape a message and add the FCS and flag bytes. (used for building test/replay data)
+def stuff(msg):
+    crc = crc16(msg)
+    out = bytearray([FLAG_BYTE])
+    for b in bytes(msg) + bytes((crc & 0xFF, crc >> 8)):
+        if b == FLAG_BYTE or b == ESCAPE_BYTE:
+            out.append(ESCAPE_BYTE)
+            out.append(b ^ 0x20)
+        else:
+            out.append(b)
+    out.append(FLAG_BYTE)
+    return bytes(out)
+
+
+#############################################
+## Class: Heartbeat
+class Heartbeat(object):
+    __slots__ = ("status1", "status2", "timestamp", "gpsValid")
+    def __init__(self):
+        self.status1 = 0
+        self.status2 = 0
+        self.timestamp = None # seconds since 0000Z
+        self.gpsValid = False
+
+
+#############################################
+## Class: TrafficReport
+## used for both traffic (id 20) and ownship (id 10) reports.
+class TrafficReport(object):
+    __slots__ = ("alertStatus", "addressType", "address", "lat", "lon", "alt", "misc", "NIC", "NACp",
+                 "speed", "vspeed", "track", "emitter", "callsign", "priority")
+    def __init__(self):
+        self.alertStatus = 0
+        self.addressType = 0
+        self.address = 0
+        self.lat = 0
+        self.lon = 0
+        self.alt = None # feet. None if not available.
+        self.misc = 0
+        self.NIC = 0
+        self.NACp = 0
+        self.speed = None # knots. None if not available.
+        self.vspeed = None # fpm. None if not available.
+        self.track = None # degrees. None if not available.
+        self.emitter = 0
+        self.callsign = ""
+        self.priority = 0
+
+
+#############################################
+## Class: GeoAltitude
+class GeoAltitude(object):
+    __slots__ = ("alt", "verticalWarning", "VFOM")
+    def __init__(self):
+        self.alt = 0 # feet (5 ft resolution)
+        self.verticalWarning = False
+        self.VFOM = None # meters. None if not available.
+
+
+#############################################
+## Class: LevilAHRS
+class LevilAHRS(object):
+    __slots__ = ("version", "roll", "pitch", "yaw", "inclination", "turnCoord", "gLoad", "ias", "pressAlt", "vSpeed", "AOA", "OAT")
+    def __init__(self):
+        self.version = 0
+        self.roll = None # raw values. 32767 if not available.
+        self.pitch = None
+        self.yaw = None
+        self.inclination = None
+        self.turnCoord = None
+        self.gLoad = None
+        self.ias = None
+        self.pressAlt = None
+        self.vSpeed = None
+        self.AOA = None
+        self.OAT = None
+
+
+#############################################
+## Class: LevilStatus
+## used for the status (0), metrics (2) and gps status (7) messages.
+class LevilStatus(object):
+    __slots__ = ("version", "firmware", "battery", "error", "WAAS", "aux", "AOA", "OAT", "sats", "power", "outRate")
+    def __init__(self):
+        self.version = 0
+        self.firmware = None
+        self.battery = None
+        self.error = None
+        self.WAAS = None
+        self.aux = None
+        self.AOA = None
+        self.OAT = None
+        self.sats = None
+        self.power = None
+        self.outRate = None
+
+
+#############################################
+## Class: GDL90Decoder
+## decode(frame) takes a ~ framed message (a memoryview from splitFrames is fine) and returns
+## (msgId, record). record is None for messages we don't decode. msgId is None if the frame is bad.
+class GDL90Decoder(object):
+    def __init__(self, checkFcs=True, trafficFilter=None):
+        self.checkFcs = checkFcs
+        # optional trafficFilter(lat, lon) called as soon as a traffic report's position is decoded.
+        # if it returns False the rest of the report is skipped and decode returns (MSG_TRAFFIC, None).
+        self.trafficFilter = trafficFilter
+        self.heartbeat = Heartbeat()
+        self.ownship = TrafficReport()
+        self.traffic = TrafficReport()
+        self.geoAlt = GeoAltitude()
+        self.ahrs = LevilAHRS()
+        self.status = LevilStatus()
+
+        # stats
+        self.frames = 0 # frames decoded
+        self.crc_errors = 0 # frames dropped because of a bad FCS
+        self.bad_length = 0 # frames dropped because they were too short for the message id
+        self.unknown = 0 # frames with a message id we don't decode
+        self.filtered = 0 # traffic reports rejected by trafficFilter
+
+    #############################################
+    ## Function: decode
+    def decode(self, frame):
+        msg = unstuff(frame)
+        length = len(msg)
+        if length < 3:
+            self.bad_length += 1
+            return None, None
+        fcs = msg[length-2] | (msg[length-1] << 8) # FCS is sent LSB first.
+        msg = msg[:length-2]
+        if self.checkFcs and crc16(msg) != fcs:
+            self.crc_errors += 1
+            return None, None
+        msgId = msg[0]
+        try:
+            if msgId == MSG_TRAFFIC:
+                self.frames += 1
+                return msgId, self._decodeTraffic(msg, self.traffic, self.trafficFilter)
+            elif msgId == MSG_OWNSHIP:
+                self.frames += 1
+                return msgId, self._decodeTraffic(msg, self.ownship)
+            elif msgId == MSG_LEVIL and length > 4 and msg[1] == 0x45: # 'E'
+                self.frames += 1
+                return self._decodeLevil(msg)
+            elif msgId == MSG_HEARTBEAT:
+                self.frames += 1
+                hb = self.heartbeat
+                hb.status1, hb.status2, timestamp = HEARTBEAT.unpack_from(msg, 1)
+                if hb.status2 & 0x80: # bit 16 of the timestamp
+                    timestamp += (1 << 16)
+                hb.timestamp = timestamp
+                hb.gpsValid = (hb.status1 & 0x80) != 0
+                return msgId, hb
+            elif msgId == MSG_OWNSHIP_GEO_ALT:
+                self.frames += 1
+                geo = self.geoAlt
+                alt, metrics = GEO_ALT.unpack_from(msg, 1)
+                geo.alt = alt * 5
+                geo.verticalWarning = (metrics & 0x8000) != 0
+                vfom = metrics & 0x7FFF
+                geo.VFOM = None if vfom == 0x7FFF else vfom
+                return msgId, geo
+        except struct.error:
+            self.frames -= 1
+            self.bad_length += 1
+            return None, None
+        self.unknown += 1
+        return msgId, None
+
+    def _decodeTraffic(self, msg, rec, trafficFilter=None):
+        (stAddr, latLonHi, latLonLo, altMisc, nicNacp, hvHi, hvVv,
+            track, emitter, callsign, priority) = TRAFFIC.unpack_from(msg, 1)
+        # lat and lon are 24 bit signed. (x ^ 0x800000) - 0x800000 sign extends.
+        latLon = (latLonHi << 32) | latLonLo
+        lat = (((latLon >> 24) ^ 0x800000) - 0x800000) * LAT_LON_INCREMENT
+        lon = (((latLon & 0xFFFFFF) ^ 0x800000) - 0x800000) * LAT_LON_INCREMENT
+        if trafficFilter is not None and not trafficFilter(lat, lon):
+            self.filtered += 1
+            return None
+        rec.lat = lat
+        rec.lon = lon
+        rec.alertStatus = stAddr >> 28
+        rec.addressType = (stAddr >> 24) & 0x0F
+        rec.address = stAddr & 0xFFFFFF
+        alt = altMisc >> 4
+        rec.alt = None if alt == 0xFFF else (alt * 25) - 1000
+        rec.misc = altMisc & 0x0F
+        rec.NIC = nicNacp >> 4
+        rec.NACp = nicNacp & 0x0F
+        speed = (hvHi << 4) | (hvVv >> 12)
+        rec.speed = None if speed == 0xFFF else speed
+        # vertical velocity is a 12 bit two's complement value in units of 64 fpm. 0x800 = not available.
+        vvel = hvVv & 0xFFF
+        if vvel == 0x800:
+            rec.vspeed = None
+        else:
+            if vvel & 0x800:
+                vvel -= 0x1000
+            rec.vspeed = vvel * 64
+        rec.track = None if track == 0xFF else track * TRACK_INCREMENT
+        rec.emitter = emitter
+        rec.callsign = CALLSIGN_CLEAN.sub(b'', callsign).decode('ascii', errors='ignore')
+        rec.priority = priority >> 4
+        return rec
+
+    def _decodeLevil(self, msg):
+        l, e, subId, version = LEVIL_HEADER.unpack_from(msg, 0)
+        msgId = MSG_LEVIL_BASE + subId
+        if msgId == MSG_LEVIL_AHRS:
+            ahrs = self.ahrs
+            ahrs.version = version
+            (ahrs.roll, ahrs.pitch, ahrs.yaw, ahrs.inclination, ahrs.turnCoord, ahrs.gLoad,
+                ahrs.ias, ahrs.pressAlt, ahrs.vSpeed, ahrs.AOA, ahrs.OAT) = LEVIL_AHRS.unpack_from(msg, 4)
+            return msgId, ahrs
+        status = self.status
+        status.version = version
+        if msgId == MSG_LEVIL_STATUS:
+            status.firmware, status.battery, status.error, status.WAAS, status.aux = LEVIL_STATUS.unpack_from(msg, 4)
+            return msgId, status
+        elif msgId == MSG_LEVIL_METRICS:
+            status.AOA, status.OAT = LEVIL_METRICS.unpack_from(msg, 4)
+            return msgId, status
+        elif msgId == MSG_LEVIL_GPS_STATUS:
+            status.WAAS, status.sats, status.power, status.outRate = LEVIL_GPS_STATUS.unpack_from(msg, 4)
+            return msgId, status
+        self.frames -= 1
+        self.unknown += 1
+        return msgId, None
+
+
+#############################################
+## Function: scanLogFrames
+## used by the playback log index. yield (offset, seconds of day) for every ~ framed message in a log.
+## time comes from the GDL90 heartbeat (id 0) timestamp.
+def scanLogFrames(data):
+    decoder = GDL90Decoder()
+    view = memoryview(data)
+    dataLen = len(data)
+    start = data.find(b"~")
+    while start != -1 and start < dataLen - 1:
+        end = data.find(b"~", start + 1)
+        if end == -1:
+            break
+        if end - start == 1:
+            start = end # back to back ~~. 2nd one starts the next frame.
+            continue
+        timestamp = None
+        if data[start+1] == MSG_HEARTBEAT:
+            msgId, rec = decoder.decode(view[start:end+1])
+            if msgId == MSG_HEARTBEAT and rec.timestamp < 86400:
+                timestamp = rec.timestamp
+        yield start, timestamp
+        start = data.find(b"~", end + 1)
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
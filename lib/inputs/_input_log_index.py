@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+
+# Log file offset index.
+# Stores the byte offset of every message in a recorded log, plus a decoded
+# timestamp every N messages (and each time the second changes), so playback can jump to any time or percentage
+# of the log without reading through it.
+# The index is cached next to the log file (logfile + ".idx") and rebuilt
+# if the log file size or modified time changes.
+
+import os
+import struct
+from array import array
+from bisect import bisect_right
+
+INDEX_EXTENSION = ".idx"
+INDEX_MAGIC = b"TVIX"
+INDEX_VERSION = 4
+# magic, version, log size, log mtime(ns), message count, time checkpoint count, time checkpoint every N messages
+INDEX_HEADER = struct.Struct("<4sIQQIII")
+MAX_TIME_GAP = 60 # seconds. bigger jumps between timestamps are treated as a break in the log.
+
+
+#############################################
+## Class: LogIndex
+class LogIndex(object):
+    def __init__(self, filename):
+        self.filename = filename
+        self.size = 0
+        self.mtime = 0
+        self.every = 0
+        self.offsets = array('Q') # byte offset of every message
+        self.time_msg = array('I') # message number for each time checkpoint
+        self.time_val = array('d') # seconds since start of log for each time checkpoint
+
+    def indexFileName(self):
+        return self.filename + INDEX_EXTENSION
+
+    def count(self):
+        return len(self.offsets)
+
+    def hasTimes(self):
+        return len(self.time_val) > 1
+
+    def duration(self):
+        if len(self.time_val) == 0: return 0
+        return self.time_val[-1]
+
+    #############################################
+    ## Function: build
+    ## scanner(data) yields (offset, timestamp) for each message in the log. timestamp is seconds of the day or None.
+    ## maxGap None keeps every gap. (recordings, their times always go forward)
+    def build(self, scanner, every=50, maxGap=MAX_TIME_GAP):
+        stat = os.stat(self.filename)
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        self.every = every
+        self.offsets = array('Q')
+        self.time_msg = array('I')
+        self.time_val = array('d')
+
+        with open(self.filename, "rb") as f:
+            data = f.read()
+
+        last_time = None
+        elapsed = 0
+        last_checkpoint = -every
+        for offset, timestamp in scanner(data):
+            msgNum = len(self.offsets)
+            self.offsets.append(offset)
+            if timestamp is None:
+                continue
+            if last_time is None:
+                last_time = timestamp
+            # time since the last timestamp. (mod handles passing midnight)
+            # if time jumps back or way forward the log was spliced or the clock reset, so just continue on from there.
+            delta = (timestamp - last_time) % 86400
+            if maxGap is not None and delta > maxGap:
+                delta = 0
+            newSecond = timestamp != last_time
+            last_time = timestamp
+            elapsed += delta
+            if newSecond or msgNum - last_checkpoint >= every:
+                self.time_msg.append(msgNum)
+                self.time_val.append(elapsed)
+                last_checkpoint = msgNum
+        return self
+
+    #############################################
+    ## Function: load
+    ## load the cached index. returns False if missing or the log has changed since it was built.
+    def load(self):
+        try:
+            stat = os.stat(self.filename)
+            with open(self.indexFileName(), "rb") as f:
+                magic, version, size, mtime, count, time_count, every = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                    return False
+                if size != stat.st_size or mtime != stat.st_mtime_ns:
+                    return False # log file changed.
+                self.size = size
+                self.mtime = mtime
+                self.every = every
+                self.offsets = array('Q')
+                self.offsets.fromfile(f, count)
+                self.time_msg = array('I')
+                self.time_msg.fromfile(f, time_count)
+                self.time_val = array('d')
+                self.time_val.fromfile(f, time_count)
+            return True
+        except (OSError, EOFError, struct.error):
+            return False
+
+    #############################################
+    ## Function: save
+    ## save index next to the log file. returns False if the dir is not writable.
+    def save(self):
+        try:
+            with open(self.indexFileName(), "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.size, self.mtime, len(self.offsets), len(self.time_msg), self.every))
+                self.offsets.tofile(f)
+                self.time_msg.tofile(f)
+                self.time_val.tofile(f)
+            return True
+        except OSError as e:
+            print("LogIndex: unable to save index "+self.indexFileName()+" "+str(e))
+            return False
+
+    #############################################
+    ## Function: messageAt
+    ## get the message number that contains this byte offset.
+    def messageAt(self, offset):
+        return max(bisect_right(self.offsets, offset) - 1, 0)
+
+    #############################################
+    ## Function: offsetAtOrAfter
+    ## get the start of the first message at or after this byte offset. None if past the end of the log.
+    def offsetAtOrAfter(self, offset):
+        msgNum = bisect_right(self.offsets, offset - 1)
+        if msgNum >= len(self.offsets):
+            return None
+        return self.offsets[msgNum]
+
+    #############################################
+    ## Function: offsetForPercent
+    def offsetForPercent(self, percent):
+        if len(self.offsets) == 0: return 0
+        msgNum = int(len(self.offsets) * min(max(percent, 0), 100) / 100)
+        return self.offsets[min(msgNum, len(self.offsets) - 1)]
+
+    #############################################
+    ## Function: percentAt
+    def percentAt(self, offset):
+        if len(self.offsets) == 0: return 0
+        return self.messageAt(offset) * 100 / len(self.offsets)
+
+    #############################################
+    ## Function: offsetForTime
+    ## get the offset of the message closest to seconds since the start of the log.
+    def offsetForTime(self, seconds):
+        if not self.hasTimes():
+            return None
+        i = bisect_right(self.time_val, seconds) - 1
+        if i < 0: return self.offsets[0]
+        if i >= len(self.time_val) - 1: return self.offsets[self.time_msg[-1]]
+        # interpolate message number between the checkpoints.
+        t0, t1 = self.time_val[i], self.time_val[i+1]
+        m0, m1 = self.time_msg[i], self.time_msg[i+1]
+        if t1 > t0:
+            m0 = m0 + int((m1 - m0) * (seconds - t0) / (t1 - t0))
+        return self.offsets[m0]
+
+    #############################################
+    ## Function: timeAt
+    ## get the log time (seconds since the start of the log) at this byte offset.
+    def timeAt(self, offset):
+        if not self.hasTimes():
+            return None
+        msgNum = self.messageAt(offset)
+        i = bisect_right(self.time_msg, msgNum) - 1
+        if i < 0: return 0
+        if i >= len(self.time_msg) - 1: return self.time_val[-1]
+        m0, m1 = self.time_msg[i], self.time_msg[i+1]
+        t0, t1 = self.time_val[i], self.time_val[i+1]
+        return t0 + (t1 - t0) * (msgNum - m0) / (m1 - m0)
+
+
+#############################################
+## Function: loadOrBuild
+## load the cached index for a log file, or build (and cache) it if missing or out of date.
+def loadOrBuild(filename, scanner, every=50, maxGap=MAX_TIME_GAP):
+    index = LogIndex(filename)
+    if index.load():
+        return index
+    print("Building log index: "+filename)
+    index.build(scanner, every, maxGap)
+    index.save()
+    return index
+
+
+#############################################
+## Function: scanLines
+## default scanner for text logs. each line is a message.
+def scanLines(data, timestampFunc=None):
+    pos = 0
+    dataLen = len(data)
+    while pos < dataLen:
+        end = data.find(b"\n", pos)
+        if end == -1: end = dataLen
+        if timestampFunc is not None:
+            yield pos, timestampFunc(data, pos, end)
+        else:
+            yield pos, None
+        pos = end + 1
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+
+# TronView recording container. (.tvr)
+# Every message from an input is wrapped with the time it arrived, the input id and the length.
+# so a replay can reproduce the real timing and line up several inputs.
+#
+# File header: magic "TVRC", version, input id, wall clock start time, input name (32 bytes)
+#              (the start time puts recordings of different inputs on one timeline for playback, see playback_clock.py)
+# Record:      time (seconds since recording start, monotonic), input id, length, then the message bytes.
+#
+# Recordings are written by a background thread in batches so the input thread never waits on the disk.
+# (the same writer is used for legacy raw logs, just without the framing)
+# Recordings are split into segments once a segment gets to max_segment_bytes. each segment has its own header
+# so any segment can be played back on its own.
+
+import io
+import os
+import queue
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+RECORDING_EXTENSION = ".tvr"
+RECORDING_MAGIC = b"TVRC"
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct("<4sHHd32s")
+RECORD_HEADER = struct.Struct("<dHI") # time, input id, length
+
+
+#############################################
+## Function: isRecording
+## check if a file is a recording container. (else it's a legacy raw log)
+def isRecording(filename):
+    try:
+        with open(filename, "rb") as f:
+            return f.read(4) == RECORDING_MAGIC
+    except OSError:
+        return False
+
+
+#############################################
+## Function: scanRecords
+## used by the playback log index. yield (offset, time) for every record.
+## offset is the position in the message stream (what the input reads), not the file.
+def scanRecords(data):
+    pos = RECORDING_HEADER.size
+    dataLen = len(data)
+    streamPos = 0
+    while pos + RECORD_HEADER.size <= dataLen:
+        t, inputId, length = RECORD_HEADER.unpack_from(data, pos)
+        pos += RECORD_HEADER.size
+        if pos + length > dataLen:
+            break # last record was cut short.
+        yield streamPos, t
+        streamPos += length
+        pos += length
+
+
+#############################################
+## Class: RecordingWriter
+## write messages to a recording (or legacy raw log if framed=False) on a background thread.
+## the input thread only puts messages on a bounded queue. if the disk can't keep up and the queue
+## fills then messages are dropped (and counted) instead of stalling the input.
+class RecordingWriter(object):
+    def __init__(self, nextFileName, inputNum, inputName, max_segment_bytes=64*1024*1024, flush_interval=0.5,
+                 framed=True, max_queue=5000, fsync_interval=5, onOpen=None):
+        self.nextFileName = nextFileName # function that returns the filename to use for the next segment. (called on the writer thread)
+        self.onOpen = onOpen # called with the filename each time a segment is opened.
+        self.inputNum = inputNum
+        self.inputName = inputName
+        self.framed = framed
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval # seconds between fsync. 0 to never fsync.
+        self.mono0 = time.monotonic() # record times are seconds since this.
+        self.wall0 = time.time()
+
+        self.file = None
+        self.fileName = None
+        self.failed = False
+        self.segment_bytes = 0
+        self.segments = 0
+
+        # stats
+        self.records = 0 # messages written
+        self.bytes = 0 # message bytes written
+        self.writes = 0 # file writes (each write is a batch of messages)
+        self.dropped = 0 # messages dropped because the queue was full
+        self.max_queue = max_queue
+        self.max_depth = 0 # most messages waiting in the queue
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = threading.Thread(target=self.run, name="recorder_"+str(inputName), daemon=True)
+        self.thread.start()
+
+    #############################################
+    ## Function: write
+    ## called from the input thread. never blocks. data is copied so the caller can reuse its buffer.
+    def write(self, data):
+        try:
+            self.queue.put_nowait((time.monotonic() - self.mono0, bytes(data)))
+        except queue.Full:
+            self.dropped += 1
+
+    #############################################
+    ## Function: queueDepth
+    ## number of messages waiting to be written.
+    def queueDepth(self):
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return depth
+
+    #############################################
+    ## Function: queuePercent
+    ## how full the queue is. (0-100)
+    def queuePercent(self):
+        return self.queueDepth() * 100 / self.max_queue
+
+    #############################################
+    ## Function: close
+    ## write anything still queued then close the file.
+    def close(self):
+        try:
+            self.queue.put(None, timeout=5)
+        except queue.Full:
+            pass
+        self.thread.join(5)
+
+    def openSegment(self):
+        if self.file is not None:
+            self.file.close()
+        self.fileName = self.nextFileName()
+        self.file = open(self.fileName, "wb", buffering=64*1024)
+        self.segment_bytes = 0
+        if self.framed:
+            header = RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, self.inputNum, self.wall0, str(self.inputName).encode()[:32])
+            self.file.write(header)
+            self.segment_bytes = len(header)
+        self.segments += 1
+        if self.onOpen is not None:
+            self.onOpen(self.fileName)
+
+    #############################################
+    ## Function: run
+    ## writer thread. wait for messages then write everything waiting in one go.
+    def run(self):
+        try:
+            self.openSegment() # create dirs and open the file here so the input thread doesn't wait on it.
+        except Exception as e:
+            print("Recorder "+str(self.inputName)+" unable to create log file: "+str(e))
+            self.failed = True
+        pack = RECORD_HEADER.pack
+        headerSize = RECORD_HEADER.size if self.framed else 0
+        minSegment = RECORDING_HEADER.size if self.framed else 0
+        last_flush = last_fsync = time.monotonic()
+        running = True
+        while running:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            self.queueDepth() # track max depth
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self.failed:
+                running = None not in batch
+                continue
+            try:
+                chunks = []
+                chunkBytes = 0
+                for item in batch:
+                    if item is None:
+                        running = False
+                        break
+                    t, data = item
+                    recordLen = headerSize + len(data)
+                    if self.segment_bytes + chunkBytes + recordLen > self.max_segment_bytes and self.segment_bytes + chunkBytes > minSegment:
+                        # segment is full. write what we have then start the next one.
+                        self.file.write(b"".join(chunks))
+                        chunks = []
+                        chunkBytes = 0
+                        self.openSegment()
+                    if self.framed:
+                        chunks.append(pack(t, self.inputNum, len(data)))
+                    chunks.append(data)
+                    chunkBytes += recordLen
+                    self.records += 1
+                    self.bytes += len(data)
+                if chunks:
+                    self.file.write(b"".join(chunks)) # coalesce the whole batch into one write.
+                    self.writes += 1
+                    self.segment_bytes += chunkBytes
+                now = time.monotonic()
+                if now - last_flush >= self.flush_interval or not running:
+                    self.file.flush()
+                    last_flush = now
+                    if self.fsync_interval > 0 and (now - last_fsync >= self.fsync_interval or not running):
+                        os.fsync(self.file.fileno()) # make sure it's on the sd card/usb drive in case power is pulled.
+                        last_fsync = now
+            except Exception as e:
+                print("Recorder "+str(self.inputName)+" write error: "+str(e))
+        try:
+            if self.file is not None:
+                self.file.close()
+        except Exception:
+            pass
+
+
+#############################################
+## Class: RecordingReader
+## read back the messages in a recording as one continuous stream so inputs can read it
+## just like a legacy raw log. (wrap in io.BufferedReader or io.TextIOWrapper)
+## offsets is the stream offset of every record. (the playback log index has them, see scanRecords)
+## if not given the file is scanned for them. the file position of any record works out from its
+## stream offset, so that one array is all that is kept.
+class RecordingReader(io.RawIOBase):
+    def __init__(self, filename, offsets=None):
+        self.filename = filename
+        self.f = open(filename, "rb")
+        magic, version, inputNum, wall0, name = RECORDING_HEADER.unpack(self.f.read(RECORDING_HEADER.size))
+        if magic != RECORDING_MAGIC or version > RECORDING_VERSION:
+            raise ValueError("not a TronView recording: "+filename)
+        self.inputNum = inputNum
+        self.wall0 = wall0
+        self.inputName = name.rstrip(b"\0").decode(errors="ignore")
+
+        if offsets is None:
+            self.f.seek(0)
+            offsets = array('Q', (offset for offset, t in scanRecords(self.f.read())))
+        self.rec_stream = offsets # stream offset of the message bytes of each record.
+        self.time0 = 0 # record time of the first message.
+        self.size = 0
+        count = len(offsets)
+        if count:
+            self.f.seek(RECORDING_HEADER.size)
+            self.time0 = RECORD_HEADER.unpack(self.f.read(RECORD_HEADER.size))[0]
+            self.f.seek(self.recordFilePos(count - 1) - RECORD_HEADER.size)
+            t, inputId, length = RECORD_HEADER.unpack(self.f.read(RECORD_HEADER.size))
+            self.size = offsets[count-1] + length
+        self.pos = 0
+
+    # file position of the message bytes of record i. (every record before it has a header)
+    def recordFilePos(self, i):
+        return RECORDING_HEADER.size + (i + 1) * RECORD_HEADER.size + self.rec_stream[i]
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset = self.pos + offset
+        elif whence == io.SEEK_END:
+            offset = self.size + offset
+        self.pos = min(max(offset, 0), self.size)
+        return self.pos
+
+    def readinto(self, b):
+        wanted = len(b)
+        done = 0
+        offsets = self.rec_stream
+        count = len(offsets)
+        i = bisect_right(offsets, self.pos) - 1
+        while done < wanted and self.pos < self.size and i < count:
+            end = offsets[i+1] if i + 1 < count else self.size
+            inRecord = self.pos - offsets[i]
+            n = min(end - offsets[i] - inRecord, wanted - done)
+            if n > 0:
+                self.f.seek(self.recordFilePos(i) + inRecord)
+                b[done:done+n] = self.f.read(n)
+                done += n
+                self.pos += n
+            i += 1
+        return done
+
+    def close(self):
+        self.f.close()
+        io.RawIOBase.close(self)
+
+
+#############################################
+## Function: openRecording
+## open a recording for playback. returns a file like object in binary or text mode (from attribs "rb" or "r"),
+## the size of the message stream and the wall clock time of the first message. (log time 0 in the log index)
+## offsets (from the playback log index) saves scanning the file again.
+def openRecording(filename, attribs, offsets=None):
+    raw = RecordingReader(filename, offsets)
+    stream = io.BufferedReader(raw)
+    if "b" not in attribs:
+        stream = io.TextIOWrapper(stream, encoding="utf-8", errors="ignore")
+    return stream, raw.size, raw.wall0 + raw.time0
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
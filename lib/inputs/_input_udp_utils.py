@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+# UDP receive helper for network inputs (stratux, levil, etc)
+# Drains every pending datagram on each wakeup into a preallocated buffer
+# so the kernel queue never backs up during traffic bursts.
+
+import socket
+import select
+import time
+import os
+
+
+#############################################
+## Class: UdpReceiver
+class UdpReceiver(object):
+    def __init__(self, port, rcvbuf=0, bufsize=65535, max_per_wake=500):
+        self.port = int(port)
+        self.buffer = bytearray(bufsize) # preallocated receive buffer. reused for every datagram.
+        self.view = memoryview(self.buffer)
+        self.max_per_wake = max_per_wake # max datagrams to drain per wakeup. (so we don't starve other inputs)
+
+        # stats
+        self.datagrams = 0      # total datagrams received
+        self.bytes = 0          # total bytes received
+        self.last_drain = 0     # datagrams drained on the last wakeup
+        self.max_drain = 0      # most datagrams drained in a single wakeup
+        self.drops = 0          # datagrams dropped by the kernel (linux only)
+        self.queue_depth = 0    # bytes waiting in the kernel receive queue (linux only)
+        self.rcvbuf = 0         # actual SO_RCVBUF size given by the kernel.
+        self.stats_time = 0
+
+        # open udp connection.
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if rcvbuf > 0:
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, int(rcvbuf))
+            except OSError as e:
+                print("UDP port %d: unable to set SO_RCVBUF to %d: %s"%(self.port, rcvbuf, e))
+        self.rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+        #Bind to any available address on port *portNum*
+        print("using UDP port:"+str(self.port)+" rcvbuf:"+str(self.rcvbuf))
+        self.sock.bind(("", self.port))
+        # never block on recv. we use select to wait for data.
+        self.sock.setblocking(0)
+
+        self._sock_inode = None
+        try:
+            self._sock_inode = str(os.fstat(self.sock.fileno()).st_ino)
+        except OSError:
+            pass
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.sock.close()
+
+    #############################################
+    ## Function: wait
+    ## wait for data to be ready on the socket. returns True if there is data.
+    def wait(self, timeout=0.1):
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        return len(readable) > 0
+
+    #############################################
+    ## Function: drain
+    ## read every datagram waiting on the socket without blocking.
+    ## callback(view, length) is called for each datagram. view is a memoryview of the shared
+    ## receive buffer so it is only valid until the callback returns.
+    def drain(self, callback):
+        count = 0
+        view = self.view
+        recv_into = self.sock.recv_into
+        while count < self.max_per_wake:
+            try:
+                n = recv_into(self.buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except socket.error as e:
+                print("UDP port %d: recv error: %s"%(self.port, e))
+                break
+            count += 1
+            self.bytes += n
+            callback(view[:n], n)
+
+        self.datagrams += count
+        self.last_drain = count
+        if count > self.max_drain:
+            self.max_drain = count
+        return count
+
+    #############################################
+    ## Function: updateStats
+    ## read the kernel drop count and queue depth for this socket. (linux only, at most once a second)
+    def updateStats(self):
+        current_time = time.time()
+        if current_time - self.stats_time < 1 or self._sock_inode is None:
+            return
+        self.stats_time = current_time
+        try:
+            with open("/proc/net/udp", "r") as f:
+                next(f) # skip header
+                for line in f:
+                    fields = line.split()
+                    # sl local_address rem_address st tx_queue:rx_queue tr tm->when retrnsmt uid timeout inode ref pointer drops
+                    if len(fields) > 12 and fields[9] == self._sock_inode:
+                        self.queue_depth = int(fields[4].split(":")[1], 16)
+                        self.drops = int(fields[12])
+                        return
+        except (OSError, ValueError, StopIteration):
+            self._sock_inode = None # not available on this platform. stop trying.
+
+
+#############################################
+## Function: splitFrames
+## split a datagram into flag delimited frames (GDL90 uses 0x7E). each frame is
+## returned as a memoryview that includes the start and end flag bytes. no copies are made.
+def splitFrames(buf, view, length, flag=0x7E):
+    frames = []
+    start = buf.find(flag, 0, length)
+    while start != -1 and start < length - 1:
+        end = buf.find(flag, start + 1, length)
+        if end == -1:
+            break
+        if end - start > 1:
+            frames.append(view[start:end + 1])
+            start = buf.find(flag, end + 1, length)
+        else:
+            start = end # back to back flags (~~). the 2nd one starts the next frame.
+    return frames
+
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
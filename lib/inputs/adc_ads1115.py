@@ -101,6 +101,8 @@ class adc_ads1115(Input):
             # format value to +/- 4095 for needle left/right up/down.
             self.navData.GSDev = round (16380 * (max(min(self.analogData.Data[0], 0.25), -0.25)))
             self.navData.ILSDev = round (16380 * (max(min(self.analogData.Data[1], 0.25), -0.25)))
+            self.analogData.bump()
+            self.navData.bump()
 
         except Exception as e:
             dataship.errorFoundNeedToExit = True
@@ -152,8 +152,8 @@ class gyro_i2c_bno055(Input):
                         self.imuData.home_pitch = home_pitch
                         self.imuData.home_roll = home_roll
                         self.imuData.home_yaw = home_yaw
-                                        
-                time.sleep(0.02)  # Add delay for playback mode
+                        self.imuData.bump()
+
             else:
                 # Existing live sensor reading code
                 if aircraft.debug_mode > 0:
@@ -174,6 +174,7 @@ class gyro_i2c_bno055(Input):
 
                 # Update positions and aircraft
                 self.imuData.updatePos(pitch_offset, roll_offset, yaw_offset)
+                self.imuData.bump()
                 #aircraft.imus[self.num_imus] = self.imuData
 
                 # Write to log file if enabled
@@ -92,6 +92,18 @@ class gyro_i2c_bno085(Input):
         self.bno.enable_feature(adafruit_bno08x.BNO_REPORT_ROTATION_VECTOR)
         #self.bno.enable_feature(adafruit_bno08x.BNO_REPORT_GAME_ROTATION_VECTOR)
 
+    #############################################
+    ## Function: logLineTimestamp
+    ## used by the playback log index. log lines are 085,unixtime,pitch,roll,yaw,...
+    def logLineTimestamp(self, data, start, end):
+        parts = data[start:end].split(b",")
+        if len(parts) < 2 or parts[0] != b"085":
+            return None
+        try:
+            return float(parts[1]) % 86400
+        except ValueError:
+            return None
+
     def closeInput(self,aircraft):
         print("bno085 close")
 
@@ -150,8 +162,8 @@ class gyro_i2c_bno085(Input):
                         self.imuData.home_pitch = home_pitch
                         self.imuData.home_roll = home_roll
                         self.imuData.home_yaw = home_yaw
-                                        
-                time.sleep(0.02)  # Add delay for playback mode
+                        self.imuData.bump()
+
             else:
                 # Live sensor reading code
                 if dataship.debug_mode > 0:
@@ -166,6 +178,7 @@ class gyro_i2c_bno085(Input):
 
                 # update aircraft object
                 self.imuData.updatePos(pitch_offset, roll_offset, yaw_offset)
+                self.imuData.bump()
                 #aircraft.imus[self.num_imus] = self.imuData
 
                 # Write to log file if enabled
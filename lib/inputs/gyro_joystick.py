@@ -98,6 +98,7 @@ class gyro_joystick(Input):
 
                         # Update IMU data
                         self.imuData.updatePos(pitch, roll, yaw)
+                        self.imuData.bump()
                                             
                     # Write to log file if enabled
                     if self.output_logFile is not None:
@@ -143,5 +144,6 @@ class gyro_joystick(Input):
     def setPostion(self, pitch, roll, yaw):
         """Manual position setting (mainly for testing)"""
         self.imuData.updatePos(pitch, roll, yaw)
+        self.imuData.bump()
 
 # vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
@@ -72,6 +72,18 @@ class gyro_virtual(Input):
         self.auto_rotate_roll = 0
         self.auto_rotate_yaw = 0
         
+    #############################################
+    ## Function: logLineTimestamp
+    ## used by the playback log index. log lines are imu,unixtime,pitch,roll,yaw,...
+    def logLineTimestamp(self, data, start, end):
+        parts = data[start:end].split(b",")
+        if len(parts) < 2 or parts[0] != b"imu":
+            return None
+        try:
+            return float(parts[1]) % 86400
+        except ValueError:
+            return None
+
     def closeInput(self,dataship: Dataship):
         print("imu_virtual close")
 
@@ -109,8 +121,8 @@ class gyro_virtual(Input):
                         self.imuData.home_pitch = home_pitch
                         self.imuData.home_roll = home_roll
                         self.imuData.home_yaw = home_yaw
-                                        
-                time.sleep(0.02)  # Add delay for playback mode
+                        self.imuData.bump()
+
             else:
                 # Live sensor reading code
 
@@ -135,6 +147,7 @@ class gyro_virtual(Input):
 
                 # update aircraft object
                 self.imuData.updatePos(self.test_pitch, self.test_roll, self.test_yaw)
+                self.imuData.bump()
 
                 # Write to log file if enabled
                 if self.output_logFile is not None:
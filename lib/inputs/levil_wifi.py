@@ -7,12 +7,13 @@
 
 from ._input import Input
 from lib import hud_utils
-import struct
 from lib import hud_text
 import binascii
 import time
 import socket
 from lib.common.dataship.dataship import IMU
+from ._input_udp_utils import UdpReceiver, splitFrames
+from . import _input_gdl90 as gdl90
 import traceback
 
 class levil_wifi(Input):
@@ -20,6 +21,7 @@ class levil_wifi(Input):
         self.name = "levil"
         self.version = 1.0
         self.inputtype = "network"
+        self.gdl90 = gdl90.GDL90Decoder()
 
     def initInput(self,num,aircraft):
         Input.initInput( self,num, aircraft )  # call parent init Input.
@@ -35,20 +37,11 @@ class levil_wifi(Input):
             self.isPlaybackMode = True
         else:
             self.udpport = hud_utils.readConfigInt("levil", "udpport", "43211")
+            udp_rcvbuf = hud_utils.readConfigInt("levil", "udp_rcvbuf", 0) # kernel receive buffer size in bytes. 0 = os default.
 
-            # open udp connection.
-            self.ser = socket.socket(socket.AF_INET, #Internet
-                                    socket.SOCK_DGRAM) #UDP
-                             
-            #Bind to any available address on port *portNum*
-            print("using UDP port:"+str(self.udpport))
-            self.ser.bind(("",self.udpport))
-            
-            #Prevent the socket from blocking until it receives all the data it wants
-            #Note: Instead of blocking, it will throw a socket.error exception if it
-            #doesn't get any data
-            #self.ser.settimeout(.1)
-            self.ser.setblocking(0)
+            # open udp connection. (non blocking, drains all waiting datagrams each read)
+            self.udp = UdpReceiver(self.udpport, rcvbuf=udp_rcvbuf)
+            self.ser = self.udp.sock
 
         # create a empty imu object.
         self.imuData = IMU()
@@ -62,35 +55,19 @@ class levil_wifi(Input):
         if self.isPlaybackMode:
             self.ser.close()
         else:
-            self.ser.close()
+            self.udp.close()
 
     def getNextChunck(self,aircraft):
-        if self.isPlaybackMode:
-            data = self.ser.read(300)
-            if(len(data)==0): self.ser.seek(0)
-            #TODO: read to the next ~ in the file??
-            # x = 0
-            # while x != 128: #read to 2nd ~
-            #     t = self.ser.read(1)
-            #     if len(t) != 0:
-            #         x = ord(t)
-            #         data.append(x)
-            #     else:
-            #         self.ser.seek(0) #if at end of file reset
-            #         return bytes(0)
-            return data
-        else:
-            try:
-                #Attempt to receive up to 1024 bytes of data
-                data = self.ser.recvfrom(1024)
-                return data[0]
-            except socket.timeout:
-                pass
-            except socket.error:
-                #If no data is received, you get here, but it's not an error
-                #Ignore and continue
-                pass
-        return bytes(0)
+        data = self.ser.read(300)
+        if(len(data)==0): self.ser.seek(0)
+        #TODO: read to the next ~ in the file??
+        return data
+
+    #############################################
+    ## Function: indexLogMessages
+    ## used by the playback log index. one message per ~ frame. (see _input_gdl90.scanLogFrames)
+    def indexLogMessages(self, data):
+        return gdl90.scanLogFrames(data)
 
     #############################################
     ## Function: readMessage
@@ -98,137 +75,93 @@ class levil_wifi(Input):
         if self.shouldExit == True: aircraft.errorFoundNeedToExit = True
         if aircraft.errorFoundNeedToExit: return aircraft
         if self.skipReadInput == True: return aircraft
-        msg = self.getNextChunck(aircraft)
-        #count = msg.count(b'~~')
-        #print("-----------------------------------------------\nNEW Chunk len:"+str(len(msg))+" seperator count:"+str(count))
-        #print("chunk:"+str(msg))
-
-        for line in msg.split(b'~~'):
-            if(len(line)>3):
-                if(line[0]!=126): # if no ~ then add one...
-                    newline = b''.join([b'~',line])
-                else:
-                    newline = line
-                aircraft = self.processSingleMessage(newline,aircraft)
-            #key = wait_key()
-            #if(key=='q'): aircraft.errorFoundNeedToExit = True
-
-        if self.output_logFile != None:
-            #Input.addToLog(self,self.output_logFile,bytearray([5,2]))
-            Input.addToLog(self,self.output_logFile,msg)
+        self.aircraft = aircraft
 
+        if self.isPlaybackMode:
+            msg = self.getNextChunck(aircraft)
+            self.processDatagram(memoryview(msg), len(msg), msg)
+        else:
+            # wait for data on the UDP socket then drain every datagram waiting.
+            if self.udp.wait(0.1):
+                self.udp.drain(self.processDatagram)
+                self.udp.updateStats()
 
         return aircraft
 
     #############################################
+    ## Function: processDatagram
+    ## split a datagram into frames and process each one. frames are passed on as memoryviews (no copies).
+    def processDatagram(self, view, length, buf=None):
+        if buf is None: buf = self.udp.buffer
+        for frame in splitFrames(buf, view, length):
+            if(len(frame)>4):
+                self.aircraft = self.processSingleMessage(frame,self.aircraft)
+
+        if self.output_logFile != None:
+            Input.addToLog(self,self.output_logFile,view)
+
+    #############################################
+    ## Function: processSingleMessage
+    ## decode one ~ framed message. (see _input_gdl90 for the message layouts)
     def processSingleMessage(self, msg, aircraft):
         try:
-            
-            if(len(msg)<1):
-                pass
-            elif(msg[0]==126 and msg[1]==ord('L') and msg[2]==ord('E')):  # Check for Levil specific messages ~LE
-                #print(msg)
-                #print("Len:"+str(len(msg)))
-                #print("Message ID "+format(msg[3]));
-                if(msg[3]==0): # status message
-                    #print(msg)
-                    #print("status message len:"+str(len(msg)))
-                    # B          B     H     B    B   
-                    FirmwareVer, Batt, Error,WAAS,Aux = struct.unpack(">BBHBB",msg[5:11])
-                    self.FirmwareVer = FirmwareVer
-                    self.Battery = Batt
-                    if(msg[4]==2):
-                        if(WAAS==1):
-                            aircraft.gps.GPSWAAS = 1
-                        else:
-                            aircraft.gps.GPSWAAS = 0
-
-
-                elif(msg[3]==1): # ahrs and air data.
-                    #print("len:"+str(len(msg))+" "+str(msg[len(msg)-1]))
-                    if(len(msg)==27):
-                        # h   h     h   h      h         h,    h   H        h     B   B
-                        Roll,Pitch,Yaw,Inclin,TurnCoord,GLoad,ias,pressAlt,vSpeed,AOA,OAT = struct.unpack(">hhhhhhhHhBB",msg[5:25]) 
-                        aircraft.roll = Roll * 0.1
-                        aircraft.pitch = Pitch * 0.1
-                        aircraft.mag_head = Yaw * 0.1
-                        aircraft.slip_skid = TurnCoord * 0.01
-                        aircraft.vert_G = GLoad * 0.1
-                        aircraft.ias = ias * 0.115078 # convert to MPH
-                        aircraft.PALT = pressAlt
-                        aircraft.vsi = vSpeed
-                        if(msg[4]==2): # if version is 2 then read AOA and OAT
-                            aircraft.aoa = AOA
-                            aircraft.oat = OAT
-                        aircraft.msg_last = msg
-                        aircraft.msg_count += 1
-
-                        # Update IMU data
-                        self.imuData.roll = aircraft.roll
-                        self.imuData.pitch = aircraft.pitch
-                        self.imuData.yaw = aircraft.mag_head
-                        if aircraft.debug_mode > 0:
-                            current_time = time.time() # calculate hz.
-                            self.imuData.hz = round(1 / (current_time - self.last_read_time), 1)
-                            self.last_read_time = current_time
-                        # Update the IMU in the aircraft's imu list
-                        aircraft.imus[self.imu_index] = self.imuData
-
+            msgId, rec = self.gdl90.decode(msg)
+            if msgId is None:
+                aircraft.msg_bad += 1 # bad FCS or too short.
+
+            elif msgId == gdl90.MSG_LEVIL_AHRS: # ahrs and air data.
+                aircraft.roll = rec.roll * 0.1
+                aircraft.pitch = rec.pitch * 0.1
+                aircraft.mag_head = rec.yaw * 0.1
+                aircraft.slip_skid = rec.turnCoord * 0.01
+                aircraft.vert_G = rec.gLoad * 0.1
+                aircraft.ias = rec.ias * 0.115078 # convert to MPH
+                aircraft.PALT = rec.pressAlt
+                aircraft.vsi = rec.vSpeed
+                if(rec.version==2): # if version is 2 then read AOA and OAT
+                    aircraft.aoa = rec.AOA
+                    aircraft.oat = rec.OAT
+                aircraft.msg_last = bytes(msg)
+                aircraft.msg_count += 1
+
+                # Update IMU data
+                self.imuData.roll = aircraft.roll
+                self.imuData.pitch = aircraft.pitch
+                self.imuData.yaw = aircraft.mag_head
+                if aircraft.debug_mode > 0:
+                    current_time = time.time() # calculate hz.
+                    self.imuData.hz = round(1 / (current_time - self.last_read_time), 1)
+                    self.last_read_time = current_time
+                self.imuData.bump()
+                # Update the IMU in the aircraft's imu list
+                aircraft.imus[self.imu_index] = self.imuData
+
+            elif msgId == gdl90.MSG_LEVIL_STATUS: # status message
+                self.FirmwareVer = rec.firmware
+                self.Battery = rec.battery
+                if(rec.version==2):
+                    if(rec.WAAS==1):
+                        aircraft.gps.GPSWAAS = 1
                     else:
-                        aircraft.msg_bad +=1
-
-                elif(msg[3]==2): # more metrics.. like AOA for BOM.
-                    #print("additonal metrics message len:"+str(len(msg)))
-                    AOA,OAT = struct.unpack(">BB",msg[5:7]) 
-                    aircraft.aoa = AOA
-                    aircraft.oat = OAT
-
-                elif(msg[3]==7):
-                    #print("additonal metrics message len:"+str(len(msg)))
-                    WAASstatus, Sats, Power, OutRate = struct.unpack(">BBHB",msg[5:10]) 
-                    aircraft.gps.SatsTracked = Sats
-                    aircraft.gps.msg_count += 1
-
-                else:
-                    #print("unkown message id:"+str(msg[3])+" len:"+str(len(msg)))
-                    #print(msg)
-                    aircraft.msg_unknown += 1 #else unknown message.
-                    
-                if self.isPlaybackMode:  #if play back mode then add a delay.  Else reading a file is way to fast.
-                    time.sleep(.02)
-                    pass
-                else:
-                    #else reading realtime data via udp connection
-                    pass
-
-                return aircraft
-
-            else:
-                #print("GDL 90 message id:"+str(msg[1])+" "+str(msg[2])+" "+str(msg[3])+" len:"+str(len(msg)))
-                #print(msg.hex())
-                #aircraft.msg_bad += 1 #bad message found.
-                if(msg[1]==0): # GDL heart beat. 
-                    #print("GDL 90 HeartBeat message id:"+str(msg[1])+" len:"+str(len(msg)))
-                    #print(msg.hex())
-                    Status1,Status2 = struct.unpack(">BB",msg[2:4]) 
-                    Time = struct.unpack(">H",msg[4:6]) 
-                    #print("Time "+str(Time))
-                elif(msg[1]==10): # GDL ownership
-                    #print("GDL 90 HeartBeat message id:"+str(msg[1])+" len:"+str(len(msg)))
-                    #print(msg.hex())
-                    pass
-                elif(msg[1]==101): # Foreflight id?
-                    pass
+                        aircraft.gps.GPSWAAS = 0
+
+            elif msgId == gdl90.MSG_LEVIL_METRICS: # more metrics.. like AOA for BOM.
+                aircraft.aoa = rec.AOA
+                aircraft.oat = rec.OAT
+
+            elif msgId == gdl90.MSG_LEVIL_GPS_STATUS:
+                aircraft.gps.SatsTracked = rec.sats
+                aircraft.gps.msg_count += 1
+
+            elif msgId >= gdl90.MSG_LEVIL_BASE:
+                aircraft.msg_unknown += 1 #else unknown message.
 
+            # GDL90 heartbeat, ownship and foreflight id messages are not used.
 
             return aircraft
         except ValueError:
             print("levil value error exception")
             aircraft.errorFoundNeedToExit = True
-        except struct.error:
-            #error with read in length.. ignore for now?
-            #print("Error with read in length")
-            pass
         except Exception as e:
             aircraft.errorFoundNeedToExit = True
             print(e)
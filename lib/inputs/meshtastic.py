@@ -120,11 +120,13 @@ class meshtastic(Input):
                     if my_node_info['position']['latitude'] is not None and my_node_info['position']['longitude'] is not None and my_node_info['position']['altitude'] is not None:
                         self.print_debug(f"meshtastic gps! lat: {my_node_info['position']['latitude']} lon: {my_node_info['position']['longitude']} alt: {my_node_info['position']['altitude']}")
                         self.gpsData.set_gps_location(my_node_info['position']['latitude'], my_node_info['position']['longitude'], my_node_info['position']['altitude'])
+                        self.gpsData.bump()
 
             self.print_debug(f"packet: {packet}")
             if self.ignore_self and packet["from"] == self.targetData.meshtastic_node_num:
                 # get nodeId from packet
                 self.targetData.meshtastic_node_id = packet["fromId"]
+                self.targetData.bump()
                 self.print_debug(f"Ignoring self packet from {self.targetData.meshtastic_node_id} {self.targetData.meshtastic_node_num}")
                 return
             if packet.get("decoded"):
@@ -182,7 +184,7 @@ class meshtastic(Input):
                     target.alt = int(pos.get("altitude", 0) * 3.28084) # Convert meters to feet and round to the nearest integer
                     
                     if "groundSpeed" in pos:
-                        target.speed = int(pos["groundSpeed"] * 2.23694) # Convert m/s to mph and round to the nearest integer
+                        target.speed = int(pos["groundSpeed"] * 1.943844) # Convert m/s to knots and round to the nearest integer
                     if "groundTrack" in pos:
                         target.track = int(pos["groundTrack"]) # round to the nearest integer
                     self.print_debug(f"Target Position: {target.lat}, {target.lon}, {target.alt}, {target.speed}, {target.track}")
@@ -191,6 +193,7 @@ class meshtastic(Input):
                 self.targetData.addTarget(target)
                 self.targetData.msg_count += 1
                 self.targetData.msg_last = time.time()
+                self.targetData.bump()
 
 
 
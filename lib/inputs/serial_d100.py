@@ -131,10 +131,11 @@ class serial_d100(Input):
                     self.last_read_time = current_time
 
                 self.imuData.msg_count += 1
+                self.imuData.bump()
+                self.airData.msg_count += 1
+                self.airData.bump()
 
-                if self.isPlaybackMode:  #if playback mode then add a delay.  Else reading a file is way to fast.
-                    time.sleep(.05)
-                #else:
+                #if not self.isPlaybackMode:
                 #    self.ser.flushInput()  # flush the serial after every message else we see delays
 
                 # add to log file
@@ -144,9 +145,7 @@ class serial_d100(Input):
 
             else:
                 self.msg_bad += 1 # count this as a bad message
-                if self.isPlaybackMode:  #if playback mode then add a delay.  Else reading a file is way to fast.
-                    time.sleep(.01)
-                #else:
+                #if not self.isPlaybackMode:
                 #   self.ser.flushInput()  # flush the serial after every message else we see delays
                 return dataship
         except ValueError as ex:
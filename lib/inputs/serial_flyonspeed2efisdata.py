@@ -86,9 +86,7 @@ class serial_flyonspeed2efisdata(Input):
                     aircraft.vsi = int(msgArray[20]) 
                     aircraft.msg_count += 1
 
-                    if self.isPlaybackMode:  #if playback mode then add a delay.  Else reading a file is way to fast.
-                        time.sleep(.05)
-                    else:
+                    if not self.isPlaybackMode:
                         self.ser.flushInput()  # flush the serial after every message else we see delays
                     return aircraft
                 else:
@@ -96,9 +94,7 @@ class serial_flyonspeed2efisdata(Input):
 
             else:
                 aircraft.msg_bad += 1 # count this as a bad message
-                if self.isPlaybackMode:  #if playback mode then add a delay.  Else reading a file is way to fast.
-                    time.sleep(.01)
-                else:
+                if not self.isPlaybackMode:
                     self.ser.flushInput()  # flush the serial after every message else we see delays
                 return aircraft
         except ValueError as ex:
@@ -26,6 +26,7 @@ from lib.common.dataship.dataship_imu import IMUData
 from lib.common.dataship.dataship_engine_fuel import EngineData, FuelData
 from lib.common.dataship.dataship_nav import NavData
 from lib.common.dataship.dataship_gps import GPSData
+from lib.common.dataship.dataship_history import History
 import traceback
 
 def checkInputVal(value):
@@ -49,10 +50,8 @@ class serial_g3x(Input):
         self.inputtype = "serial"
 
         # Setup moving averages to smooth a bit
-        self.readings = []
-        self.max_samples = 10
-        self.readings1 = []
-        self.max_samples1 = 20
+        self.readings = History(10) # slip skid
+        self.readings1 = History(20) # AOA
         self.EOL = 10
         self.imuData = IMUData()
         self.airData = AirData()
@@ -131,6 +130,17 @@ class serial_g3x(Input):
         print("G3X: Engine Data Init")
 
 
+    #############################################
+    ## Function: logLineTimestamp
+    ## used by the playback log index. get seconds of the day from a attitude (id:1) sentence. =11hhmmss...
+    def logLineTimestamp(self, data, start, end):
+        if end - start < 9 or not data.startswith(b"=1", start):
+            return None
+        t = data[start+3:start+9]
+        if not t.isdigit():
+            return None
+        return int(t[0:2]) * 3600 + int(t[2:4]) * 60 + int(t[4:6])
+
     # close this input source
     def closeInput(self, dataship:Dataship):
         if self.isPlaybackMode:
@@ -142,8 +152,6 @@ class serial_g3x(Input):
     #############################################
     ## Function: readMessage
     def readMessage(self, dataship:Dataship):
-        def mean(nums):
-            return float(sum(nums)) / max(len(nums), 1)
         if dataship.errorFoundNeedToExit:
             return dataship
         try:
@@ -198,6 +206,7 @@ class serial_g3x(Input):
                                 self.gpsData.GndTrack = _utils.gndtrack(
                                     EWVelDir, EWVelmag, NSVelDir, NSVelmag
                                 )
+                                self.gpsData.bump()
                                 # dataship.wind_speed, dataship.wind_dir, dataship.norm_wind_dir = _utils.windSpdDir(
                                 #     dataship.tas * 0.8689758, # back to knots.
                                 #     dataship.gndspeed * 0.8689758, # convert back to knots
@@ -239,15 +248,10 @@ class serial_g3x(Input):
                         if checkInputVal(OAT):
                             self.airData.OAT = (int(OAT) * 1.8) + 32 # c to f
                         if _utils.is_number(AOA) == True:
-                            self.airData.AOA = int(AOA)
-                            self.readings1.append(self.airData.AOA)
-                            self.airData.AOA = mean(
-                                self.readings1
-                            )  # Moving average to smooth a bit
+                            self.readings1.add(int(AOA), time.monotonic())
+                            self.airData.AOA = self.readings1.mean()  # Moving average to smooth a bit
                         else:
                             self.airData.AOA = 0
-                        if len(self.readings1) == self.max_samples1:
-                            self.readings1.pop(0)
                         self.imuData.mag_head = safeInt(Heading)
                         self.imuData.yaw = safeInt(Heading)
                         if checkInputVal(AltSet):
@@ -257,7 +261,7 @@ class serial_g3x(Input):
                             self.airData.Alt = int(
                                 int(PressAlt) + (self.airData.Baro_diff / 0.00108)
                             )  # 0.00108 of inches of mercury change per foot.
-                        self.airData.BALT = self.airData.Alt
+                        self.airData.Alt_baro = self.airData.Alt
                         if checkInputVal(VertSpeed):
                             self.airData.VSI = int(VertSpeed) * 10 # vertical speed in fpm
                         if checkInputVal(RateofTurn):
@@ -265,16 +269,11 @@ class serial_g3x(Input):
                         if checkInputVal(VertAcc):
                             self.imuData.vert_G = int(VertAcc) * 0.1
                         if checkInputVal(LatAcc):
-                            self.imuData.slip_skid = int(LatAcc) * 0.01
-                            self.readings.append(self.imuData.slip_skid)
-                            self.imuData.slip_skid = mean(
-                                self.readings
-                            )  # Moving average to smooth a bit
-                            if len(self.readings) == self.max_samples:
-                                self.readings.pop(0)
+                            self.readings.add(int(LatAcc) * 0.01, time.monotonic())
+                            self.imuData.slip_skid = self.readings.mean()  # Moving average to smooth a bit
                         self.imuData.msg_count += 1
-                        if (self.isPlaybackMode):  # if playback mode then add a delay.  Else reading a file is way to fast.
-                            time.sleep(0.08)
+                        self.imuData.bump()
+                        self.airData.bump()
                         if self.output_logFile != None:
                             Input.addToLog(self,self.output_logFile,bytes([61,ord(SentID)]))
                             Input.addToLog(self,self.output_logFile,msg)
@@ -308,8 +307,6 @@ class serial_g3x(Input):
                         self.airData.Alt_pres = safeInt(PressAlt)
                         if checkInputVal(OAT):
                             self.airData.OAT = (int(OAT) * 1.8) + 32 # c to f
-                        if len(self.readings1) == self.max_samples1:
-                            self.readings1.pop(0)
                         self.imuData.mag_head = safeInt(Heading)
                         self.imuData.yaw = safeInt(Heading)
                         if checkInputVal(AltSet):
@@ -319,12 +316,12 @@ class serial_g3x(Input):
                             self.airData.Alt = int(
                                 int(PressAlt) + (self.airData.Baro_diff / 0.00108)
                             )  # 0.00108 of inches of mercury change per foot.
-                        self.airData.BALT = self.airData.Alt
+                        self.airData.Alt_baro = self.airData.Alt
                         if checkInputVal(VertSpeed):
                             self.airData.VSI = int(VertSpeed) * 10 # vertical speed in fpm
                         self.imuData.msg_count += 1
-                        if (self.isPlaybackMode):  # if playback mode then add a delay.  Else reading a file is way to fast.
-                            time.sleep(0.08)
+                        self.imuData.bump()
+                        self.airData.bump()
                         if self.output_logFile != None:
                             Input.addToLog(self,self.output_logFile,bytes([61,ord(SentID)]))
                             Input.addToLog(self,self.output_logFile,msg)
@@ -361,8 +358,8 @@ class serial_g3x(Input):
                         if checkInputVal(VSSel):
                             self.navData.VSBug = int(VSSel) * 10 # multiply up to hundreds of feet
                         self.navData.msg_count += 1
-                        if (self.isPlaybackMode):  # if playback mode then add a delay.  Else reading a file is way to fast.
-                            time.sleep(0.08)
+                        self.navData.bump()
+                        self.airData.bump() # (Alt_da, TAS)
 
                         if self.output_logFile != None:
                             Input.addToLog(self,self.output_logFile,bytes([61,ord(SentID)]))
@@ -381,8 +378,7 @@ class serial_g3x(Input):
                         if checkInputVal(TAS):
                             self.airData.TAS = int(TAS) * 0.115078 # convert knots to mph * 0.1
                         self.airData.msg_count += 1
-                        if (self.isPlaybackMode):  # if playback mode then add a delay.  Else reading a file is way to fast.
-                            time.sleep(0.08)
+                        self.airData.bump()
                         if self.output_logFile != None:
                             Input.addToLog(self,self.output_logFile,bytes([61,ord(SentID)]))
                             Input.addToLog(self,self.output_logFile,msg)
@@ -406,6 +402,8 @@ class serial_g3x(Input):
                         if checkInputVal(GroundSpeed):
                             self.gpsData.GndSpeed = int(GroundSpeed) * 0.115078 # convert knots to mph * 0.1
                         self.gpsData.msg_count += 1
+                        self.gpsData.bump()
+                        self.airData.bump()
                         if self.output_logFile != None:
                             Input.addToLog(self,self.output_logFile,bytes([61,ord(SentID)]))
                             Input.addToLog(self,self.output_logFile,msg)
@@ -419,9 +417,7 @@ class serial_g3x(Input):
                         print("g3x: unknown message")
             else:
                 self.msg_unknown += 1  # else unknown message.
-                if self.isPlaybackMode:
-                    time.sleep(0.01)
-                else:
+                if not self.isPlaybackMode:
                     self.ser.flushInput()  # flush the serial after every message else we see delays
                 return dataship
 
@@ -465,7 +461,9 @@ class serial_g3x(Input):
                         if checkInputVal(FuelQtyRAux):
                             fuelqty4 = int(FuelQtyRAux) * .1
                         self.fuelData.FuelLevels = [fuelqty1,fuelqty2,fuelqty3,fuelqty4]
-                        self.engineData.msg_count = +1
+                        self.engineData.msg_count += 1
+                        self.engineData.bump()
+                        self.fuelData.bump()
                         return dataship
                     else:
                         self.airData.msg_bad += 1
@@ -22,6 +22,9 @@ from lib.common.dataship.dataship_gps import GPSData
 from lib.common.dataship.dataship_air import AirData
 import struct  # Add this import at the top with other imports
 
+GRT_EIS_SYNC = b"\xfe\xff\xfe"
+GRT_EIS_FRAME_SIZE = 3 + 63 # header + frame (last byte is the checksum)
+
 
 class serial_grt_eis(Input):
     def __init__(self):
@@ -69,6 +72,21 @@ class serial_grt_eis(Input):
         else:
             self.ser.close()
 
+    #############################################
+    ## Function: indexLogMessages
+    ## used by the playback log index. yield (offset, None) for every FE FF FE framed message in the log.
+    ## (frames have no time of day, so playback is paced by playback_rate)
+    def indexLogMessages(self, data):
+        dataLen = len(data)
+        pos = data.find(GRT_EIS_SYNC)
+        while pos != -1 and pos + GRT_EIS_FRAME_SIZE <= dataLen:
+            frame = data[pos+3:pos+GRT_EIS_FRAME_SIZE]
+            if (~sum(frame[:-1])) & 0xFF != frame[-1]:
+                pos = data.find(GRT_EIS_SYNC, pos + 1) # not a real header. (or bad frame)
+                continue
+            yield pos, None
+            pos = data.find(GRT_EIS_SYNC, pos + GRT_EIS_FRAME_SIZE)
+
     def readMessage(self, dataship: Dataship):
         if self.shouldExit == True: dataship.errorFoundNeedToExit = True
         if dataship.errorFoundNeedToExit: return dataship
@@ -144,9 +162,7 @@ class serial_grt_eis(Input):
             
             # Update message counts
             self.engineData.msg_count += 1
-
-            if self.isPlaybackMode:
-                time.sleep(0.01)  # Add delay in playback mode
+            self.engineData.bump()
 
             if self.output_logFile is not None:
                 header = bytearray([0xFE, 0xFF, 0xFE])
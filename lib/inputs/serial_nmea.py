@@ -58,11 +58,6 @@ class serial_nmea(Input):
         self.version = 3.01
         self.inputtype = "serial"
 
-        # Setup moving averages to smooth a bit
-        self.readings = []
-        self.max_samples = 10
-        self.readings1 = []
-        self.max_samples1 = 20
         self.EOL = 10
         self.gpsData = GPSData()
         self.navData = NavData()
@@ -159,9 +154,6 @@ class serial_nmea(Input):
     ## Function: readMessage
     def readMessage(self, dataship: Dataship):
         #airports = airportsdata.load()
-        def mean(nums):
-            return float(sum(nums)) / max(len(nums), 1)
-
         if dataship.errorFoundNeedToExit:
             return dataship
         try:
@@ -234,7 +226,7 @@ class serial_nmea(Input):
                         #self.gpsData.Mag_Decl = float(magvar)
 
                         # Handle empty ground speed and true track values
-                        self.gpsData.GndSpeed = self.safe_float(gs)
+                        self.gpsData.GndSpeed = self.safe_float(gs) * 1.15078 # convert knots to mph
                         self.gpsData.GndTrack = self.safe_float(truetrack)
                         # if magvardir is E, then we need to subtract the magvar from the true track?? need to verify this
                         if(magvardir == "E"):
@@ -261,6 +253,7 @@ class serial_nmea(Input):
                         self.navData.WPTrack = self.safe_float(destbrg)
                         self.navData.WPLat = destlat
                         self.navData.WPLon = destlon
+                        self.navData.bump()
                     case "GPGGA": # GPS Pos and Altitude
                         utctime = msg[1] # hhmmss
                         lat = self.convert_nmea_to_decimal_degrees(msg[2], msg[3])
@@ -347,13 +340,14 @@ class serial_nmea(Input):
                         self.navData.WPTrack = self.safe_float(brgmag)
                         self.navData.WPLat = self.safe_float(lat)
                         self.navData.WPLon = self.safe_float(lon)
+                        self.navData.bump()
 
                     case "GPVTG": # GPS Track made good and ground speed, Intentionally omitted KM/H Ground speed
                         coursetrue = msg[1] # GPS Course over ground degrees true xxx.x
                         coursemag = msg[3] # GPS Course over ground degrees magnetic xxx.x
                         gs = msg[5] # GPS Groundspeed, knots xxx.x
                         mode = msg[9] # FAA Mode, explained at top of file
-                        self.gpsData.GndSpeed = self.safe_float(gs)
+                        self.gpsData.GndSpeed = self.safe_float(gs) * 1.15078 # convert knots to mph
                         self.gpsData.GndTrack = self.safe_float(coursemag)
                     case "GPXTE": # GPS Cross-track error, measured
                         status1 = msg[1] # GPS Status, A = Valid, V = Invalid
@@ -363,6 +357,7 @@ class serial_nmea(Input):
                     case "PGRMZ": # Garmin-proprietary altitude in feet. Pressure altitude, or GPS if unavailable
                         alt = msg[1] # Altitude in feet
                         alttype = msg[3] # 2 if Pressure altitude, 3 if GPS altitude
+                self.gpsData.bump()
             return dataship
 
         except:
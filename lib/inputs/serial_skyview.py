@@ -178,6 +178,7 @@ class serial_skyview(Input):
                         self.gpsData.SatsVisible = int(fields[3]) if fields[3] else 0
 
                     self.gpsData.msg_count += 1
+                    self.gpsData.bump()
                 except:
                     self.gpsData.msg_bad += 1
 
@@ -228,6 +229,7 @@ class serial_skyview(Input):
                     #print(msg)
                     if HH != b'--' and MM != b'--' and SS != b'--':
                         self.gpsData.GPSTime_string = "%d:%d:%d"%(int(HH),int(MM),int(SS))
+                        self.gpsData.bump()
                         self.time_stamp_string = dataship.sys_time_string
                         #print("time: "+aircraft.sys_time_string)
                         
@@ -272,6 +274,8 @@ class serial_skyview(Input):
 
                     self.airData.msg_count += 1
                     self.imuData.msg_count += 1
+                    self.airData.bump()
+                    self.imuData.bump()
 
                     if self.output_logFile != None:
                         Input.addToLog(self,self.output_logFile,bytes([33,int(dataType),int(dataVer)]))
@@ -320,6 +324,7 @@ class serial_skyview(Input):
                     #print("NAV & System Message !2:", msg)
                     if HH != b'--' and MM != b'--' and SS != b'--':
                         self.gpsData.GPSTime_string = "%d:%d:%d"%(int(HH),int(MM),int(SS))
+                        self.gpsData.bump()
                         self.time_stamp_string = self.gpsData.GPSTime_string
 
                     if HBug != b'XXX': self.navData.HeadBug = Input.cleanInt(self, HBug)
@@ -337,8 +342,8 @@ class serial_skyview(Input):
                         navSourceType = 'LOC'
                     self.navData.SourceDesc = navSourceType + str(Input.cleanInt(self,CDISourePort))
                     if CDIScale != b'XX': self.navData.GLSHoriz = Input.cleanInt(self,CDIScale) / 10
-                    if APEng == b'0': self.navData.APeng = 0
-                    if APEng == b'1' or APEng == b'2' or APEng == b'3' or APEng == b'4' or APEng == b'5' or APEng == b'6' or APEng == b'7': self.navData.APeng = 1
+                    if APEng == b'0': self.navData.AP = 0
+                    if APEng == b'1' or APEng == b'2' or APEng == b'3' or APEng == b'4' or APEng == b'5' or APEng == b'6' or APEng == b'7': self.navData.AP = 1
                     self.navData.AP_RollForce = Input.cleanInt(self,APRollF)
                     if APRollP != 'XXXXX': self.navData.AP_RollPos = Input.cleanInt(self,APRollP)
                     self.navData.AP_RollSlip = Input.cleanInt(self,APRollSlip)
@@ -361,7 +366,8 @@ class serial_skyview(Input):
                     if TransponderReply != b'X': self.navData.XPDR_Reply = Input.cleanInt(self,TransponderReply)
                     if TransponderIdent != b'X': self.navData.XPDR_Ident = Input.cleanInt(self,TransponderIdent)
                     if TransponderCode != b'XXXX': self.navData.XPDR_Code = Input.cleanInt(self,TransponderCode)
-                    
+                    self.navData.bump()
+
                     if self.output_logFile != None:
                         Input.addToLog(self,self.output_logFile,bytes([33,int(dataType),int(dataVer)]))
                         Input.addToLog(self,self.output_logFile,msg)
@@ -427,6 +433,7 @@ class serial_skyview(Input):
 
                     if HH != b'--' and MM != b'--' and SS != b'--':
                         self.gpsData.GPSTime_string = "%d:%d:%d"%(int(HH),int(MM),int(SS))
+                        self.gpsData.bump()
                         self.time_stamp_string = self.gpsData.GPSTime_string
 
                     if OilPress != b'XXX': self.engineData.OilPress = Input.cleanInt(self,OilPress)
@@ -459,6 +466,8 @@ class serial_skyview(Input):
                     if TC5 != b'XXXX': self.engineData.CHT[3] = round(((Input.cleanInt(self, TC5)) * 1.8) + 32)  # convert from C to F
                     if TC3 != b'XXXX': self.engineData.EGT[4] = round(((Input.cleanInt(self, TC3)) * 1.8) + 32)  # convert from C to F
                     if TC1 != b'XXXX': self.engineData.EGT[5] = round(((Input.cleanInt(self, TC1)) * 1.8) + 32)  # convert from C to F
+                    self.engineData.bump()
+                    self.fuelData.bump()
 
                     if self.output_logFile != None:
                         Input.addToLog(self,self.output_logFile,bytes([33,int(dataType),int(dataVer)]))
@@ -477,10 +486,7 @@ class serial_skyview(Input):
             traceback.print_exc()
             dataship.errorFoundNeedToExit = True
 
-        if self.isPlaybackMode:  #if play back mode then add a delay.  Else reading a file is way to fast.
-            time.sleep(.05)
-        else:
-            #pass
+        if not self.isPlaybackMode:
             self.ser.flushInput()  # flush the serial after every message else we see delays
 
         return dataship
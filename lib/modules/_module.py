@@ -5,6 +5,8 @@
 
 from .. import hud_graphics
 from ..common.dataship.dataship import Dataship
+from ..common.helpers.field_accessor import compileField, sourcePath
+from ..common.helpers.text_template import compileTemplate, formatObject, formatSpecial
 import pygame
 
 
@@ -19,6 +21,7 @@ class Module:
         self.y = 0
         self.buttons = [] # list of buttons if this module has any
         self.button_font_size = 20
+        self._data_versions = None # versions of the data objects last seen by dataChanged()
 
 
     def initMod(self, pygamescreen, width, height):
@@ -193,85 +196,18 @@ class Module:
                 return
 
     def get_nested_attr(self, obj, attr):
-        parts = attr.split('.')
-        for part in parts:
-            if part.endswith('()'):
-                # It's a function call
-                func_name = part[:-2]
-                obj = getattr(obj, func_name)()
-            elif part.endswith('<obj>'):
-                # It's an object
-                obj = getattr(obj, part[:-5])
-            elif part.endswith(']'):
-                # It's an index. example: "gpsData[0]"
-                # parse the index from the string
-                index = part[1:-1]
-                # remove the beginning of the string until the first [
-                index = index[index.find('[')+1:]
-                # get the name of the object (from part) example: gpsData
-                name = part[:part.find('[')]
-                # get the value
-                obj = getattr(obj, name)[int(index)]
-                #print(f"obj: {obj}")
-            else:
-                obj = getattr(obj, part)
-        return obj
+        # path is compiled once and cached. (see field_accessor.py)
+        return compileField(attr).get(obj)
 
     def format_object(self,obj):
-        # check if None
-        if obj is None:
-            obj = "None"
-        else:
-            sub_vars = obj.__dict__
-            final_value = ""
-            for sub_var in sub_vars:
-                # check if it starts with _ then skip it.
-                if sub_var.startswith('_'):
-                    continue
-                # check if it has a __dict__.. if so skip it cause it's probably a child object. (for now...)
-                if hasattr(sub_vars[sub_var], '__dict__'):
-                    continue
-                final_value += f"{sub_var}: {sub_vars[sub_var]}\n"
-            obj = final_value
-        return obj
+        return formatObject(obj)
 
     def special_format_specifier(self, theVariable: str, format_specifier: str, dataship: Dataship):
         """
-        Handle special format specifiers.
+        Handle special format specifiers. (kts, kph, mph, km, nm, ft, m, c, f, 10th)
+        see SPECIAL_FORMATS in text_template.py
         """
-        if format_specifier == "kts":
-            # convert mph to knots.
-            return f"{theVariable * 0.868976:0.0f}"
-        elif format_specifier == "kph":
-            # convert mph to kph. (kilometers per hour)
-            return f"{theVariable * 1.60934:0.0f}"
-        elif format_specifier == "mph":
-            # convert mph .. it's already in mph.
-            return f"{theVariable:0.0f}"
-        elif format_specifier == "km":
-            # convert miles to kilometers.
-            return f"{theVariable * 1.60934:0.1f}"
-        elif format_specifier == "nm":
-            # convert miles to nautical miles.
-            return f"{theVariable * 1.852:0.1f}"
-        elif format_specifier == "ft":
-            # it's already in feet.
-            return f"{theVariable:0.1f}"
-        elif format_specifier == "m":
-            # convert feet to meters.
-            return f"{theVariable * 0.3048:0.1f}"
-        elif format_specifier == "c":
-            # convert fahrenheit to celsius.
-            return f"{((theVariable - 32) * 5/9):0.1f}"
-        elif format_specifier == "f":
-            # it's already in fahrenheit.
-            return f"{theVariable:0.1f}"
-        elif format_specifier == "10th":
-            # round to the nearest 10.
-            return f"{round(theVariable / 10) * 10:0.0f}"
-        else:
-            # else just use the built in python format specifier.
-            return f"{theVariable:{format_specifier}}"
+        return formatSpecial(theVariable, format_specifier)
 
     def parse_text(self, inputText: str, dataship: Dataship):
         """
@@ -291,87 +227,45 @@ class Module:
         {gpsData.latitude}
         {gpsData.latitude:0.2f} # format to 2 decimal places
         {airData[0].IAS:kts}
+        The template is compiled once and the last text is reused if no values changed. (see text_template.py)
         """
-        result = inputText
-        # Find all variables enclosed in curly braces
-        start = 0
-        while True:
-            open_brace = result.find('{', start)
-            if open_brace == -1:
-                break
-            close_brace = result.find('}', open_brace)
-            if close_brace == -1:
-                break
-                
-            variable_name = result[open_brace + 1:close_brace]
-            if "%" in variable_name:
-                variable_name, format_specifier = variable_name.split("%")
-            elif ":" in variable_name:
-                variable_name, special_format_specifier = variable_name.split(":")
-                format_specifier = None
-            else:
-                format_specifier = None
-                special_format_specifier = None
-
-            try:
-                if variable_name == "self":
-                    variable_value = self.format_object(dataship)
-                else:
-                    variable_value = self.get_nested_attr(dataship, variable_name)
-
-                if format_specifier:
-                    variable_value = f"{variable_value:{format_specifier}}"
-                elif special_format_specifier:
-                    variable_value = self.special_format_specifier(variable_value, special_format_specifier, dataship)
-                elif isinstance(variable_value, (str, int, float, tuple, dict)):
-                    variable_value = f"{variable_value}"
-                elif isinstance(variable_value, list):
-                    final_value = ""
-                    for item in variable_value:
-                        final_value += f"\n{self.format_object(item)}\n======================="
-                    variable_value = final_value
-                elif isinstance(variable_value, object):
-                    variable_value = self.format_object(variable_value)
-                else:
-                    variable_value = str(variable_value)
-            except Exception as e:
-                variable_value = f"Err:{str(e)}"
-
-            result = result[:open_brace] + variable_value + result[close_brace + 1:]
-            start = open_brace + len(variable_value)
-
-        return result
+        return compileTemplate(inputText).render(dataship)
 
     def get_data_field(self, dataship, data_field, default_value=0, default_value_on_error=0):
         """
         Get a data field from the dataship object.
         Useful for passing in object string name and getting back the value.
         """
-        def get_nested_attr(obj, attr):
-            parts = attr.split('.')
-            for part in parts:
-                # check if its a list if it ends with ]. example: listname[1]
-                if part.endswith(']'):
-                    index = part[1:-1]
-                    # remove the beginning of the string until the first [
-                    index = index[index.find('[')+1:]
-                    # get the name of the object (from part) example: gpsData
-                    name = part[:part.find('[')]
-                    # get the value
-                    obj = getattr(obj, name)[int(index)]
-                elif part.endswith('()'):
-                    # It's a function call
-                    func_name = part[:-2]
-                    obj = getattr(obj, func_name)()
-                else:
-                    obj = getattr(obj, part)
-            return obj
         if data_field == "":
             return default_value
         try:
-            return get_nested_attr(dataship, data_field)
+            return compileField(data_field).get(dataship)
         except Exception as e:
             print(f"Error getting data field {data_field}: {e}")
             return default_value_on_error
 
+    def get_data_source(self, dataship, data_field):
+        """
+        Get the dataship data object a data field is read from. ("engineData[0].RPM" -> engineData[0])
+        None if it can't be worked out.
+        """
+        path = sourcePath(data_field)
+        if path is None:
+            return None
+        try:
+            return compileField(path).get(dataship)
+        except Exception:
+            return None
+
+    def dataChanged(self, *objs):
+        """
+        True if any of the data objects got new data since the last call. (see dataship_object.py)
+        Objects that don't have a version (or have never been bumped) always count as changed.
+        """
+        versions = tuple((obj, getattr(obj, 'version', 0)) for obj in objs)
+        if versions == self._data_versions and all(version for obj, version in versions):
+            return False
+        self._data_versions = versions
+        return True
+
 # vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python
@@ -78,6 +78,8 @@ class artificalhorz(Module):
         return gradient
 
     def draw(self, dataship:Dataship, smartdisplay, pos=(None, None)):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
         if pos[0] is None or pos[1] is None:
             x, y = 0, 0
         else:
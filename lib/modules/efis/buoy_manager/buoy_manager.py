@@ -78,6 +78,8 @@ class buoy_manager(Module):
 
     # called every redraw for the module
     def draw(self, dataship: Dataship, smartdisplay, pos=(0, 0)):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.gpsData = self.gpsData.snapshot()
         # Clear the surface with full transparency
         self.surface.fill((0, 0, 0, 0))
         self.buttonsDraw(dataship, smartdisplay, pos)  # draw buttons
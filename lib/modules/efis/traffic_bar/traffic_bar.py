@@ -13,6 +13,7 @@ from lib.common.dataship.dataship import Dataship
 from lib.common.dataship.dataship_targets import TargetData
 from lib.common.dataship.dataship_imu import IMUData
 from lib.common.dataship.dataship_gps import GPSData
+from lib.common.helpers.traffic_cpa import THREAT_ADVISORY, THREAT_ALERT
 from lib.common import shared
 import pygame
 import math
@@ -62,6 +63,9 @@ class traffic_bar(Module):
 
     # called every redraw for the module
     def draw(self, dataship: Dataship, smartdisplay, pos=(0, 0)):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
+        self.gpsData = self.gpsData.snapshot()
         x, y = pos
         
         # Clear the surface with full transparency
@@ -77,22 +81,27 @@ class traffic_bar(Module):
 
         # Traffic rendering (adjust for new position)
         if useHeading is not None and self.showTrafficMiles > 0:
-            for t in self.targetData.targets:
-                if t.dist is not None and t.dist < self.showTrafficMiles:
-                    result = useHeading - t.brng
-                    if -self.fov_x_each_side < result < self.fov_x_each_side:
-                        center_deg = result + self.fov_x_each_side
-                        x_offset = self.width - (center_deg / self.x_degree_per_pixel)
-
-                        # draw distance and altitude
-                        txtTargetDist = self.font_target.render(f"{t.dist:.2f}mi {t.alt}ft", True, (0,0,0), self.colorDetails)
-                        text_widthD, text_heightD = txtTargetDist.get_size()
-                        self.surface.blit(txtTargetDist, (x + x_offset - int(text_widthD/2), self.height - text_heightD))
-
-                        # draw callsign
-                        textTargetCall = self.font_target.render(str(t.callsign), False, (0,0,0),  self.colorTarget )
-                        text_widthC, text_heightC = textTargetCall.get_size()
-                        self.surface.blit(textTargetCall, (x + x_offset - int(text_widthC/2), self.height - text_heightC - text_heightD))
+            for t in self.targetData.targetsInSector(self.showTrafficMiles, useHeading, self.fov_x_each_side):
+                result = (useHeading - t.brng + 180) % 360 - 180 # -180 to 180. (so targets across north line up)
+                if -self.fov_x_each_side < result < self.fov_x_each_side:
+                    center_deg = result + self.fov_x_each_side
+                    x_offset = self.width - (center_deg / self.x_degree_per_pixel)
+
+                    # draw distance and altitude
+                    txtTargetDist = self.font_target.render(f"{t.dist:.2f}mi {t.alt}ft", True, (0,0,0), self.colorDetails)
+                    text_widthD, text_heightD = txtTargetDist.get_size()
+                    self.surface.blit(txtTargetDist, (x + x_offset - int(text_widthD/2), self.height - text_heightD))
+
+                    # draw callsign
+                    if t.threat_level >= THREAT_ALERT:
+                        colorCall = (255,0,0)
+                    elif t.threat_level >= THREAT_ADVISORY:
+                        colorCall = (255,200,0)
+                    else:
+                        colorCall = self.colorTarget
+                    textTargetCall = self.font_target.render(str(t.callsign), False, (0,0,0),  colorCall )
+                    text_widthC, text_heightC = textTargetCall.get_size()
+                    self.surface.blit(textTargetCall, (x + x_offset - int(text_widthC/2), self.height - text_heightC - text_heightD))
 
         # Use alpha blending when blitting to the screen
         smartdisplay.pygamescreen.blit(self.surface, pos, special_flags=pygame.BLEND_ALPHA_SDL2)
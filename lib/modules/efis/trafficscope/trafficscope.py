@@ -13,6 +13,7 @@ from lib.common.dataship.dataship import Dataship
 from lib.common.dataship.dataship_targets import TargetData, Target
 from lib.common.dataship.dataship_gps import GPSData
 from lib.common.dataship.dataship_imu import IMUData
+from lib.common.helpers.traffic_cpa import THREAT_ADVISORY, THREAT_ALERT
 
 import pygame
 import math
@@ -34,9 +35,15 @@ class trafficscope(Module):
         self.draw_icon = hud_utils.readConfigBool("TrafficScope", "draw_icon", True)
         self.icon_scale = hud_utils.readConfigInt("TrafficScope", "icon_scale", 10)
         self.details_offset = hud_utils.readConfigInt("TrafficScope", "details_offset", 5)
+        self.show_trails = hud_utils.readConfigBool("TrafficScope", "show_trails", True)
+        self.trail_points = hud_utils.readConfigInt("TrafficScope", "trail_points", 12) # max line segments per trail
+        self.trail_max_age = hud_utils.readConfigInt("TrafficScope", "trail_max_age", 120) # seconds
 
         self.targetDetails = {} # keep track of details about each target. like the x,y position on the screen. and if they are selected.
 
+        # dead reckon targets between position reports. (smoothing is only used if this is off)
+        self.dead_reckoning = hud_utils.readConfigBool("TrafficScope", "dead_reckoning", True)
+
         # Add smoothing configuration
         self.enable_smoothing = hud_utils.readConfigBool("TrafficScope", "enable_smoothing", True)
         self.smoothing_factor = 0.15
@@ -157,6 +164,9 @@ class trafficscope(Module):
 
     # called every redraw for the mod
     def draw(self, dataship:Dataship, smartdisplay, pos):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
+        self.gpsData = self.gpsData.snapshot()
         # clear the surface
         self.surface2.fill((0,0,0,0))
         # Clear using the base surface.
@@ -167,18 +177,29 @@ class trafficscope(Module):
         # Get aircraft heading or ground track, if both are None then use 0
         target_heading = self.imuData.yaw if self.imuData.yaw is not None else self.gpsData.GndTrack if self.gpsData.GndTrack is not None else 0
 
+        # for turning trail points (miles east/north) into screen x/y. (heading up)
+        headingRad = math.radians(target_heading)
+        cosH = math.cos(headingRad) * self.scope_scale
+        sinH = math.sin(headingRad) * self.scope_scale
+
+        if self.dead_reckoning:
+            self.targetData.extrapolate()
+
         def draw_target(t: Target):
             if t.dist is None or t.dist >= 100 or t.brng is None:
                 return
 
-            brngToUse = (t.brng - target_heading) % 360
+            dist, brng = t.dist, t.brng
+            if self.dead_reckoning and t.dr_dist is not None:
+                dist, brng = t.dr_dist, t.dr_brng
+            brngToUse = (brng - target_heading) % 360
             radianAngle = math.radians(brngToUse - 90)
-            d = t.dist * self.scope_scale
+            d = dist * self.scope_scale
             target_x = self.xCenter + (d * math.cos(radianAngle))
             target_y = self.yCenter + (d * math.sin(radianAngle))
 
             # Apply position smoothing if enabled
-            if self.enable_smoothing:
+            if self.enable_smoothing and not self.dead_reckoning:
                 current_time = time.time()
                 
                 if t.callsign not in self.target_positions:
@@ -209,13 +230,21 @@ class trafficscope(Module):
                     target_x = self.target_positions[t.callsign]['displayed_x']
                     target_y = self.target_positions[t.callsign]['displayed_y']
 
+            # Draw the trail from the target's past positions up to where it is now.
+            if self.show_trails:
+                trail = self.targetData.getTrail(t, self.trail_max_age, self.trail_points)
+                if trail:
+                    points = [(self.xCenter + x * cosH - y * sinH, self.yCenter - x * sinH - y * cosH) for x, y in trail]
+                    points.append((target_x, target_y))
+                    pygame.draw.lines(self.surface2, (0, 110, 60), False, points, 1)
+
             # Draw the target using smoothed positions
             if self.draw_icon:
                 direction_target_facing = ((t.track or brngToUse) - target_heading) % 360
                 t.targetDirection = round(math.radians(direction_target_facing - 90), 2)
                 self.drawAircraftIcon(self.surface2, t, target_x, target_y, self.icon_scale)
             else:
-                hud_graphics.hud_draw_circle(self.surface2, (0, 255, 129), (target_x, target_y), 4, 0)
+                hud_graphics.hud_draw_circle(self.surface2, self.threatColor(t), (target_x, target_y), 4, 0)
 
             x_text = target_x + self.details_offset
             y_text = target_y + self.details_offset
@@ -240,7 +269,7 @@ class trafficscope(Module):
                 self.targetDetails[t.callsign]["y"] = target_y
 
         # Separate targets into selected and non-selected lists
-        valid_targets = list(filter(lambda t: t.dist is not None and t.dist < 100 and t.brng is not None, self.targetData.targets))
+        valid_targets = self.targetData.targetsWithin(100)
         
         selected_targets = []
         other_targets = []
@@ -257,6 +286,14 @@ class trafficscope(Module):
         # Draw selected targets last (so they appear on top)
         list(map(draw_target, selected_targets))
 
+        # debug overlay. traffic source cache stats.
+        if dataship.debug_mode > 0:
+            td = self.targetData
+            labelDebug = self.font.render(f"addr {td.address_cache_size} hit/miss {td.address_cache_hits}/{td.address_cache_misses} evict {td.address_cache_evictions}", False, (200,255,255), (0,0,0))
+            self.surface2.blit(labelDebug, (5, self.height - 2 * labelDebug.get_height() - 5))
+            labelDebug = self.font.render(f"faa hit/miss {td.faa_cache_hits}/{td.faa_cache_misses} out of range {td.prefilter_rejects}", False, (200,255,255), (0,0,0))
+            self.surface2.blit(labelDebug, (5, self.height - labelDebug.get_height() - 5))
+
         # if there is a selected target then draw some buttons.
         if self.selectedTarget is not None:
             if self.selectedTarget.type == 101:   # meshtastic type target.
@@ -282,7 +319,7 @@ class trafficscope(Module):
             next_text_y_offset = label_rect.height
             if self.selectedTarget == None or self.selectedTarget and t.address == self.selectedTarget.address:
 
-                labelSpeed = self.font_target.render(f"{t.speed}mph", False, (200,255,255), (0,0,0))
+                labelSpeed = self.font_target.render(f"{t.speed}kt", False, (200,255,255), (0,0,0))
                 labelSpeed_rect = labelSpeed.get_rect()
                 self.surface2.blit(labelSpeed, (x_text, y_text + label_rect.height))
 
@@ -317,10 +354,10 @@ class trafficscope(Module):
                     self.surface2.blit(labelFaa, (x_text, y_text + next_text_y_offset))
                     next_text_y_offset += labelFaa.get_rect().height
 
-                    if t.faa_db_record.commerical_name:
-                        labelCommercial = self.font_target.render(f"{t.faa_db_record.commerical_name}", False, (200,255,255), (0,0,0))
-                        self.surface2.blit(labelCommercial, (x_text, y_text + next_text_y_offset))
-                        next_text_y_offset += labelCommercial.get_rect().height
+                if t.commercialName:
+                    labelCommercial = self.font_target.render(f"{t.commercialName}", False, (200,255,255), (0,0,0))
+                    self.surface2.blit(labelCommercial, (x_text, y_text + next_text_y_offset))
+                    next_text_y_offset += labelCommercial.get_rect().height
             
             # if aircraft is selected then give some more details.
             if self.selectedTarget and t.address == self.selectedTarget.address:
@@ -330,10 +367,19 @@ class trafficscope(Module):
                     next_text_y_offset += labelCommercial.get_rect().height
                 
 
+    # color for a target based on its threat level. (see traffic_cpa.py)
+    def threatColor(self, target):
+        if target.threat_level >= THREAT_ALERT:
+            return (255, 0, 0)
+        if target.threat_level >= THREAT_ADVISORY:
+            return (255, 200, 0)
+        return (0, 255, 129)
+
     # draw aircraft icon based on the type of aircraft
     def drawAircraftIcon(self, surface, target, xx, yy, scale):
 
         direction_target_facing = target.targetDirection
+        color = self.threatColor(target)
         # types of aircraft
         # 0 = unkown
         # 1 = Light (ICAO) < 15 500 lbs
@@ -367,9 +413,9 @@ class trafficscope(Module):
                                 tail[1] + scale * 0.3 * math.sin(direction_target_facing - math.pi/2))
 
             # Draw the aircraft outline
-            pygame.draw.line(surface, (0, 255, 129), nose, tail, 1)
-            pygame.draw.line(surface, (0, 255, 129), wing_left, wing_right, 1)
-            pygame.draw.line(surface, (0, 255, 129), elevator_left, elevator_right, 1)
+            pygame.draw.line(surface, color, nose, tail, 1)
+            pygame.draw.line(surface, color, wing_left, wing_right, 1)
+            pygame.draw.line(surface, color, elevator_left, elevator_right, 1)
         elif(target.type == 7):
             # draw a helicopter. which will look like a X with a line through it. use nose and tail to draw it.
             # calculate the angle of the helicopter blades.
@@ -381,14 +427,14 @@ class trafficscope(Module):
             blade_pos = (nose[0] + blade_length * math.cos(blade_angle), 
                             nose[1] + blade_length * math.sin(blade_angle))
             # also draw a light circle around the helicopter.
-            pygame.draw.circle(surface, (0, 255, 129), tail, scale * 0.2, 1)
-            pygame.draw.circle(surface, (0, 255, 129), blade_pos, scale * 0.8, 1)
+            pygame.draw.circle(surface, color, tail, scale * 0.2, 1)
+            pygame.draw.circle(surface, color, blade_pos, scale * 0.8, 1)
 
             # draw the blades.
-            pygame.draw.line(surface, (0, 255, 129), nose, blade_pos, 1)
-            pygame.draw.line(surface, (0, 255, 129), tail, blade_pos, 1)
+            pygame.draw.line(surface, color, nose, blade_pos, 1)
+            pygame.draw.line(surface, color, tail, blade_pos, 1)
             # draw a line through the middle of the helicopter.
-            pygame.draw.line(surface, (0, 255, 129), nose, tail, 1)
+            pygame.draw.line(surface, color, nose, tail, 1)
         elif(target.type == 101):
             # Draw the Meshtastic logo ( /< )
             logo_color = (0, 255, 129)
@@ -488,6 +534,18 @@ class trafficscope(Module):
                 "label": "Aircraft Icon Scale",
                 "description": "Set the scale of the aircraft icon."
             },
+            "dead_reckoning": {
+                "type": "bool",
+                "default": True,
+                "label": "Dead Reckoning",
+                "description": "Move targets along their track between position reports"
+            },
+            "show_trails": {
+                "type": "bool",
+                "default": True,
+                "label": "Show Trails",
+                "description": "Draw a trail of where each target has been"
+            },
             "enable_smoothing": {
                 "type": "bool",
                 "default": True,
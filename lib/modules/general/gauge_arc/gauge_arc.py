@@ -68,6 +68,7 @@ class gauge_arc(Module):
         # Add smoothing variables
         self.current_smooth_value = 0  # Current interpolated value
         self.smooth_factor = 0.15  # How quickly to move to target (0.1 = slow, 0.9 = fast)
+        self._settled = False # needle has reached the value. (last frame can be reused until the data changes)
 
         # Cache for expensive calculations
         self._cached_tick_positions = []
@@ -188,6 +189,14 @@ class gauge_arc(Module):
         x = pos[0] if pos[0] is not None else smartdisplay.x_center
         y = pos[1] if pos[1] is not None else smartdisplay.y_center
 
+        # data hasn't changed and the needle has stopped moving, so the last frame is still right.
+        # (always redrawn in the editor where options can change)
+        if self._settled and aircraft.interface != dataship.Interface.EDITOR:
+            if not self.dataChanged(self.get_data_source(aircraft, self.data_field)):
+                self.pygamescreen.blit(self.surface2, (x, y))
+                return
+        self._settled = False
+
         # Clear the surface
         self.surface2.fill((0,0,0,0))
         
@@ -230,6 +239,7 @@ class gauge_arc(Module):
             
             self.current_smooth_value += (target_value - self.current_smooth_value) * self.smooth_factor
             value = max(self.minValue, min(self.maxValue, self.current_smooth_value))
+            self._settled = abs(target_value - self.current_smooth_value) <= abs(self.maxValue - self.minValue) * 0.001
         else:
             value = None
 
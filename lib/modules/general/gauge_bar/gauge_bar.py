@@ -62,6 +62,7 @@ class gauge_bar(Module):
         # Smoothing
         self.current_smooth_value = 0
         self.smooth_factor = 0.15
+        self._settled = False # bars have reached their values. (last frame can be reused until the data changes)
 
     def initMod(self, pygamescreen, width=None, height=None):
         if width is None:
@@ -152,6 +153,14 @@ class gauge_bar(Module):
         else:
             y = pos[1]
 
+        # data hasn't changed and the bars have stopped moving, so the last frame is still right.
+        # (always redrawn in the editor where options can change)
+        if self._settled and aircraft.interface != dataship.Interface.EDITOR:
+            if not self.dataChanged(self.get_data_source(aircraft, self.data_field)):
+                self.pygamescreen.blit(self.surface2, (x, y))
+                return
+        self._settled = False
+
         # Clear surface
         self.surface2.fill((0,0,0,0))
         
@@ -180,11 +189,14 @@ class gauge_bar(Module):
             self.current_smooth_values = [0] * len(target_value)
             
         # Process each value
+        settled = True
         for i, (target, smooth_val) in enumerate(zip(target_value, self.current_smooth_values)):
             if target is not None:
                 diff = target - smooth_val
                 self.current_smooth_values[i] += diff * self.smooth_factor
                 value = max(self.minValue, min(self.maxValue, self.current_smooth_values[i]))
+                if abs(target - self.current_smooth_values[i]) > abs(self.maxValue - self.minValue) * 0.001:
+                    settled = False
             else:
                 value = None
                 
@@ -355,6 +367,8 @@ class gauge_bar(Module):
                             label_surface = self.font.render(self.range3_label, True, self.range3_color)
                             self.surface2.blit(label_surface, (label_x + 120, label_y))
 
+        self._settled = settled
+
         # Blit to screen
         self.pygamescreen.blit(self.surface2, (x, y))
 
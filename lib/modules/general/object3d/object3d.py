@@ -101,6 +101,8 @@ class object3d(Module):
 
     # called every redraw for the mod
     def draw(self, dataship: Dataship, smartdisplay, pos=(None, None)):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
         # Clear the surface
         self.surface.fill((0, 0, 0, 0))
 
@@ -25,7 +25,7 @@ class play_controls(Module):
     # called once for setup, or when module is being resized in editor
     def initMod(self, pygamescreen, width=None, height=None):
         if width is None:
-            width = 290 # default width
+            width = 360 # default width
         if height is None:
             height = 50 # default height
         Module.initMod( self, pygamescreen, width, height )  # call parent init screen.
@@ -42,6 +42,7 @@ class play_controls(Module):
         self.buttonAdd("btnPlay", "Play", self.buttonPlay)
         self.buttonAdd("btnFastForward1", ">", self.buttonFastForward)
         self.buttonAdd("btnFastForward2", ">>", self.buttonFastForward)
+        self.buttonAdd("btnSpeed", shared.PlaybackClock.speedText(), self.buttonSpeed, width=self.button_font.size("0.5x")[0] + 10)
         self.buttonAdd("btnRecord", "REC", self.buttonRecord)
         
         #self.buttonAdd("Label_dist", "PlayBack:", newRow=True, type="label")
@@ -56,6 +57,13 @@ class play_controls(Module):
         self.surface.fill((0, 0, 0, 0))
         self.buttonsDraw(aircraft, smartdisplay, pos)  # draw buttons
 
+        # warn if the recorder is falling behind or dropping data.
+        for index in range(min(len(shared.Inputs), 2)):
+            status = shared.Inputs[index].getLogQueueStatus()
+            if status is not None and (status[1] > 50 or status[2] > 0):
+                text = self.button_font.render("REC %s queue:%d%% dropped:%d"%(shared.Inputs[index].name, status[1], status[2]), True, (255,200,0))
+                self.pygamescreen.blit(text, (pos[0] + 10, pos[1] + self.buttonLastY + 5 + index * text.get_height()))
+
         # next_line = self.buttonLastY + 10
         # for input in shared.Inputs:
         #     text = self.button_font.render(input.name, True, (200,200,200))
@@ -82,30 +90,30 @@ class play_controls(Module):
         if len(shared.Inputs) > 1 and shared.Inputs[1].input_logFileName != None:
             shared.Inputs[1].isPaused = not shared.Inputs[1].isPaused
             self.buttonSelected("btnPlay",not shared.Inputs[1].isPaused) # set the button to selected
+        shared.PlaybackClock.setPaused(shared.Inputs[0].isPaused)
+
+    # cycle playback speed. 0.5x to 20x then max speed.
+    def buttonSpeed(self,aircraft,button):
+        button["text"] = shared.PlaybackClock.nextSpeed()
+
+    # skip forward/back by time if the log has timestamps, else by percent of the log.
+    def skipInputs(self, seconds, percent):
+        shared.PlaybackClock.skipRecorded(seconds) # recordings move together.
+        for index in range(min(len(shared.Inputs), 2)):
+            if shared.Inputs[index].input_logFileName != None:
+                shared.Inputs[index].skipLog(shared.Dataship, seconds, percent)
 
     def buttonFastForward(self,aircraft,button):
         if button["text"] == ">>":
-            if shared.Inputs[0].input_logFileName != None:  
-                shared.Inputs[0].fastForward(shared.Dataship,1000)
-            if len(shared.Inputs) > 1 and shared.Inputs[1].input_logFileName != None:
-                shared.Inputs[1].fastForward(shared.Dataship,1000)
+            self.skipInputs(60, 5)
         else:
-            if shared.Inputs[0].input_logFileName != None:
-                shared.Inputs[0].fastForward(shared.Dataship,500)
-            if len(shared.Inputs) > 1 and shared.Inputs[1].input_logFileName != None:
-                shared.Inputs[1].fastForward(shared.Dataship,500)
+            self.skipInputs(10, 1)
 
     def buttonFastBackwards(self,aircraft,button):
         if button["text"] == "<<":
-            if shared.Inputs[0].input_logFileName != None:
-                shared.Inputs[0].fastBackwards(shared.Dataship,1000)
-            if len(shared.Inputs) > 1 and shared.Inputs[1].input_logFileName != None:
-                shared.Inputs[1].fastBackwards(shared.Dataship,1000)
+            self.skipInputs(-60, -5)
         else:
-            if shared.Inputs[0].input_logFileName != None:
-                shared.Inputs[0].fastBackwards(shared.Dataship,500)
-            if len(shared.Inputs) > 1 and shared.Inputs[1].input_logFileName != None:
-                shared.Inputs[1].fastBackwards(shared.Dataship,500)
+            self.skipInputs(-10, -1)
 
     def buttonRecord(self,aircraft,button):
         if shared.Inputs[0].output_logFile == None:
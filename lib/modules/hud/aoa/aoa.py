@@ -76,6 +76,9 @@ class aoa(Module):
 
     # called every redraw for the mod
     def draw(self, dataship, smartdisplay, pos):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
+        self.airData = self.airData.snapshot()
         self.surface.fill((0, 0, 0))  # clear surface
         x,y = pos
 
@@ -65,6 +65,9 @@ class gcross(Module):
 
     # called every redraw for the mod
     def draw(self, dataship, smartdisplay, pos):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
+        self.airData = self.airData.snapshot()
         # clear the surface transparent
         self.surface.fill((0, 0, 0, 0))  # clear surface
 
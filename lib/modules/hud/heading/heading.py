@@ -164,6 +164,9 @@ class heading(Module):
 
     # called every redraw for the mod
     def draw(self, dataship:Dataship, smartdisplay, pos=(None, None)):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
+        self.gpsData = self.gpsData.snapshot()
         #print(f"mag_head: {aircraft.mag_head}, gndtrack: {aircraft.gndtrack}")
         x = pos[0] if pos[0] is not None else 0
         y = pos[1] if pos[1] is not None else 0
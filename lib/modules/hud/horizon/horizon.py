@@ -11,8 +11,10 @@ from lib import hud_graphics
 from lib import hud_utils
 from lib import smartdisplay
 from lib.common.dataship import dataship
+from lib.common.dataship.dataship_history import History
 import pygame
 import math
+import time
 
 
 class horizon(Module):
@@ -61,10 +63,8 @@ class horizon(Module):
         self.showTrafficMiles = hud_utils.readConfigInt("HUD", "show_traffic_within_miles", 5)
 
         # sampling for flight path.
-        self.readings = []  # Setup moving averages to smooth a bit
-        self.max_samples = 30 # FPM smoothing
-        self.readings1 = []  # Setup moving averages to smooth a bit
-        self.max_samples1 = 30 # Caged FPM smoothing
+        self.readings = History(30)  # Setup moving averages to smooth a bit. FPM smoothing
+        self.readings1 = History(30)  # Caged FPM smoothing
 
         self.x_offset = 0
 
@@ -298,9 +298,6 @@ class horizon(Module):
             )
 
     def draw_flight_path(self,aircraft,smartdisplay):
-        def mean(nums):
-            return int(sum(nums)) / max(len(nums), 1)
-
         # flight path indicator  Default Caged Mode
         if self.caged_mode == 1:
             fpv_x = 0.0
@@ -308,17 +305,13 @@ class horizon(Module):
             fpv_x = ((((aircraft.mag_head - aircraft.gndtrack) + 180) % 360) - 180) * 1.5  + (
                 aircraft.turn_rate * 5
             )
-            self.readings.append(fpv_x)
-            fpv_x = mean(self.readings)  # Moving average to smooth a bit
-            if len(self.readings) == self.max_samples:
-                self.readings.pop(0)
+            self.readings.add(fpv_x, time.monotonic())
+            fpv_x = self.readings.mean()  # Moving average to smooth a bit
         gfpv_x = ((((aircraft.mag_head - aircraft.gndtrack) + 180) % 360) - 180) * 1.5  + (
             aircraft.turn_rate * 5
         )
-        self.readings1.append(gfpv_x)
-        gfpv_x = mean(self.readings1)  # Moving average to smooth a bit
-        if len(self.readings1) == self.max_samples1:
-            self.readings1.pop(0)
+        self.readings1.add(gfpv_x, time.monotonic())
+        gfpv_x = self.readings1.mean()  # Moving average to smooth a bit
         self.draw_circle(
             smartdisplay.pygamescreen,
             (255, 0, 255),  # changed from Magenta 255, 0, 255
@@ -11,12 +11,14 @@ from lib import hud_utils
 from lib import smartdisplay
 import pygame
 import math
+import time
 from lib.common import shared
 from lib.common.dataship.dataship import Dataship
 from lib.common.dataship.dataship_targets import TargetData
 from lib.common.dataship.dataship_gps import GPSData
 from lib.common.dataship.dataship_imu import IMUData
 from lib.common.dataship.dataship_air import AirData
+from lib.common.dataship.dataship_history import History
 
 
 class horizon_v2(Module):
@@ -90,10 +92,8 @@ class horizon_v2(Module):
         self.center_circle_mode = hud_utils.readConfigInt("HUD", "center_circle", 4)
 
         # sampling for flight path.
-        self.readings = []  # Setup moving averages to smooth a bit
-        self.max_samples = 30 # FPM smoothing
-        self.readings1 = []  # Setup moving averages to smooth a bit
-        self.max_samples1 = 30 # Caged FPM smoothing
+        self.readings = History(30)  # Setup moving averages to smooth a bit. FPM smoothing
+        self.readings1 = History(30)  # Caged FPM smoothing
 
         self.x_offset = 0
         self.xCenter = self.width // 2
@@ -429,9 +429,6 @@ class horizon_v2(Module):
         # Check if VSI is None or yaw is None - if so, return without drawing
         if self.airData.VSI is None or self.imuData.yaw is None:
             return
-        
-        def mean(nums):
-            return int(sum(nums)) / max(len(nums), 1)
 
         VSI_div = self.airData.VSI / 2
 
@@ -444,10 +441,8 @@ class horizon_v2(Module):
             fpv_x = ((((self.imuData.yaw - self.gpsData.GndTrack) + 180) % 360) - 180) * 1.5  + (
                 self.imuData.turn_rate * 5
             )
-            self.readings.append(fpv_x)
-            fpv_x = mean(self.readings)
-            if len(self.readings) == self.max_samples:
-                self.readings.pop(0)
+            self.readings.add(fpv_x, time.monotonic())
+            fpv_x = self.readings.mean()
             fpv_x = int(fpv_x) * 1.5
         
         use_heading = self.imuData.yaw
@@ -457,10 +452,8 @@ class horizon_v2(Module):
         gfpv_x = ((((use_heading - self.imuData.yaw) + 180) % 360) - 180) * 1.5  + (
             self.imuData.turn_rate * 5
         )
-        self.readings1.append(gfpv_x)
-        gfpv_x = mean(self.readings1)
-        if len(self.readings1) == self.max_samples1:
-            self.readings1.pop(0)
+        self.readings1.add(gfpv_x, time.monotonic())
+        gfpv_x = self.readings1.mean()
 
         center_x = self.width // 2
         center_y = self.height // 2
@@ -558,6 +551,10 @@ class horizon_v2(Module):
 
     # called every redraw for this screen module
     def draw(self, dataship:Dataship, smartdisplay, pos=(0, 0)):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
+        self.gpsData = self.gpsData.snapshot()
+        self.airData = self.airData.snapshot()
         '''
         Draw method to draw all the elements of the horizon.
         '''
@@ -626,9 +623,9 @@ class horizon_v2(Module):
 
             # Only show targets if camera is roughly aligned with aircraft heading
             if self.show_targets and (camera_yaw is None or abs(camera_yaw) < 45):
+                self.targetData.extrapolate() # dead reckon targets to now.
                 list(map(lambda t: self.draw_target(t, dataship), 
-                        filter(lambda t: t.dist is not None and t.dist < self.target_distance_threshold and t.brng is not None, 
-                                self.targetData.targets)))
+                        self.targetData.targetsInSector(self.target_distance_threshold, self.imuData.yaw, self.fov_x / 2)))
 
             # Draw center and flight path
             self.draw_center(smartdisplay, x, y)
@@ -653,17 +650,24 @@ class horizon_v2(Module):
             # else can't use either so don't draw it.
             return
 
+        # use the dead reckoned position if we have one.
+        dist, brng, altDiff = t.dist, t.brng, t.altDiff
+        if t.dr_dist is not None:
+            dist, brng = t.dr_dist, t.dr_brng
+            if t.dr_altDiff is not None:
+                altDiff = t.dr_altDiff
+
         # Calculate the relative bearing to the target
-        relative_bearing = (t.brng - heading_to_use + 180) % 360 - 180
+        relative_bearing = (brng - heading_to_use + 180) % 360 - 180
 
         # Check if the target is within the field of view
         if abs(relative_bearing) > self.fov_x / 2:
             return  # Target is outside the field of view, don't draw it
 
-        if t.altDiff is not None and self.imuData.pitch is not None and self.imuData.roll is not None:
+        if altDiff is not None and self.imuData.pitch is not None and self.imuData.roll is not None:
             # Convert distances to meters
-            alt_diff_meters = t.altDiff * 0.3048
-            dist_meters = t.dist * 1609.34
+            alt_diff_meters = altDiff * 0.3048
+            dist_meters = dist * 1609.34
             # Calculate the angle to the target relative to the horizon in radians
             angle_to_target = math.atan2(alt_diff_meters, dist_meters)
             # Adjust for aircraft pitch
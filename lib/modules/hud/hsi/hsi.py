@@ -292,6 +292,10 @@ class hsi(Module):
 
     # called every redraw for the mod
     def draw(self, dataship:Dataship, smartdisplay, pos=(None, None)):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
+        self.gpsData = self.gpsData.snapshot()
+        self.airData = self.airData.snapshot()
         x_pos = smartdisplay.x_center
         y_pos = smartdisplay.y_center
         if pos[0] is not None:
@@ -117,6 +117,8 @@ class rollindicator(Module):
 
     # called every redraw for the mod
     def draw(self, dataship: Dataship, smartdisplay, pos=(None, None)):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.IMUData = self.IMUData.snapshot()
 
         x_pos = 0
         y_pos = 0
@@ -56,6 +56,9 @@ class slipskid(Module):
 
     # called every redraw for the mod
     def draw(self, dataship:Dataship, smartdisplay, pos=(None,None)):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.imuData = self.imuData.snapshot()
+        self.airData = self.airData.snapshot()
 
         if pos[0] is None:
             x = smartdisplay.x_center
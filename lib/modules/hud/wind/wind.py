@@ -55,6 +55,8 @@ class wind(Module):
 
     # called every redraw for the mod
     def draw(self, dataship:Dataship, smartdisplay, pos):
+        # this frame's copy of the data. (see DataObject.snapshot)
+        self.airData = self.airData.snapshot()
 
         x,y = pos
 
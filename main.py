@@ -14,7 +14,7 @@
 # 11/04/2024 Update for pygame-ce 2.5.1. (new editor mode)
 #
 
-import os, sys, time, threading, argparse, pygame, importlib
+import os, sys, time, threading, argparse, pygame, importlib, math
 from lib import hud_utils
 from lib import hud_graphics
 from lib.util import drawTimer
@@ -48,32 +48,39 @@ class myThreadEfisInputReader(threading.Thread):
             print("No inputs with onMessagePriority set, exiting input thread")
             return
         while shared.Dataship.errorFoundNeedToExit == False:
+            nextDue = None # seconds until the next playback message is due. (if nothing was read)
+            readSomething = False
             # loop through all inputs and read messages from them.
             for i in range(input_count):
                 if(shared.Inputs[i].isPaused==True):
-                    pass
+                    if nextDue is None or nextDue > .04: nextDue = .04
                 else:
+                    if shared.Inputs[i].PlayFile != None: # if playing back a file.. wait until the playback clock says the next message is due.
+                        dueIn = shared.Inputs[i].playbackDueIn()
+                        if dueIn > 0:
+                            if nextDue is None or dueIn < nextDue: nextDue = dueIn
+                            continue
                     if shared.Inputs[i].onMessagePriority == 0:
                         shared.Inputs[i].readMessage(shared.Dataship)
                         shared.Inputs[i].time_stamp = shared.Inputs[i].time_stamp_string
+                        readSomething = True
                     elif shared.Inputs[i].onMessagePriority is not None:
                         # mod the internalLoopCounter by the priority and if it's 0, read messages.
                         if internalLoopCounter % shared.Inputs[i].onMessagePriority == 0:
                             shared.Inputs[i].readMessage(shared.Dataship)
                             shared.Inputs[i].time_stamp = shared.Inputs[i].time_stamp_string
+                            readSomething = True
 
             internalLoopCounter = internalLoopCounter - 1
             #print(f"{internalLoopCounter}", end=" ")
             if internalLoopCounter < 1:
                 internalLoopCounter = 100
                 checkInternals()
-                if len(shared.Dataship.targetData) > 0:
-                    shared.Dataship.targetData[0].cleanUp(shared.Dataship) # check if old traffic targets should be cleared up.
                 #print(f"Input Thread: {shared.Inputs[0].name} looped")
+            cleanUpTargets() # check if old traffic targets should be cleared up.
 
-            if (shared.Inputs[0].PlayFile != None): # if playing back a file.. add a little delay so it's closer to real world time.
-               #print(f"sleep")
-               time.sleep(.04)
+            if nextDue is not None and readSomething == False: # nothing to read until the next playback message is due.
+               time.sleep(min(nextDue, 0.1))
             # if shared.Dataship.textMode == True: # if in text mode.. lets delay a bit.. this keeps the cpu from heating up on my mac.
             #     time.sleep(.01)
 
@@ -109,8 +116,13 @@ class SingleInputReader(threading.Thread):
         print(f"Input Thread {self.input_index}: {shared.Inputs[self.input_index].name} started")
         while shared.Dataship.errorFoundNeedToExit == False:
             if shared.Inputs[self.input_index].isPaused == True:
-                pass
+                time.sleep(.04)
             else:
+                if shared.Inputs[self.input_index].PlayFile != None: # if playing back a file.. wait until the playback clock says the next message is due.
+                    dueIn = shared.Inputs[self.input_index].playbackDueIn()
+                    if dueIn > 0:
+                        time.sleep(min(dueIn, 0.1))
+                        continue
                 # if priority is 0, read messages every cycle of the loop.
                 if shared.Inputs[self.input_index].onMessagePriority == 0:
                     shared.Inputs[self.input_index].readMessage(shared.Dataship)
@@ -127,16 +139,25 @@ class SingleInputReader(threading.Thread):
                     if internalLoopCounter < 1:
                         internalLoopCounter = 1000
                         checkInternals()
-                        if len(shared.Dataship.targetData) > 0:
-                            shared.Dataship.targetData[0].cleanUp(shared.Dataship) # check if old traffic targets should be cleared up.
                         #print(f"Input Thread: {self.input_index} {shared.Inputs[self.input_index].name} looped")
+                    cleanUpTargets() # check if old traffic targets should be cleared up.
 
-            if shared.Inputs[self.input_index].PlayFile != None: # if playing back a file.. add a little delay so it's closer to real world time.
-                #print(f"sleep")
-                time.sleep(.04)
             # if shared.Dataship.textMode == True:
             #     time.sleep(.01)
 
+#############################################
+## Function: cleanUpTargets
+## once a second remove old traffic targets. (by time, not loop count. cleanUp only looks at targets that are due)
+lastTargetCleanUp = 0
+def cleanUpTargets():
+    global lastTargetCleanUp
+    now = time.monotonic()
+    if now - lastTargetCleanUp < 1:
+        return
+    lastTargetCleanUp = now
+    if len(shared.Dataship.targetData) > 0:
+        shared.Dataship.targetData[0].cleanUp(shared.Dataship)
+
 #############################################
 ## Function: checkInternals
 # check internal values for this processor/machine..
@@ -192,6 +213,7 @@ if __name__ == "__main__":
     parser.add_argument('-l', action='store_true', help='List serial ports')
     parser.add_argument('--load-screen', type=str, help='Load screen from JSON file')
     parser.add_argument('--input-threads', action='store_true', help='Run each input on a separate thread (default is all on one input thread)')
+    parser.add_argument('--playspeed', type=str, help='Playback speed multiplier 0.5 to 20, or max to play as fast as possible')
     
     # Replace individual input arguments with dynamic argument handling
     input_args = {}
@@ -220,6 +242,22 @@ if __name__ == "__main__":
         allPlayback = True
     else:
         allPlayback = None # None means no playback
+    playspeed = args.playspeed if args.playspeed else hud_utils.readConfig("Main", "playback_speed", "1")
+    playspeed = str(playspeed).strip().lower()
+    if playspeed == "max":
+        shared.PlaybackClock.setMaxSpeed(True)
+    else:
+        try:
+            speed = float(playspeed[:-1] if playspeed.endswith("x") else playspeed) # (2 or 2x)
+        except ValueError:
+            speed = None
+        if speed is None or not math.isfinite(speed) or speed <= 0:
+            print("Invalid playback speed: "+playspeed+" (use 0.5 to 20 or max) using 1")
+            speed = 1.0
+        shared.PlaybackClock.setSpeed(speed)
+    # time series history of tracked dataship fields. (see dataship_history.py)
+    shared.Dataship.history.max_points = hud_utils.readConfigInt("Main", "history_max_points", 100000)
+    shared.Dataship.history.clock = shared.PlaybackClock.now # so rates are right when logs are played back faster.
     if args.c:  # this is the same as --playfile1        
         args.playfile1 = args.c
     if args.i:
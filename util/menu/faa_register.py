@@ -386,8 +386,22 @@ def unzip_file(zipfile_path, outfile, extract_acftref=False):
         print(f"Error extracting file: {e}")
         return False
 
+BUILD_CACHE_KB = 65536 # sqlite page cache used while building the database. (64MB)
+
+def open_for_bulk_load(db_file):
+    """Open a database for bulk loading.
+    No rollback journal and no syncing to disk. the database is built in a temp file and only swapped
+    into place when it's complete, so if the build is interrupted the temp file is just thrown away."""
+    conn = sqlite3.connect(db_file)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute(f'PRAGMA cache_size = -{BUILD_CACHE_KB}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    return conn
+
 def convert_to_sqlite(csv_file, db_file):
-    """Convert the FAA CSV data to a SQLite database."""
+    """Convert the FAA CSV data to a SQLite database.
+    Indexes are not created here. call create_indexes() once everything is loaded."""
     print(f"Converting {csv_file} to SQLite database {db_file}...")
     
     # First, count total lines to get an estimate for progress calculation
@@ -409,7 +423,7 @@ def convert_to_sqlite(csv_file, db_file):
         os.remove(db_file)
     
     # Connect to the database
-    conn = sqlite3.connect(db_file)
+    conn = open_for_bulk_load(db_file)
     cursor = conn.cursor()
     
     # Create the table structure
@@ -452,12 +466,6 @@ def convert_to_sqlite(csv_file, db_file):
     )
     ''')
     
-    # Create indexes for faster searching
-    cursor.execute('CREATE INDEX idx_mfr_mdl_code ON aircraft (mfr_mdl_code)')
-    cursor.execute('CREATE INDEX idx_kit_mfr ON aircraft (kit_mfr)')
-    cursor.execute('CREATE INDEX idx_kit_model ON aircraft (kit_model)')
-    cursor.execute('CREATE INDEX idx_n_number ON aircraft (n_number)')
-    
     try:
         # Read and insert data
         with open(csv_file, 'r', encoding='utf-8', errors='replace') as f:
@@ -465,7 +473,7 @@ def convert_to_sqlite(csv_file, db_file):
             next(reader)  # Skip header row
             
             total_rows = 0
-            batch_size = 1000
+            batch_size = 10000
             batch = []
             
             for i, row in enumerate(reader):
@@ -513,7 +521,7 @@ def convert_to_sqlite(csv_file, db_file):
                     row[30].strip() if len(row) > 30 else '',  # unique_id
                     row[31].strip() if len(row) > 31 else '',  # kit_mfr
                     row[32].strip() if len(row) > 32 else '',  # kit_model
-                    row[33].strip() if len(row) > 33 else ''   # mode_s_code_hex
+                    row[33].strip().upper() if len(row) > 33 else ''   # mode_s_code_hex
                 )
                 
                 batch.append(db_row)
@@ -525,7 +533,6 @@ def convert_to_sqlite(csv_file, db_file):
                         'INSERT OR REPLACE INTO aircraft VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)',
                         batch
                     )
-                    conn.commit()
                     batch = []
                     
                     # Calculate and show percentage if we have a total line count
@@ -539,7 +546,7 @@ def convert_to_sqlite(csv_file, db_file):
                     'INSERT OR REPLACE INTO aircraft VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)',
                     batch
                 )
-                conn.commit()
+            conn.commit() # everything goes in as one transaction.
                 
         print(f"\nConverted {total_rows} records to SQLite database")
         
@@ -571,6 +578,30 @@ def find_aircraft_by_n_number(db_file, n_number):
     conn.close()
     return aircraft, aircraft.mfr_mdl_code, (aircraft.kit_mfr, aircraft.kit_model)
 
+def find_aircraft_by_mode_s_hex(db_file, mode_s_hex):
+    """Search for an aircraft by its 24-bit ICAO address. (mode s code hex, like A1B2C3)"""
+    mode_s_hex = mode_s_hex.strip().upper()
+    if mode_s_hex.startswith("0X"):
+        mode_s_hex = mode_s_hex[2:]
+    mode_s_hex = mode_s_hex.zfill(6)
+
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT * FROM aircraft WHERE mode_s_code_hex = ?', (mode_s_hex,))
+    row = cursor.fetchone()
+    
+    if not row:
+        conn.close()
+        return None, "", ""
+    
+    data = {i: row[i] for i in range(len(row))}
+    aircraft = Aircraft(data)
+    
+    conn.close()
+    return aircraft, aircraft.mfr_mdl_code, (aircraft.kit_mfr, aircraft.kit_model)
+
 def find_matching_aircraft(db_file, model_code, kit_mfr, kit_model):
     """Find all aircraft matching a model code or kit info using SQLite."""
     conn = sqlite3.connect(db_file)
@@ -623,7 +654,7 @@ def add_aircraft_reference_to_db(db_file, reference_file):
         print(f"Error: Reference file {reference_file} not found")
         return False
     
-    conn = sqlite3.connect(db_file)
+    conn = open_for_bulk_load(db_file)
     cursor = conn.cursor()
     
     # Create the table for aircraft reference data if it doesn't exist
@@ -645,9 +676,6 @@ def add_aircraft_reference_to_db(db_file, reference_file):
     )
     ''')
     
-    # Create index on the code column
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_code ON aircraft_reference (code)')
-    
     try:
         # First, count total lines to get an estimate for progress calculation
         total_lines = 0
@@ -682,7 +710,6 @@ def add_aircraft_reference_to_db(db_file, reference_file):
                         'INSERT OR REPLACE INTO aircraft_reference VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)',
                         batch
                     )
-                    conn.commit()
                     batch = []
                     
                     percentage = (total_rows / total_lines * 100) if total_lines > 0 else 0
@@ -695,7 +722,7 @@ def add_aircraft_reference_to_db(db_file, reference_file):
                     'INSERT OR REPLACE INTO aircraft_reference VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)',
                     batch
                 )
-                conn.commit()
+            conn.commit()
             
             print(f"\nAdded {total_rows} aircraft reference records to the database")
             
@@ -707,6 +734,55 @@ def add_aircraft_reference_to_db(db_file, reference_file):
     conn.close()
     return True
 
+def create_indexes(db_file):
+    """Create the search indexes once all the data is loaded.
+    Building an index in one go after the load is much faster than updating it on every insert.
+    n_number and aircraft_reference.code are primary keys so sqlite already has an index for them."""
+    print("Creating indexes...")
+    conn = open_for_bulk_load(db_file)
+    cursor = conn.cursor()
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_mode_s_code_hex ON aircraft (mode_s_code_hex)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_mfr_mdl_code ON aircraft (mfr_mdl_code)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_kit_mfr ON aircraft (kit_mfr)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_kit_model ON aircraft (kit_model)')
+    cursor.execute('ANALYZE')
+    conn.commit()
+    conn.close()
+
+def rebuild_database(master_file, acftref_file, db_file):
+    """Build a new SQLite database from the FAA files then swap it in place of the old one.
+    The new database is built in db_file.tmp. the old database is only replaced once the new one
+    is complete (os.replace is atomic), so TronView can keep reading the old one while this runs."""
+    tmp_file = db_file + ".tmp"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    if not convert_to_sqlite(master_file, tmp_file):
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return False
+
+    # Add aircraft reference data to the database
+    if os.path.exists(acftref_file):
+        if not add_aircraft_reference_to_db(tmp_file, acftref_file):
+            print("Warning: Could not add aircraft reference data to the database")
+
+    try:
+        create_indexes(tmp_file)
+        timestamp = update_database_timestamp(tmp_file)
+        # the build didn't sync anything so make sure it's all on disk before it replaces the old database.
+        with open(tmp_file, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_file, db_file)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error finishing database: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return False
+
+    print(f"Database timestamp updated: {timestamp}")
+    return True
+
 def update_database_timestamp(db_file):
     """Update the timestamp for when the database was last updated."""
     import datetime
@@ -795,6 +871,7 @@ def get_aircraft_description(db_file, mfr_mdl_code):
 def main():
     parser = argparse.ArgumentParser(description='Search the FAA Aircraft Registration Database')
     parser.add_argument('--n-number', type=str, help='N-Number to search')
+    parser.add_argument('--icao', type=str, help='ICAO 24-bit address (hex, like A1B2C3) to search')
     parser.add_argument('--download-only', action='store_true', help='Only download the database without searching')
     parser.add_argument('--rebuild-db', action='store_true', help='Force rebuild of the SQLite database')
     parser.add_argument('--describe', type=str, help='Get description for an aircraft code')
@@ -829,18 +906,9 @@ def main():
     # Convert to SQLite if needed
     db_updated = False
     if not os.path.exists(sqlite_db) or args.rebuild_db or args.download_only:
-        if not convert_to_sqlite(master_file, sqlite_db):
+        if not rebuild_database(master_file, acftref_file, sqlite_db):
             return
         db_updated = True
-        
-        # Add aircraft reference data to the database
-        if os.path.exists(acftref_file):
-            if not add_aircraft_reference_to_db(sqlite_db, acftref_file):
-                print("Warning: Could not add aircraft reference data to the database")
-        
-        # Update the database timestamp
-        timestamp = update_database_timestamp(sqlite_db)
-        print(f"Database timestamp updated: {timestamp}")
     
     if args.download_only:
         print("Download and database conversion complete. Exiting.")
@@ -852,8 +920,8 @@ def main():
         print(f"Aircraft code {args.describe}: {description}")
         return
             
-    if not args.n_number:
-        print("Error: Missing required argument --n-number")
+    if not args.n_number and not args.icao:
+        print("Error: Missing required argument --n-number or --icao")
         parser.print_help()
         return
     
@@ -862,11 +930,16 @@ def main():
     print(f"FAA Database last updated: {timestamp}")
     
     # Search for the aircraft in the SQLite database
-    aircraft, model_code, kit_info = find_aircraft_by_n_number(sqlite_db, args.n_number)
-    
-    if not aircraft:
-        print(f"No aircraft found with N-Number {args.n_number}")
-        return
+    if args.icao:
+        aircraft, model_code, kit_info = find_aircraft_by_mode_s_hex(sqlite_db, args.icao)
+        if not aircraft:
+            print(f"No aircraft found with ICAO address {args.icao}")
+            return
+    else:
+        aircraft, model_code, kit_info = find_aircraft_by_n_number(sqlite_db, args.n_number)
+        if not aircraft:
+            print(f"No aircraft found with N-Number {args.n_number}")
+            return
     
     # Get aircraft description
     aircraft_description = get_aircraft_description(sqlite_db, aircraft.mfr_mdl_code)
@@ -890,7 +963,7 @@ def main():
     ])
     
     print(table)
-    print(f"Found aircraft with N-Number {args.n_number}")
+    print(f"Found aircraft with N-Number {aircraft.n_number}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+# GDL90 decode test/benchmark.
+# Decodes every frame in the stratux example logs (or the files given) and prints
+# the message counts, CRC errors and frames per second.
+# run from the TronView dir: python util/tests/gdl90_decode.py [file ...]
+
+import sys
+import os
+import glob
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from lib.inputs import _input_gdl90 as gdl90
+from lib.inputs._input_udp_utils import splitFrames
+
+files = sys.argv[1:] or sorted(glob.glob("lib/inputs/_example_data/stratux_*.dat"))
+if len(files) == 0:
+    print("no log files found. run from the TronView dir or give file names.")
+    sys.exit(1)
+
+frames = []
+for filename in files:
+    with open(filename, "rb") as f:
+        data = f.read()
+    frames.extend(splitFrames(data, memoryview(data), len(data)))
+print("files: %d frames: %d" % (len(files), len(frames)))
+
+for checkFcs in (True, False):
+    decoder = gdl90.GDL90Decoder(checkFcs=checkFcs)
+    ids = Counter()
+    best = None
+    for run in range(5):
+        start = time.perf_counter()
+        for frame in frames:
+            msgId, rec = decoder.decode(frame)
+            if run == 0:
+                ids[msgId] += 1
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    print("check FCS: %s  %.0f frames/sec  (%.2f usec/frame)" % (checkFcs, len(frames) / best, best * 1e6 / len(frames)))
+    print("  crc errors: %d  bad length: %d  unknown: %d" % (decoder.crc_errors // 5, decoder.bad_length // 5, decoder.unknown // 5))
+    names = ["%s:%d" % ("LE%d" % (k - gdl90.MSG_LEVIL_BASE) if k is not None and k >= gdl90.MSG_LEVIL_BASE else k, v) for k, v in sorted(ids.items(), key=lambda i: -1 if i[0] is None else i[0])]
+    print("  message ids: " + ", ".join(names))
+
+# vi: modeline tabstop=8 expandtab shiftwidth=4 softtabstop=4 syntax=python